@@ -0,0 +1,160 @@
+#Complexity Imports
+import math
+
+CONSTANT = "1"
+LOG = "log n"
+LINEAR = "n"
+LINEARITHMIC = "n log n"
+QUADRATIC = "n^2"
+POWER = "n^k"
+MODELS = [CONSTANT, LOG, LINEAR, LINEARITHMIC, QUADRATIC]
+
+MODELS_FUNCTION = {CONSTANT: lambda n: 1.0,
+                   LOG: lambda n: math.log(n),
+                   LINEAR: lambda n: float(n),
+                   LINEARITHMIC: lambda n: n * math.log(n),
+                   QUADRATIC: lambda n: float(n) * n}
+
+MODELS_EXPONENT = {CONSTANT: 0.0, LOG: 0.0, LINEAR: 1.0, LINEARITHMIC: 1.0, QUADRATIC: 2.0}
+
+#Free parameters of every model (a, b; the constant model has a alone; c, k for the power law)
+MODELS_PARAMETERS = {CONSTANT: 1, LOG: 2, LINEAR: 2, LINEARITHMIC: 2, QUADRATIC: 2, POWER: 2}
+
+#Fitting parameters
+SIMPLICITY_TOLERANCE = 2.0 #BIC difference below which models are not told apart
+EXPONENT_TOLERANCE = 0.1
+MIN_POINTS = 3
+
+def fit(X, Y):
+    """
+    Fits a measured curve against every model in MODELS, as Y = a + b * f(X), and against the
+    power law Y = c * X^k. Fits minimize the relative error, so that small inputs weigh as much
+    as large ones. Models are compared by the Bayesian information criterion of their relative
+    residuals, n ln(RSS / n) + p ln n, which charges every free parameter (see MODELS_PARAMETERS):
+    the best model is the simplest one (the power law being the least simple) whose BIC is within
+    SIMPLICITY_TOLERANCE of the lowest.
+
+    fit(X, Y) -> fit
+
+    @type X: list of numbers
+    @param X: input sizes (non-positive sizes are ignored).
+    @type Y: list of numbers
+    @param Y: measured values, in X order.
+
+    @rtype: dictionary
+    @return: Model (best model), Constants, R2, RMSE (relative), Exponent (power-law k),
+    Fits (model -> Constants, R2, RMSE, BIC, including POWER); None if fewer than MIN_POINTS are usable.
+    """
+    points = [(x, y) for x, y in zip(X, Y) if x > 1]
+    if len(points) < MIN_POINTS:
+        return None
+    X = [x for x, y in points]
+    Y = [y for x, y in points]
+    floor = min([y for y in Y if y > 0] or [1e-12])
+    weights = [1.0 / max(y, floor) ** 2 for y in Y]
+
+    fits = {}
+    for model in MODELS:
+        constants = _fit_linear(X, Y, weights, MODELS_FUNCTION[model])
+        if constants is None:
+            continue
+        a, b = constants
+        if b < 0 and model != CONSTANT:
+            continue
+        predicted = [a + b * MODELS_FUNCTION[model](x) for x in X]
+        fits[model] = _quality(Y, predicted, floor, constants, MODELS_PARAMETERS[model])
+
+    c, k = _fit_power(X, Y, floor)
+    fits[POWER] = _quality(Y, [c * x ** k for x in X], floor, (c, k), MODELS_PARAMETERS[POWER])
+
+    lowest = min(fits[model]["BIC"] for model in fits)
+    best = [model for model in MODELS + [POWER] if model in fits and fits[model]["BIC"] <= lowest + SIMPLICITY_TOLERANCE][0]
+    return {"Model": best,
+            "Constants": fits[best]["Constants"],
+            "R2": fits[best]["R2"],
+            "RMSE": fits[best]["RMSE"],
+            "Exponent": k,
+            "Fits": fits}
+
+def is_worse(measured, expected, tolerance = EXPONENT_TOLERANCE):
+    """
+    Tells if a fitted curve scales worse than the expected asymptotic class: its best model must
+    be above the expected one (any power law counts as above), and its power-law exponent above
+    the expected exponent by more than tolerance, so that noise on a flat curve is not flagged.
+
+    is_worse(measured, expected, tolerance = EXPONENT_TOLERANCE) -> worse
+
+    @type measured: dictionary
+    @param measured: fit, as returned by fit.
+    @type expected: string
+    @param expected: one of MODELS.
+    @type tolerance: float
+    @param tolerance: exponent tolerance.
+
+    @rtype: boolean
+    @return: True if the measured scaling is worse than expected.
+    """
+    if measured is None or expected is None:
+        return False
+    above = measured["Model"] == POWER or MODELS.index(measured["Model"]) > MODELS.index(expected)
+    return above and measured["Exponent"] > MODELS_EXPONENT[expected] + tolerance
+
+def make_fit_table(rows, label):
+    """
+    Makes a table-as-string of fitted models.
+
+    make_fit_table(rows, label) -> table
+
+    @type rows: list of tuples
+    @param rows: (name, fit, expected) triples, fit as returned by fit, expected one of MODELS or None.
+    @type label: string
+    @param label: table title.
+
+    @rtype: string
+    @return: the table.
+    """
+    lines = [label, "", "\t".join(["Series", "Model", "a", "b", "R2", "RMSE", "Exponent", "Expected", "Worse"])]
+    for name, measured, expected in rows:
+        if measured is None:
+            lines.append("\t".join([str(name), "-", "-", "-", "-", "-", "-", str(expected), "-"]))
+            continue
+        a, b = measured["Constants"]
+        values = [a, b, measured["R2"], measured["RMSE"], measured["Exponent"]]
+        lines.append("\t".join([str(name), measured["Model"]] + ["{:.6e}".format(value) for value in values] + [str(expected), str(is_worse(measured, expected))]))
+    return "\n".join(lines) + "\n"
+
+def _fit_linear(X, Y, weights, function):
+    F = [function(x) for x in X]
+    sw = sum(weights)
+    sf = sum(w * f for w, f in zip(weights, F))
+    sy = sum(w * y for w, y in zip(weights, Y))
+    sff = sum(w * f * f for w, f in zip(weights, F))
+    sfy = sum(w * f * y for w, f, y in zip(weights, F, Y))
+    det = sw * sff - sf * sf
+    if abs(det) <= 1e-12 * sw * sff:
+        if len(set(F)) == 1:
+            return (sy / sw, 0.0)
+        return None
+    b = (sw * sfy - sf * sy) / det
+    a = (sy - b * sf) / sw
+    return (a, b)
+
+def _fit_power(X, Y, floor):
+    logX = [math.log(x) for x in X]
+    logY = [math.log(max(y, floor)) for y in Y]
+    mx = sum(logX) / len(logX)
+    my = sum(logY) / len(logY)
+    sxx = sum((lx - mx) ** 2 for lx in logX)
+    k = sum((lx - mx) * (ly - my) for lx, ly in zip(logX, logY)) / sxx if sxx > 0 else 0.0
+    return (math.exp(my - k * mx), k)
+
+def _quality(Y, predicted, floor, constants, parameters):
+    n = len(Y)
+    my = sum(Y) / float(n)
+    ss_res = sum((y - p) ** 2 for y, p in zip(Y, predicted))
+    ss_tot = sum((y - my) ** 2 for y in Y)
+    r2 = 1.0 - ss_res / ss_tot if ss_tot > 0 else 1.0
+    mse = sum(((p - y) / max(y, floor)) ** 2 for y, p in zip(Y, predicted)) / n
+    #An exact fit would have an infinitely low BIC: residuals are floored at the float resolution.
+    bic = n * math.log(max(mse, 1e-30)) + parameters * math.log(n)
+    return {"Constants": constants, "R2": r2, "RMSE": math.sqrt(mse), "BIC": bic}
@@ -0,0 +1,129 @@
+#Compression Imports
+import gzip, bz2, zlib
+#Optional xz backend: built in from Python 3.3, else the backports.lzma package
+try:
+    import lzma
+except ImportError:
+    try:
+        from backports import lzma
+    except ImportError:
+        lzma = None
+
+#Compression formats (None stands for uncompressed)
+GZIP = "gzip"
+BZIP2 = "bzip2"
+XZ = "xz"
+COMPRESSIONS = [GZIP, BZIP2, XZ]
+EXTENSIONS = {GZIP: ".gz", BZIP2: ".bz2", XZ: ".xz"}
+
+LEVEL = 6
+READ_CHUNK = 1 << 16
+
+def available(compression):
+    """
+    Tells whether a compression format is supported by this interpreter.
+
+    available(compression) -> supported
+
+    @type compression: string
+    @param compression: one of COMPRESSIONS, or None.
+
+    @rtype: boolean
+    @return: True if maps can be written and read in that format.
+    """
+    if compression is None:
+        return True
+    if compression not in COMPRESSIONS:
+        return False
+    return compression != XZ or lzma is not None
+
+def available_compressions():
+    """
+    Returns the compression formats supported by this interpreter.
+
+    available_compressions() -> compressions
+
+    @rtype: list of string
+    @return: supported COMPRESSIONS.
+    """
+    return [compression for compression in COMPRESSIONS if available(compression)]
+
+class CompressedSink:
+    """
+    File-like sink compressing everything written to it into another sink, chunk by chunk,
+    so that a map is compressed while it is generated rather than once complete.
+    """
+
+    def __init__(self, sink, compression, level = LEVEL):
+        if not available(compression) or compression is None:
+            raise ValueError("Unsupported compression {}.".format(str(compression)))
+        self._sink = sink
+        if compression == GZIP:
+            #wbits 16 + MAX_WBITS: deflate stream framed by the gzip header and trailer.
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        elif compression == BZIP2:
+            self._compressor = bz2.BZ2Compressor(max(1, level))
+        else:
+            self._compressor = lzma.LZMACompressor(preset = level)
+
+    def write(self, string):
+        data = self._compressor.compress(string)
+        if data:
+            self._sink.write(data)
+
+    def close(self):
+        """
+        Flushes the compressor; the underlying sink is left open.
+
+        close() -> None
+        """
+        if self._compressor is not None:
+            self._sink.write(self._compressor.flush())
+            self._compressor = None
+
+def open_compressed(path, compression):
+    """
+    Opens a compressed file for streaming reads.
+
+    open_compressed(path, compression) -> stream
+
+    @type path: string
+    @param path: file path.
+    @type compression: string
+    @param compression: one of COMPRESSIONS.
+
+    @rtype: file-like object
+    @return: stream of the decompressed bytes.
+    """
+    if not available(compression) or compression is None:
+        raise ValueError("Unsupported compression {}.".format(str(compression)))
+    if compression == GZIP:
+        return gzip.open(path, "rb")
+    elif compression == BZIP2:
+        return bz2.BZ2File(path, "rb")
+    return lzma.LZMAFile(path, "rb")
+
+def decompressed_size(path, compression):
+    """
+    Returns the size of the decompressed content of a file, read by chunks.
+
+    decompressed_size(path, compression) -> size
+
+    @type path: string
+    @param path: file path.
+    @type compression: string
+    @param compression: one of COMPRESSIONS.
+
+    @rtype: int
+    @return: bytes.
+    """
+    stream = open_compressed(path, compression)
+    try:
+        size = 0
+        chunk = stream.read(READ_CHUNK)
+        while chunk:
+            size += len(chunk)
+            chunk = stream.read(READ_CHUNK)
+        return size
+    finally:
+        stream.close()
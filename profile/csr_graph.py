@@ -0,0 +1,579 @@
+#CSR Graph Imports
+from model.base.basegraph import basegraph
+from array import array
+from bisect import bisect_left, bisect_right
+import xml.etree.cElementTree as cET
+import ctypes, math, mmap, os, struct, tempfile
+
+#Array typecodes: offsets and targets are node indices, weights are doubles
+INDEX_TYPECODE = "l"
+WEIGHT_TYPECODE = "d"
+
+#Shared file layout: MAGIC, (nodes, arcs) header, then the ids, order (node indices sorted by id),
+#offsets, targets, weights, and node latitudes and longitudes (NaN for nodes without coordinates)
+#arrays, in native machine format
+SHARED_MAGIC = "PYPCSR2\0"
+SHARED_HEADER = struct.Struct("=qq")
+SHARED_INDEX = ctypes.c_long
+SHARED_WEIGHT = ctypes.c_double
+NAN = float("nan")
+
+class CSRGraph(basegraph):
+    """
+    Compressed-sparse-row graph.
+    Node ids are mapped to dense indices; the arcs leaving the i-th node are the positions
+    offsets[i], ..., offsets[i + 1] - 1 of the flat targets and weights arrays, so that a whole
+    graph takes three machine arrays instead of an object per node and arc. Arc statuses are
+    sparse (only the set ones are stored).
+    Arcs added after a query are buffered and merged into the rows at the next query, so that
+    loading is append-only and queries never see a partial row.
+    """
+
+    def __init__(self):
+        self._index = {} #node id -> index
+        self._ids = array(INDEX_TYPECODE)
+        self._infos = []
+        self._offsets = array(INDEX_TYPECODE, [0])
+        self._targets = array(INDEX_TYPECODE)
+        self._weights = array(WEIGHT_TYPECODE)
+        self._status = {} #arc position -> status
+        self._pending_sources = array(INDEX_TYPECODE)
+        self._pending_targets = array(INDEX_TYPECODE)
+        self._pending_weights = array(WEIGHT_TYPECODE)
+
+    def add_node(self, id, info = None):
+        """
+        Adds a node, or updates its info.
+
+        add_node(id, info = None) -> None
+
+        @type id: int
+        @param id: node id.
+        @type info: object
+        @param info: node info.
+        """
+        i = self._index.get(id)
+        if i is None:
+            self._new_node(id, info)
+        else:
+            self._infos[i] = info
+
+    def add_arc(self, tail, head, weight = 1):
+        """
+        Adds an arc, adding its end nodes if needed.
+
+        add_arc(tail, head, weight = 1) -> None
+
+        @type tail: int
+        @param tail: tail node id.
+        @type head: int
+        @param head: head node id.
+        @type weight: number
+        @param weight: arc weight.
+        """
+        index = self._index
+        i = index.get(tail)
+        if i is None:
+            i = self._new_node(tail, None)
+        j = index.get(head)
+        if j is None:
+            j = self._new_node(head, None)
+        self._pending_sources.append(i)
+        self._pending_targets.append(j)
+        self._pending_weights.append(weight)
+
+    def get_incident_arcs(self, id):
+        """
+        Returns the arcs leaving a node.
+
+        get_incident_arcs(id) -> arcs
+
+        @type id: int
+        @param id: node id.
+
+        @rtype: list of tuples
+        @return: (head id, (weight, status)) pairs (empty for unknown nodes).
+        """
+        if self._pending_sources:
+            self.freeze()
+        i = self._index.get(id)
+        if i is None:
+            return []
+        ids, targets, weights, status = self._ids, self._targets, self._weights, self._status
+        return [(ids[targets[k]], (weights[k], status.get(k))) for k in xrange(self._offsets[i], self._offsets[i + 1])]
+
+    def set_arc_status(self, tail, head, status):
+        """
+        Sets the status of the first arc from tail to head, if any.
+
+        set_arc_status(tail, head, status) -> None
+
+        @type tail: int
+        @param tail: tail node id.
+        @type head: int
+        @param head: head node id.
+        @type status: object
+        @param status: arc status (None clears it).
+        """
+        if self._pending_sources:
+            self.freeze()
+        i = self._index.get(tail)
+        j = self._index.get(head)
+        if i is None or j is None:
+            return
+        targets = self._targets
+        for k in xrange(self._offsets[i], self._offsets[i + 1]):
+            if targets[k] == j:
+                if status is None:
+                    self._status.pop(k, None)
+                else:
+                    self._status[k] = status
+                return
+
+    def get_node_info(self, id):
+        """
+        Returns the info of a node.
+
+        get_node_info(id) -> info
+
+        @type id: int
+        @param id: node id.
+
+        @rtype: object
+        @return: node info (None for unknown nodes).
+        """
+        i = self._index.get(id)
+        return None if i is None else self._infos[i]
+
+    def num_nodes(self):
+        return len(self._ids)
+
+    def num_arcs(self):
+        return len(self._targets) + len(self._pending_targets)
+
+    def freeze(self):
+        """
+        Merges the buffered arcs into the rows (a counting sort by tail, stable w.r.t. insertion).
+
+        freeze() -> None
+        """
+        n = len(self._ids)
+        old_offsets, old_targets, old_weights = self._offsets, self._targets, self._weights
+        sources, pending_targets, pending_weights = self._pending_sources, self._pending_targets, self._pending_weights
+        old_n = len(old_offsets) - 1
+
+        counts = [0] * (n + 1)
+        for i in xrange(old_n):
+            counts[i + 1] = old_offsets[i + 1] - old_offsets[i]
+        for i in sources:
+            counts[i + 1] += 1
+        offsets = array(INDEX_TYPECODE, counts)
+        for i in xrange(n):
+            offsets[i + 1] += offsets[i]
+
+        m = offsets[n]
+        targets = array(INDEX_TYPECODE, [0]) * m
+        weights = array(WEIGHT_TYPECODE, [0.0]) * m
+        cursor = array(INDEX_TYPECODE, offsets[:n])
+        status = {}
+        for i in xrange(old_n):
+            start, stop = old_offsets[i], old_offsets[i + 1]
+            at = cursor[i]
+            targets[at:at + stop - start] = old_targets[start:stop]
+            weights[at:at + stop - start] = old_weights[start:stop]
+            cursor[i] = at + stop - start
+        for k, value in self._status.iteritems():
+            i = bisect_right(old_offsets, k) - 1
+            status[k - old_offsets[i] + offsets[i]] = value
+        for k in xrange(len(sources)):
+            i = sources[k]
+            at = cursor[i]
+            targets[at] = pending_targets[k]
+            weights[at] = pending_weights[k]
+            cursor[i] = at + 1
+
+        self._offsets, self._targets, self._weights, self._status = offsets, targets, weights, status
+        self._pending_sources = array(INDEX_TYPECODE)
+        self._pending_targets = array(INDEX_TYPECODE)
+        self._pending_weights = array(WEIGHT_TYPECODE)
+
+    def _new_node(self, id, info):
+        i = len(self._infos)
+        try:
+            self._ids.append(id)
+        except (TypeError, OverflowError):
+            #Non-integer ids: ids are kept in a plain list from now on.
+            self._ids = list(self._ids) + [id]
+        self._index[id] = i
+        self._infos.append(info)
+        return i
+
+    def __getstate__(self):
+        self.freeze()
+        return self.__dict__
+
+class SharedCSRGraph(basegraph):
+    """
+    Read-only view of a CSR graph published by share.
+    The arrays are views over a private memory mapping of the shared file, so that every process
+    mapping the same file reads the same physical pages (the page cache, or /dev/shm) instead of
+    holding its own copy of the graph. Node ids are looked up by bisection in the sorted order array,
+    as an id dictionary would be private to the process. Node infos are the (lat, lon) coordinates
+    of the nodes, or None. Arc statuses are kept per process.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as source:
+            self._map = mmap.mmap(source.fileno(), 0, access = mmap.ACCESS_COPY)
+        if self._map[:len(SHARED_MAGIC)] != SHARED_MAGIC:
+            self._map.close()
+            raise ValueError("{} is not a shared CSR graph.".format(str(path)))
+        n, m = SHARED_HEADER.unpack_from(self._map, len(SHARED_MAGIC))
+        offset = len(SHARED_MAGIC) + SHARED_HEADER.size
+        self._ids, offset = _view(self._map, offset, SHARED_INDEX, n)
+        self._order, offset = _view(self._map, offset, SHARED_INDEX, n)
+        self._offsets, offset = _view(self._map, offset, SHARED_INDEX, n + 1)
+        self._targets, offset = _view(self._map, offset, SHARED_INDEX, m)
+        self._weights, offset = _view(self._map, offset, SHARED_WEIGHT, m)
+        self._lats, offset = _view(self._map, offset, SHARED_WEIGHT, n)
+        self._lons, offset = _view(self._map, offset, SHARED_WEIGHT, n)
+        self._sorted_ids = _SortedIds(self._ids, self._order)
+        self._status = {} #arc position -> status
+
+    def add_node(self, id, info = None):
+        raise TypeError("SharedCSRGraph is read-only.")
+
+    def add_arc(self, tail, head, weight = 1):
+        raise TypeError("SharedCSRGraph is read-only.")
+
+    def get_incident_arcs(self, id):
+        """
+        Returns the arcs leaving a node.
+
+        get_incident_arcs(id) -> arcs
+
+        @type id: int
+        @param id: node id.
+
+        @rtype: list of tuples
+        @return: (head id, (weight, status)) pairs (empty for unknown nodes).
+        """
+        i = self._lookup(id)
+        if i is None:
+            return []
+        ids, targets, weights, status = self._ids, self._targets, self._weights, self._status
+        return [(ids[targets[k]], (weights[k], status.get(k))) for k in xrange(self._offsets[i], self._offsets[i + 1])]
+
+    def set_arc_status(self, tail, head, status):
+        """
+        Sets the status of the first arc from tail to head, if any (in this process only).
+
+        set_arc_status(tail, head, status) -> None
+
+        @type tail: int
+        @param tail: tail node id.
+        @type head: int
+        @param head: head node id.
+        @type status: object
+        @param status: arc status (None clears it).
+        """
+        i = self._lookup(tail)
+        j = self._lookup(head)
+        if i is None or j is None:
+            return
+        targets = self._targets
+        for k in xrange(self._offsets[i], self._offsets[i + 1]):
+            if targets[k] == j:
+                if status is None:
+                    self._status.pop(k, None)
+                else:
+                    self._status[k] = status
+                return
+
+    def get_node_info(self, id):
+        """
+        Returns the coordinates of a node.
+
+        get_node_info(id) -> info
+
+        @type id: int
+        @param id: node id.
+
+        @rtype: tuple
+        @return: (lat, lon) (None for unknown nodes, and nodes without coordinates).
+        """
+        i = self._lookup(id)
+        if i is None or math.isnan(self._lats[i]):
+            return None
+        return (self._lats[i], self._lons[i])
+
+    def num_nodes(self):
+        return len(self._ids)
+
+    def num_arcs(self):
+        return len(self._targets)
+
+    def close(self):
+        """
+        Unmaps the shared file; the graph cannot be queried afterwards.
+
+        close() -> None
+        """
+        self._ids = self._order = self._offsets = self._targets = self._weights = self._lats = self._lons = self._sorted_ids = None
+        self._map.close()
+
+    def _lookup(self, id):
+        order = self._order
+        k = bisect_left(self._sorted_ids, id)
+        if k < len(order) and self._ids[order[k]] == id:
+            return order[k]
+        return None
+
+    def __getstate__(self):
+        #Pickled by path: the receiving process maps the same file.
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+class _SortedIds:
+    #Sequence of the node ids in ascending order, for bisection.
+    def __init__(self, ids, order):
+        self._ids = ids
+        self._order = order
+
+    def __len__(self):
+        return len(self._order)
+
+    def __getitem__(self, k):
+        return self._ids[self._order[k]]
+
+def _view(buffer, offset, ctype, count):
+    #Arrays are aligned on their item size, so that views never straddle words.
+    size = ctypes.sizeof(ctype)
+    offset += -offset % size
+    return (ctype * count).from_buffer(buffer, offset), offset + size * count
+
+def share(graph, path):
+    """
+    Publishes a CSR graph into a file to be mapped by SharedCSRGraph (on /dev/shm, the file lives in memory).
+
+    share(graph, path) -> None
+
+    @type graph: CSRGraph
+    @param graph: graph with integer node ids, whose node infos are (lat, lon) coordinates or None.
+    @type path: string
+    @param path: shared file path (replaced atomically).
+    """
+    graph.freeze()
+    ids = graph._ids
+    if not isinstance(ids, array):
+        raise ValueError("Only graphs with integer node ids can be shared.")
+    n, m = len(ids), len(graph._targets)
+    lats, lons = array(WEIGHT_TYPECODE), array(WEIGHT_TYPECODE)
+    for info in graph._infos:
+        try:
+            lat, lon = info if info is not None else (NAN, NAN)
+            lats.append(lat)
+            lons.append(lon)
+        except (TypeError, ValueError):
+            raise ValueError("Only graphs whose node infos are (lat, lon) coordinates can be shared.")
+    order = array(INDEX_TYPECODE, sorted(xrange(n), key = ids.__getitem__))
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(suffix = ".tmp", dir = directory)
+    try:
+        with os.fdopen(fd, "wb") as sink:
+            sink.write(SHARED_MAGIC)
+            sink.write(SHARED_HEADER.pack(n, m))
+            offset = len(SHARED_MAGIC) + SHARED_HEADER.size
+            for values, ctype in ((ids, SHARED_INDEX), (order, SHARED_INDEX), (graph._offsets, SHARED_INDEX), (graph._targets, SHARED_INDEX), (graph._weights, SHARED_WEIGHT), (lats, SHARED_WEIGHT), (lons, SHARED_WEIGHT)):
+                padding = -offset % ctypes.sizeof(ctype)
+                sink.write("\0" * padding)
+                data = values.tostring()
+                sink.write(data)
+                offset += padding + len(data)
+        os.rename(tmp_path, path)
+    except:
+        os.remove(tmp_path)
+        raise
+
+def osm_node_ids(source):
+    """
+    Returns the ids of the nodes of an OSM source, in document order.
+
+    osm_node_ids(source) -> ids
+
+    @type source: string
+    @param source: OSM source path.
+
+    @rtype: list of int
+    @return: node ids.
+    """
+    ids = []
+    for event, element in cET.iterparse(source):
+        if element.tag == "node":
+            ids.append(int(element.get("id")))
+        element.clear()
+    return ids
+
+def node_infos(graph):
+    """
+    Returns the nodes of an object graph, read from its nodes table.
+
+    node_infos(graph) -> nodes
+
+    @type graph: basegraph
+    @param graph: graph whose nodes attribute maps node ids to node infos.
+
+    @rtype: list of tuples
+    @return: (id, info) pairs, by ascending id.
+    """
+    nodes = getattr(graph, "nodes", None)
+    if not isinstance(nodes, dict):
+        raise TypeError("{} has no nodes table (node id -> info).".format(type(graph).__name__))
+    return sorted(nodes.iteritems(), key = lambda item: item[0])
+
+def to_csr(graph):
+    """
+    Copies a graph into a CSRGraph: its nodes, with their infos (see node_infos), then its arcs,
+    through its basegraph interface.
+
+    to_csr(graph) -> csr
+
+    @type graph: basegraph
+    @param graph: source graph, whose get_incident_arcs returns (head id, arc info) pairs,
+    the arc info being the weight or a sequence starting with it.
+
+    @rtype: CSRGraph
+    @return: frozen CSR copy.
+    """
+    csr = CSRGraph()
+    ids = []
+    for id, info in node_infos(graph):
+        csr.add_node(id, info)
+        ids.append(id)
+    for id in ids:
+        for head, info in graph.get_incident_arcs(id):
+            csr.add_arc(id, head, info[0] if isinstance(info, (list, tuple)) else info)
+    csr.freeze()
+    return csr
+
+def csr_parser(parser):
+    """
+    Returns a parser class producing the CSR copy of the graphs parsed by parser
+    (so that CSR graphs are cached apart from the object graphs, see GraphCache).
+
+    csr_parser(parser) -> class
+
+    @type parser: class
+    @param parser: parser class, whose instances provide parse_file(source).
+
+    @rtype: class
+    @return: parser class.
+    """
+    class CSRParser:
+        def parse_file(self, source):
+            return to_csr(parser().parse_file(source))
+    CSRParser.__name__ = "CSR" + parser.__name__
+    CSRParser.__module__ = parser.__module__
+    return CSRParser
+
+def __test(seed, operations):
+    """
+    CSR Graph Test.
+    Runs random interleaved node and arc additions, queries and status updates against a CSRGraph
+    and a plain adjacency-list model, then checks that the shared file and its pickle round-trip,
+    and that to_csr copies an object graph with its node infos.
+
+    __test(seed, operations) -> None
+
+    @type seed: int
+    @param seed: random seed.
+    @type operations: int
+    @param operations: number of random operations.
+    """
+    import pickle, random
+    print "### iPATH TEST CSR GRAPH"
+    print "### Seed: {}".format(str(seed))
+    print "### Operations: {}\n".format(str(operations))
+    rand = random.Random(seed)
+    graph = CSRGraph()
+    model = {} #node id -> [head id, weight, status] arcs, in insertion order
+    infos = {} #node id -> info
+
+    def check(id):
+        expected = [(head, (weight, status)) for head, weight, status in model.get(id, [])]
+        assert graph.get_incident_arcs(id) == expected, "arcs of {}".format(str(id))
+        assert graph.get_node_info(id) == infos.get(id), "info of {}".format(str(id))
+
+    print "Interleaving Operations . . ."
+    for r in xrange(operations):
+        tail, head = rand.randint(0, 50), rand.randint(0, 50)
+        operation = rand.random()
+        if operation < 0.1:
+            info = rand.choice([None, (rand.random(), rand.random())])
+            graph.add_node(tail, info)
+            model.setdefault(tail, [])
+            infos[tail] = info
+        elif operation < 0.6:
+            weight = rand.randint(1, 100) / 4.0
+            graph.add_arc(tail, head, weight)
+            model.setdefault(tail, []).append([head, weight, None])
+            model.setdefault(head, [])
+        elif operation < 0.8:
+            check(tail)
+        else:
+            status = rand.choice([None, "open", "closed"])
+            graph.set_arc_status(tail, head, status)
+            for arc in model.get(tail, []):
+                if arc[0] == head:
+                    arc[2] = status
+                    break
+    for id in range(-1, 52):
+        check(id)
+    assert graph.num_nodes() == len(model)
+    assert graph.num_arcs() == sum(len(arcs) for arcs in model.values())
+    print "Nodes: {}, Arcs: {}".format(str(graph.num_nodes()), str(graph.num_arcs()))
+
+    print "Sharing . . ."
+    fd, path = tempfile.mkstemp(suffix = ".csr")
+    os.close(fd)
+    try:
+        share(graph, path)
+        shared = SharedCSRGraph(path)
+        copy = pickle.loads(pickle.dumps(shared))
+        for view in (shared, copy):
+            assert view.num_nodes() == graph.num_nodes() and view.num_arcs() == graph.num_arcs()
+            for id in range(-1, 52):
+                assert view.get_incident_arcs(id) == [(head, (weight, None)) for head, weight, status in model.get(id, [])], "shared arcs of {}".format(str(id))
+                assert view.get_node_info(id) == infos.get(id), "shared info of {}".format(str(id))
+        for tail in model:
+            if model[tail]:
+                head = model[tail][0][0]
+                shared.set_arc_status(tail, head, "closed")
+                assert shared.get_incident_arcs(tail)[0] == (head, (model[tail][0][1], "closed"))
+                assert copy.get_incident_arcs(tail)[0][1][1] is None
+        shared.close()
+        copy.close()
+    finally:
+        os.remove(path)
+
+    print "Copying . . ."
+    class ObjectGraph:
+        #Object graph with a nodes table, as the parsed ones.
+        def __init__(self):
+            self.nodes = dict((id, infos.get(id)) for id in model)
+        def get_incident_arcs(self, id):
+            return [(head, [weight, status]) for head, weight, status in model[id]]
+    csr = to_csr(ObjectGraph())
+    for id in model:
+        assert csr.get_incident_arcs(id) == [(head, (weight, None)) for head, weight, status in model[id]]
+        assert csr.get_node_info(id) == infos.get(id)
+
+    print "\n### END OF TEST ###\n"
+
+if __name__ == "__main__":
+    seed = 0
+    operations = 5000
+    __test(seed, operations)
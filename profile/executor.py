@@ -0,0 +1,109 @@
+#Executor Imports
+from multiprocessing import Pool, Value, cpu_count
+#System Import
+import os
+
+#Optional affinity backend, used where os.sched_setaffinity is not available
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+def available_cores():
+    """
+    Returns the cores the current process is allowed to run on.
+
+    available_cores() -> cores
+
+    @rtype: list of int
+    @return: sorted core indexes.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    if psutil is not None and hasattr(psutil.Process, "cpu_affinity"):
+        return sorted(psutil.Process().cpu_affinity())
+    return range(cpu_count())
+
+def worker_counts(limit = None):
+    """
+    Returns the worker counts of a scaling analysis: the powers of two up to limit, and limit itself.
+
+    worker_counts(limit = None) -> counts
+
+    @type limit: int
+    @param limit: largest worker count (None means the number of available cores).
+
+    @rtype: list of int
+    @return: increasing worker counts, starting from 1.
+    """
+    limit = len(available_cores()) if limit is None else max(1, limit)
+    counts = [1]
+    while counts[-1] * 2 <= limit:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != limit:
+        counts.append(limit)
+    return counts
+
+def pin_to_core(core):
+    """
+    Pins the current process to the specified core.
+
+    pin_to_core(core) -> pinned
+
+    @type core: int
+    @param core: core index.
+
+    @rtype: boolean
+    @return: True if the process has been pinned, False if no affinity backend is available.
+    """
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, [core])
+        return True
+    if psutil is not None and hasattr(psutil.Process, "cpu_affinity"):
+        psutil.Process().cpu_affinity([core])
+        return True
+    return False
+
+def execute(function, cells, workers = None, pin = True):
+    """
+    Executes function on every cell in a pool of worker processes and returns the results
+    in the same order as cells.
+    Concurrency is capped by workers and by the number of available cores, and each worker
+    is pinned to its own core, so that concurrent measurements do not interfere.
+
+    execute(function, cells, workers = None, pin = True) -> results
+
+    @type function: function
+    @param function: module-level (picklable) function, taking a single cell.
+    @type cells: list
+    @param cells: independent picklable work items.
+    @type workers: int
+    @param workers: maximum number of worker processes (None means one per available core).
+    @type pin: boolean
+    @param pin: if True, each worker is pinned to its own core.
+
+    @rtype: list
+    @return: function results, in cells order.
+    """
+    cells = list(cells)
+    cores = available_cores()
+    workers = len(cores) if workers is None else min(workers, len(cores))
+    workers = max(1, min(workers, len(cells)))
+
+    if workers == 1:
+        return [function(cell) for cell in cells]
+
+    counter = Value("i", 0)
+    pool = Pool(workers, _init_worker, (counter, cores if pin else None))
+    try:
+        return pool.map(function, cells, chunksize = 1)
+    finally:
+        pool.close()
+        pool.join()
+
+def _init_worker(counter, cores):
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    if cores is not None:
+        pin_to_core(cores[index % len(cores)])
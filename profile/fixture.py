@@ -0,0 +1,64 @@
+#Fixture Imports
+import copy
+import cPickle as pickle
+
+PICKLE = "pickle"
+COPY = "copy"
+REBUILD = "rebuild"
+STRATEGIES = [PICKLE, COPY, REBUILD]
+
+class Fixture:
+    """
+    Populated data structure, built once and handed out as independent copies.
+    The structure is snapshotted with the cheapest strategy it supports: a pickle snapshot,
+    loaded for every copy, else a deep copy of a pristine instance, else a rebuild for every copy.
+    """
+
+    def __init__(self, build, cloning = True):
+        """
+        Builds the fixture.
+
+        __init__(build, cloning = True) -> Fixture
+
+        @type build: function
+        @param build: build() returns a new populated instance.
+        @type cloning: boolean
+        @param cloning: if False, every copy is rebuilt.
+        """
+        self._build = build
+        self._pristine = build()
+        self._spare = self._pristine
+        self._snapshot = None
+        self.strategy = REBUILD
+        if not cloning:
+            return
+        try:
+            self._snapshot = pickle.dumps(self._pristine, pickle.HIGHEST_PROTOCOL)
+            pickle.loads(self._snapshot)
+            self.strategy = PICKLE
+            return
+        except Exception:
+            self._snapshot = None
+        try:
+            self._spare = copy.deepcopy(self._pristine)
+            self.strategy = COPY
+        except Exception:
+            self._spare = self._pristine
+
+    def get(self):
+        """
+        Returns a copy of the populated structure, that the caller may freely modify.
+
+        get() -> instance
+
+        @rtype: object
+        @return: populated instance.
+        """
+        if self._spare is not None:
+            instance, self._spare = self._spare, None
+            return instance
+        if self.strategy == PICKLE:
+            return pickle.loads(self._snapshot)
+        if self.strategy == COPY:
+            return copy.deepcopy(self._pristine)
+        return self._build()
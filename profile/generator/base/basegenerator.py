@@ -17,4 +17,17 @@ class basegenerator:
         @rtype: None if directory is specified, otherwise string
         @return: None if directory is specified, otherwise the generated OSM Map.
         """
-        raise NotImplementedError("generate: You should have implemented this method!")
\ No newline at end of file
+        raise NotImplementedError("generate: You should have implemented this method!")
+    
+    def write(self, sink, pretty = False):
+        """
+        Streams a Random OSM Map to the specified file-like sink, without building it in memory.
+        
+        write(sink, pretty = False) -> None
+        
+        @type sink: file-like object
+        @param sink: object exposing write(string).
+        @type pretty: boolean
+        @param pretty: if True, the generated OSM Map is indented.
+        """
+        raise NotImplementedError("write: You should have implemented this method!")
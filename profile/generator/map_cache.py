@@ -0,0 +1,189 @@
+#Map Cache Imports
+from control.profile.generator.osm_generator import OsmGenerator, GENERATOR_VERSION
+from control.profile.compression import CompressedSink, EXTENSIONS
+#System Import
+import os, hashlib, tempfile
+
+#Map Cache parameters
+FORMAT_XML = "xml"
+FORMAT_PRETTY_XML = "pretty"
+FORMATS = [FORMAT_XML, FORMAT_PRETTY_XML]
+
+DEFAULT_MAX_SIZE = 1 << 30
+CACHE_EXTENSION = ".osm"
+
+class MapCache:
+    """
+    On-disk content-addressed cache of generated OSM Maps.
+    Every map is stored in a file named after the digest of its generation parameters and of the
+    GENERATOR_VERSION, so that every parser and every subsequent run reads the very same bytes,
+    and maps of an older generator are never served.
+    The least recently used maps are evicted when the cache exceeds max_size bytes.
+    """
+
+    def __init__(self, directory, max_size = DEFAULT_MAX_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+        self._generator = OsmGenerator()
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+    def get(self, num_nodes, num_ways, adjacency, expansion, seed, format = FORMAT_XML, compression = None):
+        """
+        Returns the content of the OSM Map generated with the specified parameters
+        (compressed, if compression is specified).
+
+        get(num_nodes, num_ways, adjacency, expansion, seed, format = FORMAT_XML, compression = None) -> map
+
+        @type num_nodes: int
+        @param num_nodes: number of nodes.
+        @type num_ways: int
+        @param num_ways: number of ways.
+        @type adjacency: int
+        @param adjacency: number of adjacent nodes / way.
+        @type expansion: int
+        @param expansion: coordinates upper bound.
+        @type seed: int
+        @param seed: generator seed.
+        @type format: string
+        @param format: one of FORMATS.
+        @type compression: string
+        @param compression: one of COMPRESSIONS, or None.
+
+        @rtype: string
+        @return: the OSM Map.
+        """
+        file_stream = open(self.get_path(num_nodes, num_ways, adjacency, expansion, seed, format, compression), "rb")
+        try:
+            return file_stream.read()
+        finally:
+            file_stream.close()
+
+    def get_path(self, num_nodes, num_ways, adjacency, expansion, seed, format = FORMAT_XML, compression = None):
+        """
+        Returns the path of the OSM Map generated with the specified parameters,
+        generating and storing it if it is not cached yet.
+
+        get_path(num_nodes, num_ways, adjacency, expansion, seed, format = FORMAT_XML, compression = None) -> path
+
+        @type num_nodes: int
+        @param num_nodes: number of nodes.
+        @type num_ways: int
+        @param num_ways: number of ways.
+        @type adjacency: int
+        @param adjacency: number of adjacent nodes / way.
+        @type expansion: int
+        @param expansion: coordinates upper bound.
+        @type seed: int
+        @param seed: generator seed.
+        @type format: string
+        @param format: one of FORMATS.
+        @type compression: string
+        @param compression: one of COMPRESSIONS, or None.
+
+        @rtype: string
+        @return: absolute path of the cached OSM Map.
+        """
+        if seed is None:
+            raise ValueError("get_path: a map generated without seed cannot be cached.")
+        if format not in FORMATS:
+            raise ValueError("get_path: unsupported map format {}.".format(str(format)))
+
+        if compression is not None and compression not in EXTENSIONS:
+            raise ValueError("get_path: unsupported compression {}.".format(str(compression)))
+
+        key = (GENERATOR_VERSION, int(num_nodes), int(num_ways), int(adjacency), int(expansion), int(seed), str(format))
+        file_name = self._digest(key) + CACHE_EXTENSION
+        if compression is not None:
+            #Compressed variants share the digest of their map, so that every format holds the same bytes.
+            file_name += EXTENSIONS[compression]
+        file_path = os.path.join(self.directory, file_name)
+
+        if os.path.exists(file_path):
+            os.utime(file_path, None)
+        else:
+            self._generate(key, file_path, compression)
+            self._evict(file_path)
+        return file_path
+
+    def size(self):
+        """
+        Returns the number of bytes currently stored in the cache.
+
+        size() -> size
+
+        @rtype: int
+        @return: number of cached bytes.
+        """
+        return sum(size for (mtime, size, file_path) in self._entries())
+
+    def clear(self):
+        """
+        Removes every cached OSM Map.
+
+        clear() -> None
+        """
+        for (mtime, size, file_path) in self._entries():
+            self._remove(file_path)
+
+    def _digest(self, key):
+        return hashlib.sha1(repr(key)).hexdigest()
+
+    def _generate(self, key, file_path, compression = None):
+        version, num_nodes, num_ways, adjacency, expansion, seed, format = key
+        generator = self._generator
+        #The generator is a singleton: its parameters are restored once the map is written.
+        saved = (generator.num_nodes, generator.num_ways, generator.adjacency, generator.expansion, generator.seed)
+        generator.num_nodes = num_nodes
+        generator.num_ways = num_ways
+        generator.adjacency = adjacency
+        generator.expansion = expansion
+        generator.seed = seed
+
+        #Written aside and renamed, so that concurrent readers never see a partial map.
+        fd, tmp_path = tempfile.mkstemp(suffix = ".tmp", dir = self.directory)
+        try:
+            file_stream = os.fdopen(fd, "wb")
+            try:
+                sink = file_stream if compression is None else CompressedSink(file_stream, compression)
+                self._generator.write(sink, pretty = (format == FORMAT_PRETTY_XML))
+                if sink is not file_stream:
+                    sink.close()
+            finally:
+                file_stream.close()
+            os.rename(tmp_path, file_path)
+        except:
+            self._remove(tmp_path)
+            raise
+        finally:
+            generator.num_nodes, generator.num_ways, generator.adjacency, generator.expansion, generator.seed = saved
+
+    def _entries(self):
+        entries = []
+        for file_name in os.listdir(self.directory):
+            if not (file_name.endswith(CACHE_EXTENSION) or any(file_name.endswith(CACHE_EXTENSION + extension) for extension in EXTENSIONS.values())):
+                continue
+            file_path = os.path.join(self.directory, file_name)
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, file_path))
+        return entries
+
+    def _evict(self, keep_path):
+        entries = sorted(self._entries())
+        total = sum(size for (mtime, size, file_path) in entries)
+        for (mtime, size, file_path) in entries:
+            if total <= self.max_size:
+                break
+            if file_path == keep_path:
+                continue
+            self._remove(file_path)
+            total -= size
+
+    def _remove(self, file_path):
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
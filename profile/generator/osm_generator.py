@@ -1,10 +1,10 @@
 #XML Generator Imports
 from control.profile.generator.base.basegenerator import basegenerator
 from utils.singleton import singleton
-import xml.etree.cElementTree as cET
-from xml.dom import minidom
+from control.profile.compression import CompressedSink, EXTENSIONS
+from cStringIO import StringIO
 #Math Import
-import random
+import numpy
 #System Import
 import os
 
@@ -13,6 +13,15 @@ DEFAULT_NUM_NODES = 1000
 DEFAULT_NUM_WAYS = 1000
 DEFAULT_ADJACENCY = 100
 DEFAULT_EXPANSION = 1000
+DEFAULT_SEED = None
+
+#Version of the generated bytes: increased whenever write gives other bytes for the same parameters
+GENERATOR_VERSION = 1
+
+#OSM Map Streaming parameters
+XML_HEADER = "<?xml version=\"1.0\" ?>"
+CHUNK_BOUND = 1 << 12
+COORD_FORMAT = "%.12g"
 
 @singleton
 class OsmGenerator(basegenerator):
@@ -24,70 +33,100 @@ class OsmGenerator(basegenerator):
         self.num_ways = DEFAULT_NUM_WAYS
         self.adjacency = DEFAULT_ADJACENCY
         self.expansion = DEFAULT_EXPANSION
-        self._nodes_id = []
+        self.seed = DEFAULT_SEED
         
-    def generate(self, directory = None):
+    def generate(self, directory = None, compression = None):
         """
         Generates a Random OSM Map. 
         If directory is specified, the generated map will be saved in the specified directory,
         otherwise it will be returned as string.
+        If compression is specified, the map is compressed while it is streamed (see CompressedSink),
+        and the file name takes the extension of the format.
         
-        generated(directory = None) -> None or map
+        generated(directory = None, compression = None) -> None or map
         
         @type directory: string
         @param directory: absolute directory path.
+        @type compression: string
+        @param compression: one of COMPRESSIONS, or None.
         
         @rtype: None if directory is specified, otherwise string
         @return: None if directory is specified, otherwise the generated OSM Map.
         """
-        self._nodes_id = []
-        string = "OSM Map generated by iPath. Nodes: {}, Ways: {}, Adjacency: {}, Expansion: {}.".format(str(self.num_nodes), str(self.num_ways), str(self.adjacency), str(self.expansion)) 
-        comment = cET.Comment(string)        
+        if directory is None:
+            sink = StringIO()
+            self._write_compressed(sink, False, compression)
+            return sink.getvalue()
+        else:
+            file_path = os.path.join(directory, self.file_name() + (EXTENSIONS[compression] if compression else ""))
+            file_stream = open(file_path, "wb")
+            try:
+                self._write_compressed(file_stream, True, compression)
+            finally:
+                file_stream.close()
+    
+    def _write_compressed(self, sink, pretty, compression):
+        if compression is None:
+            self.write(sink, pretty = pretty)
+            return
+        compressed_sink = CompressedSink(sink, compression)
+        self.write(compressed_sink, pretty = pretty)
+        compressed_sink.close()
+    
+    def file_name(self):
+        """
+        Returns the file name of the OSM Map described by the current parameters.
         
-        osm = cET.Element("osm")
-        osm.append(comment)
+        file_name() -> file_name
         
-        for i in range(0, self.num_nodes):
-            node = cET.SubElement(osm, "node")
-            node.set("id", str(i))
-            node.set("lat", str(random.uniform(0, self.expansion)))
-            node.set("lon", str(random.uniform(0, self.expansion)))
-            self._nodes_id.append(i)
+        @rtype: string
+        @return: file name of the OSM Map.
+        """
+        seed = "" if self.seed is None else " S{}".format(str(self.seed))
+        return "OsmGenerator N{} W{} A{} E{}{}.xml".format(str(self.num_nodes), str(self.num_ways), str(self.adjacency), str(self.expansion), seed)
             
-        for i in range(0, self.num_ways):
-            way = cET.SubElement(osm, "way")
-            way.set("id", str(i))
-            for j in range(1, self.adjacency):
-                adj_node = cET.SubElement(way, "nd")
-                adj_node.set("ref", str(random.choice(self._nodes_id)))
+    def write(self, sink, pretty = False):
+        """
+        Streams a Random OSM Map to the specified file-like sink.
+        Coordinates and way references are drawn in batches of CHUNK_BOUND elements from a
+        single RandomState seeded by seed, and each batch is serialized as soon as it is drawn:
+        memory stays bounded whatever the size of the map, and the same parameters with the
+        same (not None) seed always give the same bytes.
         
-        if directory is None:
-            rough_string = cET.tostring(osm, 'utf-8')
-            reparsed = minidom.parseString(rough_string)
-            return reparsed.toxml()
-            #return self.__prettify(osm)
-        else:
-            file_name = "OsmGenerator N{} W{} A{} E{}.xml".format(str(self.num_nodes), str(self.num_ways), str(self.adjacency), str(self.expansion))
-            file_path = os.path.join(directory, file_name)
-            file_stream = open(file_path, "wb")
-            file_stream.write(self.__prettify(osm))
-            file_stream.close()
+        write(sink, pretty = False) -> None
         
-    def __prettify(self, element):
+        @type sink: file-like object
+        @param sink: object exposing write(string).
+        @type pretty: boolean
+        @param pretty: if True, elements are indented by tabs, one per line.
         """
-        Generates a better human-readable OSM string.
+        newline, indent = ("\n", "\t") if pretty else ("", "")
+        string = "OSM Map generated by iPath. Nodes: {}, Ways: {}, Adjacency: {}, Expansion: {}, Seed: {}.".format(str(self.num_nodes), str(self.num_ways), str(self.adjacency), str(self.expansion), str(self.seed))
+        rand = numpy.random.RandomState(self.seed)
         
-        __prettify(element) -> reparsed_string
+        sink.write("".join([XML_HEADER, newline, "<osm>", newline, indent, "<!--", string, "-->", newline]))
         
-        @type element: string
-        @param element: generated OSM Map string.
+        node_template = "{}<node id=\"%d\" lat=\"{}\" lon=\"{}\"/>{}".format(indent, COORD_FORMAT, COORD_FORMAT, newline)
+        for first in range(0, self.num_nodes, CHUNK_BOUND):
+            last = min(first + CHUNK_BOUND, self.num_nodes)
+            coords = rand.uniform(0, self.expansion, (last - first, 2)).tolist()
+            sink.write("".join([node_template % (i, lat, lon) for i, (lat, lon) in enumerate(coords, first)]))
         
-        @rtype: string
-        @return: reparsed OSM Map string.
-        """
-        rough_string = cET.tostring(element, 'utf-8')
-        reparsed = minidom.parseString(rough_string)
-        return reparsed.toprettyxml(indent = "\t")        
+        num_refs = self.adjacency - 1 if self.num_nodes > 0 else 0
+        if num_refs > 0:
+            nd_template = "{}{}<nd ref=\"%d\"/>{}".format(indent, indent, newline)
+            way_template = "{}<way id=\"%d\">{}{}{}</way>{}".format(indent, newline, nd_template * num_refs, indent, newline)
+        else:
+            way_template = "{}<way id=\"%d\"/>{}".format(indent, newline)
+        for first in range(0, self.num_ways, CHUNK_BOUND):
+            last = min(first + CHUNK_BOUND, self.num_ways)
+            if num_refs > 0:
+                refs = rand.randint(0, self.num_nodes, (last - first, num_refs), dtype = numpy.int64).tolist()
+                sink.write("".join([way_template % tuple([i] + way_refs) for i, way_refs in enumerate(refs, first)]))
+            else:
+                sink.write("".join([way_template % i for i in range(first, last)]))
+        
+        sink.write("".join(["</osm>", newline]))
         
 def __test(generator, num_nodes, num_ways, adjacency, directory):
     """
@@ -0,0 +1,152 @@
+#Graph Cache Imports
+import cPickle as pickle
+#System Import
+import os, hashlib, tempfile, gc
+
+#Graph Cache parameters
+DEFAULT_MAX_SIZE = 1 << 30
+CACHE_EXTENSION = ".graph"
+
+class GraphCache:
+    """
+    On-disk cache of parsed graphs.
+    Every graph is pickled in a file named after the digest of its source path, source mtime and
+    size, and parser, so that an edited source or another parser never hits a stale graph.
+    The least recently used graphs are evicted when the cache exceeds max_size bytes.
+    """
+
+    def __init__(self, directory, max_size = DEFAULT_MAX_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+    def get(self, source, parser):
+        """
+        Returns the graph parsed from source by parser, unpickling it if cached,
+        else parsing and caching it.
+
+        get(source, parser) -> (graph, hit)
+
+        @type source: string
+        @param source: OSM source path.
+        @type parser: class
+        @param parser: parser class, whose instances provide parse_file(source).
+
+        @rtype: tuple
+        @return: (parsed graph, True if it was loaded from the cache).
+        """
+        file_path = self.get_path(source, parser)
+        if os.path.exists(file_path):
+            try:
+                graph = self._load(file_path)
+                os.utime(file_path, None)
+                return graph, True
+            except (EnvironmentError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+                self._remove(file_path)
+
+        graph = parser().parse_file(source)
+        self._store(graph, file_path)
+        return graph, False
+
+    def get_path(self, source, parser):
+        """
+        Returns the cache path of the graph parsed from source by parser.
+
+        get_path(source, parser) -> path
+
+        @type source: string
+        @param source: OSM source path.
+        @type parser: class
+        @param parser: parser class.
+
+        @rtype: string
+        @return: absolute path of the cached graph (which may not exist).
+        """
+        source = os.path.abspath(source)
+        stat = os.stat(source)
+        key = (source, stat.st_mtime, stat.st_size, "{}.{}".format(parser.__module__, parser.__name__))
+        return os.path.join(self.directory, hashlib.sha1(repr(key)).hexdigest() + CACHE_EXTENSION)
+
+    def size(self):
+        """
+        Returns the number of bytes currently stored in the cache.
+
+        size() -> size
+
+        @rtype: int
+        @return: number of cached bytes.
+        """
+        return sum(size for (mtime, size, file_path) in self._entries())
+
+    def clear(self):
+        """
+        Removes every cached graph.
+
+        clear() -> None
+        """
+        for (mtime, size, file_path) in self._entries():
+            self._remove(file_path)
+
+    def _load(self, file_path):
+        #Unpickling allocates millions of objects: the cyclic collector would rescan them all.
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            file_stream = open(file_path, "rb")
+            try:
+                return pickle.load(file_stream)
+            finally:
+                file_stream.close()
+        finally:
+            if enabled:
+                gc.enable()
+
+    def _store(self, graph, file_path):
+        #Written aside and renamed, so that concurrent readers never see a partial graph.
+        fd, tmp_path = tempfile.mkstemp(suffix = ".tmp", dir = self.directory)
+        try:
+            file_stream = os.fdopen(fd, "wb")
+            try:
+                pickle.dump(graph, file_stream, pickle.HIGHEST_PROTOCOL)
+            finally:
+                file_stream.close()
+            os.rename(tmp_path, file_path)
+        except (pickle.PicklingError, TypeError, RuntimeError):
+            #Graphs that cannot be pickled (or are too deep to) are just not cached.
+            self._remove(tmp_path)
+            return
+        except:
+            self._remove(tmp_path)
+            raise
+        self._evict(file_path)
+
+    def _entries(self):
+        entries = []
+        for file_name in os.listdir(self.directory):
+            if not file_name.endswith(CACHE_EXTENSION):
+                continue
+            file_path = os.path.join(self.directory, file_name)
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, file_path))
+        return entries
+
+    def _evict(self, keep_path):
+        entries = sorted(self._entries())
+        total = sum(size for (mtime, size, file_path) in entries)
+        for (mtime, size, file_path) in entries:
+            if total <= self.max_size:
+                break
+            if file_path == keep_path:
+                continue
+            self._remove(file_path)
+            total -= size
+
+    def _remove(self, file_path):
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
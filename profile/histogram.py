@@ -0,0 +1,121 @@
+#Histogram parameters
+SIGNIFICANT_BITS = 7
+UNIT = 1e-9
+PERCENTILES = [50, 99, 99.9]
+DEFAULT_LATENCY_BATCH = 1 #operations per timestamp: larger batches cut the overhead, but record batch means
+BATCH_CALIBRATION = 16 #empty batches timed to estimate the per-batch overhead
+
+class LatencyHistogram:
+    """
+    HDR-style log-bucketed latency histogram.
+    Latencies are stored in nanoseconds; every power-of-two range is split into 2^(SIGNIFICANT_BITS - 1)
+    linear buckets, so that any recorded value is known within a relative error of 2^-(SIGNIFICANT_BITS - 1),
+    whatever its magnitude, in a memory bounded by the number of distinct magnitudes.
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.overhead = 0.0 #total instrumentation seconds
+
+    def record(self, latency, count = 1):
+        """
+        Records count occurrences of the specified latency.
+
+        record(latency, count = 1) -> None
+
+        @type latency: float
+        @param latency: latency in seconds.
+        @type count: int
+        @param count: number of occurrences.
+        """
+        value = max(0, int(round(latency / UNIT)))
+        shift = max(0, _bit_length(value) - SIGNIFICANT_BITS)
+        key = (value >> shift) << shift
+        self.counts[key] = self.counts.get(key, 0) + count
+        self.count += count
+        self.total += value * count
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """
+        Adds every latency recorded by other to this histogram.
+
+        merge(other) -> None
+
+        @type other: LatencyHistogram
+        @param other: histogram to be merged.
+        """
+        for key, count in other.counts.iteritems():
+            self.counts[key] = self.counts.get(key, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        self.overhead += other.overhead
+
+    def percentile(self, p):
+        """
+        Returns the p-th percentile latency, i.e. the upper bound of the bucket holding it
+        (capped to the maximum recorded latency).
+
+        percentile(p) -> latency
+
+        @type p: number
+        @param p: percentile, in [0, 100].
+
+        @rtype: float
+        @return: latency in seconds (0 if nothing was recorded).
+        """
+        if self.count == 0:
+            return 0.0
+        rank = p / 100.0 * self.count
+        seen = 0
+        for key in sorted(self.counts):
+            seen += self.counts[key]
+            if seen >= rank:
+                shift = max(0, _bit_length(key) - SIGNIFICANT_BITS)
+                return min(key + (1 << shift) - 1, self.max) * UNIT
+        return self.max * UNIT
+
+    def summary(self):
+        """
+        Returns the summary of the recorded latencies.
+
+        summary() -> summary
+
+        @rtype: dictionary
+        @return: Count, Mean, P50, P99, P999, Max and Overhead (instrumentation cost), all per operation in seconds.
+        """
+        summary = {"Count": self.count,
+                   "Mean": self.total * UNIT / self.count if self.count else 0.0,
+                   "Max": self.max * UNIT,
+                   "Overhead": self.overhead / self.count if self.count else 0.0}
+        for p in PERCENTILES:
+            summary["P" + str(p).replace(".", "")] = self.percentile(p)
+        return summary
+
+def make_latency_table(rows, label):
+    """
+    Makes a table-as-string of latency summaries.
+
+    make_latency_table(rows, label) -> table
+
+    @type rows: list of tuples
+    @param rows: (name, X, summary) triples, summary as returned by LatencyHistogram.summary.
+    @type label: string
+    @param label: table title.
+
+    @rtype: string
+    @return: the table.
+    """
+    lines = [label, "", "\t".join(["Series", "X", "Count", "P50", "P99", "P999", "Max", "Overhead"])]
+    for name, x, summary in rows:
+        values = [summary["P50"], summary["P99"], summary["P999"], summary["Max"], summary["Overhead"]]
+        lines.append("\t".join([str(name), str(x), str(summary["Count"])] + ["{:.6e}".format(value) for value in values]))
+    return "\n".join(lines) + "\n"
+
+def _bit_length(value):
+    return len(bin(value)) - 2 if value > 0 else 0
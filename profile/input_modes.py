@@ -0,0 +1,95 @@
+#Input Modes Imports
+import ctypes, ctypes.util, io, mmap, os
+
+#Input modes: how a map reaches the parser
+STRING = "string" #parse_string on bytes already in memory
+FILE = "file" #parse_file on the map path
+STREAM = "stream" #bytes read through a buffered stream, then parse_string
+MMAP = "mmap" #bytes copied out of a read-only memory mapping, then parse_string
+INPUT_MODES = [STRING, FILE, STREAM, MMAP]
+
+#Page cache state of the map file before every read
+WARM = "warm"
+COLD = "cold"
+CACHE_STATES = [WARM, COLD]
+
+STREAM_BUFFER = 1 << 16
+STREAM_CHUNK = 1 << 16
+POSIX_FADV_DONTNEED = 4
+
+_libc = None
+
+def read(mode, path):
+    """
+    Reads a map file the way the specified input mode does (FILE reads it plainly, as parse_file would).
+
+    read(mode, path) -> map
+
+    @type mode: string
+    @param mode: one of INPUT_MODES, but STRING.
+    @type path: string
+    @param path: map path.
+
+    @rtype: string
+    @return: map bytes.
+    """
+    if mode == STREAM:
+        chunks = []
+        with io.open(path, "rb", buffering = STREAM_BUFFER) as source:
+            chunk = source.read(STREAM_CHUNK)
+            while chunk:
+                chunks.append(chunk)
+                chunk = source.read(STREAM_CHUNK)
+        return "".join(chunks)
+    elif mode == MMAP:
+        with open(path, "rb") as source:
+            if os.fstat(source.fileno()).st_size == 0:
+                return ""
+            mapping = mmap.mmap(source.fileno(), 0, access = mmap.ACCESS_READ)
+            try:
+                return mapping[:]
+            finally:
+                mapping.close()
+    elif mode == FILE:
+        with open(path, "rb") as source:
+            return source.read()
+    raise ValueError("Unsupported input mode {}.".format(str(mode)))
+
+def drop_cache(path):
+    """
+    Evicts the pages of a file from the page cache (posix_fadvise DONTNEED), so that the next read
+    goes to the device. The file is synced first: DONTNEED leaves dirty pages, such as those of a
+    freshly generated map, in the cache.
+
+    drop_cache(path) -> dropped
+
+    @type path: string
+    @param path: file path.
+
+    @rtype: boolean
+    @return: True if the kernel was advised, False where posix_fadvise is not available.
+    """
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno = True)
+    if not hasattr(_libc, "posix_fadvise"):
+        return False
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        getattr(os, "fdatasync", os.fsync)(fd)
+        return _libc.posix_fadvise(fd, ctypes.c_longlong(0), ctypes.c_longlong(0), POSIX_FADV_DONTNEED) == 0
+    finally:
+        os.close(fd)
+
+def warm_cache(path):
+    """
+    Reads a whole file, so that its pages are in the page cache.
+
+    warm_cache(path) -> None
+
+    @type path: string
+    @param path: file path.
+    """
+    with open(path, "rb") as source:
+        while source.read(STREAM_CHUNK):
+            pass
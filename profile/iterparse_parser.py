@@ -0,0 +1,198 @@
+#Iterparse Parser Imports
+from model.graph import GraphIncidenceList
+from cStringIO import StringIO
+from array import array
+from bisect import bisect_left
+import xml.etree.cElementTree as cET
+import math
+
+class IterparseParser:
+    """
+    Streaming OSM parser.
+    The document is read by cElementTree.iterparse and every node and way is added to the graph as soon
+    as its end tag is read, then cleared together with everything the root still holds: the working
+    memory is bounded by the largest element, not by the map, and only the result grows with the input.
+    Ways give arcs as described in add_way (a node declared after the way referencing it has no known coordinate yet).
+    The node coordinates ways are weighted by are part of the result: the returned graph carries them
+    as its coordinates attribute (see NodeCoordinates).
+    """
+
+    def parse_file(self, source):
+        """
+        Parses an OSM file into a graph.
+
+        parse_file(source) -> graph
+
+        @type source: string or file-like object
+        @param source: OSM file path, or stream.
+
+        @rtype: GraphIncidenceList
+        @return: the parsed graph.
+        """
+        graph = GraphIncidenceList()
+        coords = NodeCoordinates()
+        events = cET.iterparse(source, events = ("start", "end"))
+        root = None
+        for event, element in events:
+            if event == "start":
+                if root is None:
+                    root = element
+                continue
+            tag = element.tag
+            if tag == "node":
+                id = int(element.get("id"))
+                coord = (float(element.get("lat")), float(element.get("lon")))
+                coords.add(id, coord)
+                graph.add_node(id, coord)
+            elif tag == "way":
+                add_way(graph, coords, [int(nd.get("ref")) for nd in element.iterfind("nd")])
+            else:
+                continue
+            element.clear()
+            #Cleared elements are still children of the root: they are dropped as well.
+            root.clear()
+        graph.coordinates = coords
+        return graph
+
+    def parse_string(self, string):
+        """
+        Parses an OSM string into a graph.
+
+        parse_string(string) -> graph
+
+        @type string: string
+        @param string: OSM map.
+
+        @rtype: GraphIncidenceList
+        @return: the parsed graph.
+        """
+        return self.parse_file(StringIO(string))
+
+class NodeCoordinates:
+    """
+    Compact node id -> (lat, lon) mapping, in three machine arrays.
+    OSM documents list nodes by ascending id: such ids are appended to the arrays and looked up by
+    bisection, and only ids out of that order fall back to a dictionary.
+    """
+
+    def __init__(self):
+        self._ids = array("l")
+        self._lats = array("d")
+        self._lons = array("d")
+        self._unordered = {}
+
+    def add(self, id, coord):
+        """
+        Adds the coordinate of a node.
+
+        add(id, coord) -> None
+
+        @type id: int
+        @param id: node id.
+        @type coord: tuple
+        @param coord: (lat, lon).
+        """
+        ids = self._ids
+        if not ids or id > ids[-1]:
+            ids.append(id)
+            self._lats.append(coord[0])
+            self._lons.append(coord[1])
+        else:
+            self._unordered[id] = coord
+
+    def get(self, id, default = None):
+        """
+        Returns the coordinate of a node.
+
+        get(id, default = None) -> coord
+
+        @type id: int
+        @param id: node id.
+        @type default: object
+        @param default: value returned for unknown nodes.
+
+        @rtype: tuple
+        @return: (lat, lon), or default.
+        """
+        coord = self._unordered.get(id)
+        if coord is not None:
+            return coord
+        ids = self._ids
+        k = bisect_left(ids, id)
+        if k < len(ids) and ids[k] == id:
+            return (self._lats[k], self._lons[k])
+        return default
+
+    def __len__(self):
+        return len(self._ids) + len(self._unordered)
+
+def add_way(graph, coords, refs):
+    """
+    Adds the arcs of a way to a graph: both directions between consecutive nodes, weighted by the distance
+    of their coordinates (1 when a node coordinate is unknown).
+
+    add_way(graph, coords, refs) -> None
+
+    @type graph: graph
+    @param graph: graph under construction.
+    @type coords: dictionary or NodeCoordinates
+    @param coords: node id -> (lat, lon).
+    @type refs: list of int
+    @param refs: ids of the way nodes, in order.
+    """
+    for tail, head in zip(refs, refs[1:]):
+        weight = _distance(coords.get(tail), coords.get(head))
+        graph.add_arc(tail, head, weight)
+        graph.add_arc(head, tail, weight)
+
+def _distance(tail, head):
+    if tail is None or head is None:
+        return 1
+    return math.hypot(tail[0] - head[0], tail[1] - head[1])
+
+def __test(sizes, adjacency):
+    """
+    Iterparse Parser Test: checks the node coordinates returned with the graph, and that the Working Bytes
+    (see measure_memory) stay roughly flat while the map grows (where tracemalloc can measure them).
+
+    __test(sizes, adjacency) -> None
+
+    @type sizes: list of int
+    @param sizes: numbers of nodes and ways of the maps, ascending.
+    @type adjacency: int
+    @param adjacency: number of adjacent nodes / way.
+    """
+    from control.profile.generator.osm_generator import OsmGenerator
+    from control.profile.memory import measure_memory
+    print "### iPATH TEST ITERPARSE PARSER"
+    print "### Sizes: {}, Adjacency: {}\n".format(str(sizes), str(adjacency))
+    coords = NodeCoordinates()
+    for id, coord in [(3, (0.5, 1.5)), (7, (2.0, 3.0)), (5, (4.0, 5.0)), (7, (6.0, 7.0))]:
+        coords.add(id, coord)
+    assert len(coords) == 4 and coords.get(3) == (0.5, 1.5) and coords.get(5) == (4.0, 5.0)
+    assert coords.get(7) == (6.0, 7.0) and coords.get(4) is None and coords.get(8, 0) == 0
+
+    generator = OsmGenerator()
+    generator.adjacency, generator.seed = adjacency, 0
+    working = []
+    for size in sizes:
+        generator.num_nodes = generator.num_ways = size
+        string = generator.generate()
+        expected = dict((int(element.get("id")), (float(element.get("lat")), float(element.get("lon")))) for event, element in cET.iterparse(StringIO(string)) if element.tag == "node")
+        graph = IterparseParser().parse_string(string)
+        assert len(graph.coordinates) == size and all(graph.coordinates.get(id) == coord for id, coord in expected.items())
+        graph = None
+        memory = measure_memory(lambda: IterparseParser().parse_string(string))
+        print "Size: {}, Result Bytes: {}, Working Bytes: {}".format(str(size), str(memory["Result Bytes"]), str(memory["Working Bytes"]))
+        working.append(memory["Working Bytes"] if memory["Peak Traced"] is not None else None)
+    if None in working:
+        print "Working Bytes are only told apart from the result under tracemalloc: flatness not checked."
+    else:
+        #A working memory linear in the map would grow by the ratio of the sizes.
+        assert working[-1] < working[0] * 2 + (1 << 16), "working memory grows with the map"
+    print "\n### END OF TEST ###\n"
+
+if __name__ == "__main__":
+    sizes = [5000, 20000]
+    adjacency = 5
+    __test(sizes, adjacency)
@@ -0,0 +1,169 @@
+#Memory Imports
+import sys, os, gc, resource, threading
+from array import array
+from collections import deque
+try:
+    import tracemalloc
+except ImportError:
+    #Python 2 provides it only through the pytracemalloc patch.
+    tracemalloc = None
+
+#Containers whose items are owned by the container
+_CONTAINERS = (list, tuple, set, frozenset, deque)
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+#ru_maxrss is in kilobytes on Linux, in bytes on OS X
+MAX_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+DEFAULT_RSS_INTERVAL = 0.001
+
+def deep_size(obj):
+    """
+    Returns the bytes held by an object graph: the object, and everything reachable from it through
+    containers, dictionaries, instance attributes and slots. Shared objects are counted once;
+    classes, modules and functions are not counted.
+
+    deep_size(obj) -> size
+
+    @type obj: object
+    @param obj: root object.
+
+    @rtype: int
+    @return: bytes.
+    """
+    seen = set()
+    stack = [obj]
+    size = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, (type, type(sys), type(deep_size))) or type(obj).__name__ == "classobj":
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.iterkeys())
+            stack.extend(obj.itervalues())
+        elif isinstance(obj, _CONTAINERS):
+            stack.extend(obj)
+        elif isinstance(obj, (basestring, int, long, float, array)):
+            continue
+        if hasattr(obj, "__dict__"):
+            stack.append(obj.__dict__)
+        for slot in getattr(type(obj), "__slots__", ()):
+            if hasattr(obj, slot):
+                stack.append(getattr(obj, slot))
+    return size
+
+def rss():
+    """
+    Returns the resident set size of this process.
+
+    rss() -> size
+
+    @rtype: int
+    @return: bytes (None where /proc is not available).
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * PAGE_SIZE
+    except (IOError, IndexError, ValueError):
+        return None
+
+def max_rss():
+    """
+    Returns the resident set size high-water mark of this process (monotonic over its whole life).
+
+    max_rss() -> size
+
+    @rtype: int
+    @return: bytes.
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * MAX_RSS_UNIT
+
+class RSSSampler:
+    """
+    Background thread sampling the resident set size, to catch the peak of a computation
+    (which ru_maxrss cannot isolate once the process has been larger).
+    """
+
+    def __init__(self, interval = DEFAULT_RSS_INTERVAL):
+        self.interval = interval
+        self.peak = None
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Starts sampling.
+
+        start() -> None
+        """
+        self.peak = rss()
+        self._stopped.clear()
+        self._thread = threading.Thread(target = self._sample)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops sampling.
+
+        stop() -> peak
+
+        @rtype: int
+        @return: peak resident set size in bytes (None where /proc is not available).
+        """
+        self._stopped.set()
+        self._thread.join()
+        self._update()
+        return self.peak
+
+    def _sample(self):
+        while not self._stopped.wait(self.interval):
+            self._update()
+
+    def _update(self):
+        size = rss()
+        if size is not None and size > self.peak:
+            self.peak = size
+
+def measure_memory(function, interval = DEFAULT_RSS_INTERVAL):
+    """
+    Calls function once, measuring its memory: the peak of traced allocations and the blocks it left
+    allocated (if tracemalloc is available), the peak resident set size above the one at the call,
+    the process high-water mark after the call, and the deep size of the result.
+
+    measure_memory(function, interval = DEFAULT_RSS_INTERVAL) -> memory
+
+    @type function: function
+    @param function: function(), the computation to be measured.
+    @type interval: float
+    @param interval: seconds between resident set size samples.
+
+    @rtype: dictionary
+    @return: Peak Traced, Traced Blocks, Peak RSS, Max RSS, Result Bytes and Working Bytes (the peak
+    beyond the result, i.e. the transient memory of the computation), in bytes or counts, None when not
+    measurable here.
+    """
+    gc.collect()
+    tracing = tracemalloc is not None and not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+    sampler = RSSSampler(interval)
+    baseline = rss()
+    sampler.start()
+    try:
+        result = function()
+    finally:
+        peak = sampler.stop()
+        if tracing:
+            peak_traced = tracemalloc.get_traced_memory()[1]
+            blocks = sum(statistic.count for statistic in tracemalloc.take_snapshot().statistics("filename"))
+            tracemalloc.stop()
+    memory = {"Peak Traced": peak_traced if tracing else None,
+              "Traced Blocks": blocks if tracing else None,
+              "Peak RSS": peak - baseline if baseline is not None else None,
+              "Max RSS": max_rss(),
+              "Result Bytes": deep_size(result)}
+    peak = memory["Peak Traced"] if tracing else memory["Peak RSS"]
+    memory["Working Bytes"] = max(0, peak - memory["Result Bytes"]) if peak is not None else None
+    return memory
@@ -0,0 +1,110 @@
+#Operands Imports
+import random
+
+#Operands parameters
+DEFAULT_SEED = 0
+RESIDUAL_ROUNDS = 5
+
+def stream(seed, repetition):
+    """
+    Returns the random stream of a repetition, so that every repetition replays different
+    operands while the whole run stays reproducible.
+
+    stream(seed, repetition) -> rand
+
+    @type seed: int
+    @param seed: run seed.
+    @type repetition: int
+    @param repetition: repetition index.
+
+    @rtype: random.Random
+    @return: seeded random stream.
+    """
+    return random.Random(seed * 1000003 + repetition)
+
+def choices(rand, population, count):
+    """
+    Draws count operands uniformly (with replacement) from population.
+
+    choices(rand, population, count) -> operands
+
+    @type rand: random.Random
+    @param rand: random stream.
+    @type population: list
+    @param population: non-empty candidates.
+    @type count: int
+    @param count: number of operands.
+
+    @rtype: list
+    @return: operands.
+    """
+    n = len(population)
+    uniform = rand.random
+    return [population[int(uniform() * n)] for i in range(count)]
+
+def growing_choices(rand, population, initial, count):
+    """
+    Draws count operands, the i-th uniformly from the first initial + i items of population,
+    i.e. from a pool that grows by one item after every draw (e.g. the parents of tree inserts).
+
+    growing_choices(rand, population, initial, count) -> operands
+
+    @type rand: random.Random
+    @param rand: random stream.
+    @type population: list
+    @param population: candidates, in insertion order (at least initial + count - 1 items).
+    @type initial: int
+    @param initial: size of the pool before the first draw (at least 1).
+    @type count: int
+    @param count: number of operands.
+
+    @rtype: list
+    @return: operands.
+    """
+    uniform = rand.random
+    return [population[int(uniform() * (initial + i))] for i in range(count)]
+
+def residual_overhead(timer, operands):
+    """
+    Measures the per-iteration cost of replaying an operand array, i.e. of the indexing left in the
+    timed loops (once per operand column) beyond the empty-loop overhead already subtracted by timer.
+
+    residual_overhead(timer, operands) -> seconds
+
+    @type timer: Timer
+    @param timer: calibrated timer.
+    @type operands: list
+    @param operands: non-empty operand array.
+
+    @rtype: float
+    @return: residual seconds per iteration (the minimum over RESIDUAL_ROUNDS).
+    """
+    now = timer.now
+    count = len(operands)
+    residuals = []
+    for r in range(RESIDUAL_ROUNDS):
+        start = now()
+        for j in range(count):
+            operands[j]
+        end = now()
+        residuals.append(timer.elapsed(start, end, count) / count)
+    return min(residuals)
+
+def make_overhead_table(rows, label):
+    """
+    Makes a table-as-string of loop overheads.
+
+    make_overhead_table(rows, label) -> table
+
+    @type rows: list of tuples
+    @param rows: (name, X, subtracted, residual) tuples, in seconds per iteration.
+    @type label: string
+    @param label: table title.
+
+    @rtype: string
+    @return: the table.
+    """
+    lines = [label, "", "\t".join(["Series", "X", "Subtracted", "Residual"])]
+    for name, x, subtracted, residual in rows:
+        lines.append("\t".join([str(name), str(x), "{:.6e}".format(subtracted), "{:.6e}".format(residual)]))
+    return "\n".join(lines) + "\n"
@@ -4,29 +4,75 @@ from exception.exceptions import UnsupportedParserError
 from control.parse.c_element_tree import cElementTreeParser as cElementTree
 from control.parse.element_tree import ElementTreeParser as ElementTree
 from control.parse.sax import SaxParser as Sax
-from control.profile.generator.osm_generator import OsmGenerator
+from control.profile.iterparse_parser import IterparseParser as Iterparse
+from control.profile.sharded_parser import ShardedParser
+from control.profile.generator.osm_generator import OsmGenerator, DEFAULT_EXPANSION
+from control.profile.generator.map_cache import MapCache, FORMAT_XML
+from control.profile.executor import execute, worker_counts
+from control.profile.sweep import plan, run, run_groups, LINEAR, DEFAULT_POINTS, DEFAULT_MIN_INPUT, DEFAULT_REFINE_ROUNDS, DEFAULT_REFINE_POINTS
 from control.plot.plotter_controller import make_plot, save_plot, make_table, save_table
-from utils.math_utils import average
+from control.profile.stats import summarize
+from control.profile.sampling import collect, DEFAULT_TARGET_CI, DEFAULT_MIN_SAMPLES, DEFAULT_MAX_SAMPLES, DEFAULT_CELL_BUDGET
+from control.profile.stats_plotter import make_error_plot, make_error_table
+from control.profile.complexity import fit, is_worse, make_fit_table, LINEAR as O_N
+from control.profile.timer import get_timer, WALL
+from control.profile.memory import measure_memory, DEFAULT_RSS_INTERVAL
+from control.profile.compression import open_compressed, decompressed_size, available_compressions
+from control.profile.input_modes import read, drop_cache, warm_cache, STRING, FILE, STREAM, MMAP, INPUT_MODES, WARM, COLD
 import os
-from time import clock
 
 C_ELEMENT_TREE = 0
 ELEMENT_TREE = 1
 SAX = 2
-PARSERS = [C_ELEMENT_TREE, ELEMENT_TREE, SAX]
-PARSERS_INSTANCE = {C_ELEMENT_TREE: cElementTree, ELEMENT_TREE: ElementTree, SAX: Sax}
-PARSERS_NAME = {C_ELEMENT_TREE: "cElementTree", ELEMENT_TREE: "ElementTree", SAX: "Sax"}
+ITERPARSE = 3
+PARSERS = [C_ELEMENT_TREE, ELEMENT_TREE, SAX, ITERPARSE]
+PARSERS_INSTANCE = {C_ELEMENT_TREE: cElementTree, ELEMENT_TREE: ElementTree, SAX: Sax, ITERPARSE: Iterparse}
+PARSERS_NAME = {C_ELEMENT_TREE: "cElementTree", ELEMENT_TREE: "ElementTree", SAX: "Sax", ITERPARSE: "Iterparse"}
+#Expected asymptotic class of parsing a map of X nodes and X ways
+EXPECTED_COMPLEXITY = O_N
+#Memory metrics of memory mode (see measure_memory), in bytes but for the block count
+MEMORY_METRICS = ["Peak Traced", "Traced Blocks", "Peak RSS", "Max RSS", "Result Bytes", "Working Bytes"]
+#Per-cell measures listed apart from the times (see _split_extras)
+EXTRAS = ["Memory", "Input", "Compressed"]
+#Parsers whose parse_file reads a stream incrementally: compressed maps are decompressed while parsed
+STREAMING_PARSERS = [ITERPARSE]
 
 PARAMS = {"parser": C_ELEMENT_TREE, 
           "max_input": 20000, 
+          "sweep": LINEAR,
+          "points": DEFAULT_POINTS,
+          "min_input": DEFAULT_MIN_INPUT,
+          "inputs": [],
+          "refine_rounds": DEFAULT_REFINE_ROUNDS,
+          "refine_points": DEFAULT_REFINE_POINTS,
           "adjacency": 10, 
           "average_bound": 50, 
+          "adaptive": False,
+          "target_ci": DEFAULT_TARGET_CI,
+          "min_samples": DEFAULT_MIN_SAMPLES,
+          "max_samples": DEFAULT_MAX_SAMPLES,
+          "cell_budget": DEFAULT_CELL_BUDGET,
+          "clock": WALL,
+          "seed": 0,
+          "map_cache": True,
+          "map_cache_size": 1 << 30,
+          "memory": False,
+          "rss_interval": DEFAULT_RSS_INTERVAL,
+          "input_mode": STRING,
+          "page_cache": WARM,
+          "shard_workers": None,
+          "compression": None,
+          "parallel": False,
+          "workers": None,
+          "pin_workers": True,
           "output_dir": OUTPUT_DIR}
 
 class ParserProfiler(baseprofiler):    
     
     def __init__(self):        
         self._random_generator = OsmGenerator()
+        self._map_cache = None
+        self._timer = get_timer(PARAMS["clock"])
         
     def profile(self, params = {}):  
         """
@@ -44,39 +90,262 @@ class ParserProfiler(baseprofiler):
                 
         parser = params["parser"]
         max_input = params["max_input"]
-        adjacency = params["adjacency"]
-        average_bound = params["average_bound"]
  
+        if parser not in PARSERS_INSTANCE:
+            raise UnsupportedParserError()
+           
+        data = {"Parser": PARSERS_NAME[parser], "Max Input": max_input, "Clock": params["clock"], "X": [], "Time": [], "Stats": []}        
+        
+        data["X"], data["Stats"] = run(lambda X: self._profile_cell(params, X), params)
+        data["Time"] = [stats["Median"] for stats in data["Stats"]]
+        self._split_extras(data)
+        data["Max Input"] = max(data["X"] or [max_input])
+        self._fit(data)
+            
+        return [data]        
+    
+    def _profile_cell(self, params, X):
+        """
+        Profiles the parser specified in params on the OSM Map with X nodes and X ways.
+        
+        _profile_cell(params, X) -> stats
+        
+        @type params: dictionary
+        @param params: parameters for the analysis.
+        @type X: int
+        @param X: number of nodes and ways.
+        
+        @rtype: dictionary
+        @return: summary of the parsing times.
+        """
         try:
-            parser_instance = PARSERS_INSTANCE[parser]()
+            parser_instance = PARSERS_INSTANCE[params["parser"]]()
         except KeyError:
             raise UnsupportedParserError()
-           
-        data = {"Parser": PARSERS_NAME[parser], "Max Input": max_input, "X": [], "Time": []}        
         
-        interval = max_input / 10
+        mode = params["input_mode"]
+        if mode not in INPUT_MODES:
+            raise ValueError("Unsupported input mode {}.".format(str(mode)))
+        self._timer = get_timer(params["clock"])
+        now = self._timer.now
         
-        for X in range(0, max_input + 1, interval):
-            self._random_generator.num_nodes = X
-            self._random_generator.num_ways = X
-            self._random_generator.adjacency = adjacency
-            osm = self._random_generator.generate()
-            
-            raw_data = []
-            
-            for r in range(average_bound):
-                start = clock()
+        compression = params["compression"]
+        streaming = params["parser"] in STREAMING_PARSERS
+        if compression is not None:
+            path = self._get_map_path(params, X, params["adjacency"], compression)
+            stats = self._profile_compressed(parser_instance, path, compression, streaming, params)
+        elif mode == STRING:
+            osm = self._get_map(params, X, params["adjacency"])
+            def measure(r):
+                start = now()
                 parser_instance.parse_string(osm)
-                stop = clock()
-                elapsed = (stop - start)
-                raw_data.append(elapsed)
-            
-            averageElapsedTime = average(raw_data)
+                stop = now()
+                return self._timer.elapsed(start, stop)
             
-            data["X"].append(X)
-            data["Time"].append(averageElapsedTime)
-            
-        return [data]        
+            raw_data = collect(measure, params)
+            stats = summarize(raw_data)
+        else:
+            path = self._get_map_path(params, X, params["adjacency"])
+            stats = self._profile_input(parser_instance, path, mode, params)
+        
+        if params["memory"]:
+            #Measured on a parse of its own, as tracing would slow down the timed ones.
+            if compression is not None:
+                parse = lambda: _parse_compressed(parser_instance, path, compression, streaming)
+            elif mode == STRING:
+                parse = lambda: parser_instance.parse_string(osm)
+            elif mode == FILE:
+                parse = lambda: parser_instance.parse_file(path)
+            else:
+                parse = lambda: parser_instance.parse_string(read(mode, path))
+            stats["Memory"] = measure_memory(parse, params["rss_interval"])
+        return stats
+    
+    def _profile_input(self, parser_instance, path, mode, params):
+        """
+        Profiles a parser reading the map file through the specified input mode, splitting every
+        parse into I/O (reading the bytes) and parsing. In FILE mode, parse_file reads and parses
+        at once: its I/O is estimated by a plain read of the file in the same page cache state.
+        
+        _profile_input(parser_instance, path, mode, params) -> stats
+        
+        @type parser_instance: parser
+        @param parser_instance: parser, providing parse_string and parse_file.
+        @type path: string
+        @param path: map path.
+        @type mode: string
+        @param mode: one of INPUT_MODES, but STRING.
+        @type params: dictionary
+        @param params: parameters for the analysis.
+        
+        @rtype: dictionary
+        @return: summary of the end-to-end times, with Input: Mode, Cache (the page cache state
+        actually obtained), Bytes, IO, Parse (median seconds) and MB/s, IO MB/s, Parse MB/s.
+        """
+        now = self._timer.now
+        elapsed = self._timer.elapsed
+        cold = params["page_cache"] == COLD
+        def prepare():
+            if cold:
+                return drop_cache(path)
+            warm_cache(path)
+            return False
+        
+        splits = []
+        dropped = []
+        def measure(r):
+            dropped.append(prepare())
+            if mode == FILE:
+                start = now()
+                parser_instance.parse_file(path)
+                stop = now()
+                total = elapsed(start, stop)
+                prepare()
+                start = now()
+                read(FILE, path)
+                stop = now()
+                io = min(elapsed(start, stop), total)
+            else:
+                start = now()
+                osm = read(mode, path)
+                middle = now()
+                parser_instance.parse_string(osm)
+                stop = now()
+                total = elapsed(start, stop)
+                io = elapsed(start, middle)
+            splits.append((io, total - io))
+            return total
+        
+        stats = summarize(collect(measure, params))
+        size = os.path.getsize(path)
+        io = _median([split[0] for split in splits])
+        parse = _median([split[1] for split in splits])
+        stats["Input"] = {"Mode": mode, "Cache": COLD if cold and all(dropped) else WARM, "Bytes": size, "IO": io, "Parse": parse,
+                          "MB/s": _throughput(size, stats["Median"]), "IO MB/s": _throughput(size, io), "Parse MB/s": _throughput(size, parse)}
+        return stats
+    
+    def _profile_compressed(self, parser_instance, path, compression, streaming, params):
+        """
+        Profiles a parser reading a compressed map file, splitting every parse into I/O (reading the
+        compressed bytes), decompression and parsing. Streaming parsers parse the decompressed stream
+        while it is read; the others parse the decompressed string. Decompression is timed on a read of
+        the decompressed stream alone, in the same page cache state, and parsing is the remainder.
+        
+        _profile_compressed(parser_instance, path, compression, streaming, params) -> stats
+        
+        @type parser_instance: parser
+        @param parser_instance: parser, providing parse_string and parse_file.
+        @type path: string
+        @param path: compressed map path.
+        @type compression: string
+        @param compression: one of COMPRESSIONS.
+        @type streaming: boolean
+        @param streaming: True if parser_instance.parse_file reads streams.
+        @type params: dictionary
+        @param params: parameters for the analysis.
+        
+        @rtype: dictionary
+        @return: summary of the end-to-end times, with Compressed: Compression, Cache, Bytes (decompressed),
+        Compressed Bytes, Ratio, IO, Decompress, Parse (median seconds) and MB/s, Decompress MB/s
+        (of decompressed bytes).
+        """
+        now = self._timer.now
+        elapsed = self._timer.elapsed
+        cold = params["page_cache"] == COLD
+        def prepare():
+            if cold:
+                return drop_cache(path)
+            warm_cache(path)
+            return False
+        
+        splits = []
+        dropped = []
+        def measure(r):
+            dropped.append(prepare())
+            start = now()
+            _parse_compressed(parser_instance, path, compression, streaming)
+            stop = now()
+            total = elapsed(start, stop)
+            prepare()
+            start = now()
+            read(FILE, path)
+            stop = now()
+            io = elapsed(start, stop)
+            prepare()
+            start = now()
+            decompressed_size(path, compression)
+            stop = now()
+            decompress = elapsed(start, stop)
+            splits.append((min(io, decompress), max(0.0, decompress - io), max(0.0, total - decompress)))
+            return total
+        
+        stats = summarize(collect(measure, params))
+        size = decompressed_size(path, compression)
+        compressed_size = os.path.getsize(path)
+        io, decompress, parse = [_median([split[i] for split in splits]) for i in range(3)]
+        stats["Compressed"] = {"Compression": compression, "Cache": COLD if cold and all(dropped) else WARM, "Bytes": size, "Compressed Bytes": compressed_size,
+                               "Ratio": float(size) / compressed_size if compressed_size else 0.0, "IO": io, "Decompress": decompress, "Parse": parse,
+                               "MB/s": _throughput(size, stats["Median"]), "Decompress MB/s": _throughput(size, decompress)}
+        return stats
+    
+    def _get_map_path(self, params, X, adjacency, compression = None):
+        """
+        Returns the path of the cached OSM Map with X nodes and X ways to be parsed.
+        
+        _get_map_path(params, X, adjacency, compression = None) -> path
+        
+        @type params: dictionary
+        @param params: parameters for the analysis (the map cache must be enabled, with a seed).
+        @type X: int
+        @param X: number of nodes and ways.
+        @type adjacency: int
+        @param adjacency: number of adjacent nodes / way.
+        @type compression: string
+        @param compression: one of COMPRESSIONS, or None.
+        
+        @rtype: string
+        @return: the OSM Map path.
+        """
+        if not params["map_cache"] or params["seed"] is None:
+            raise ValueError("File and compressed inputs parse map files: they need the map cache and a seed.")
+        self._get_map_cache(params)
+        return self._map_cache.get_path(X, X, adjacency, DEFAULT_EXPANSION, params["seed"], FORMAT_XML, compression)
+    
+    def _get_map_cache(self, params):
+        cache_dir = os.path.join(params["output_dir"], "maps")
+        if self._map_cache is None or self._map_cache.directory != cache_dir:
+            self._map_cache = MapCache(cache_dir, params["map_cache_size"])
+        self._map_cache.max_size = params["map_cache_size"]
+        return self._map_cache
+    
+    def _get_map(self, params, X, adjacency):
+        """
+        Returns the OSM Map with X nodes and X ways to be parsed.
+        When the map cache is enabled and a seed is specified, the map is read from the cache
+        under the output directory, so that every parser and every run parses the same bytes.
+        
+        _get_map(params, X, adjacency) -> map
+        
+        @type params: dictionary
+        @param params: parameters for the analysis.
+        @type X: int
+        @param X: number of nodes and ways.
+        @type adjacency: int
+        @param adjacency: number of adjacent nodes / way.
+        
+        @rtype: string
+        @return: the OSM Map.
+        """
+        seed = params["seed"]
+        if params["map_cache"] and seed is not None:
+            return self._get_map_cache(params).get(X, X, adjacency, DEFAULT_EXPANSION, seed, FORMAT_XML)
+        
+        self._random_generator.num_nodes = X
+        self._random_generator.num_ways = X
+        self._random_generator.adjacency = adjacency
+        self._random_generator.expansion = DEFAULT_EXPANSION
+        self._random_generator.seed = seed
+        return self._random_generator.generate()
             
     def profile_all(self, params = {}):
         """
@@ -91,6 +360,8 @@ class ParserProfiler(baseprofiler):
         @return: profiling results.
         """        
         params = dict(PARAMS.items() + params.items())
+        if params["parallel"]:
+            return self._profile_all_parallel(params)
         dataset = []
         for parser in PARSERS:
             print "\t{} . . .".format(str(PARSERS_NAME[parser]))
@@ -98,55 +369,282 @@ class ParserProfiler(baseprofiler):
             dataset.append(self.profile(params)[0])
         return dataset
     
-    def plot_data(self, dataset, directory = PARAMS["output_dir"]):
+    def _profile_all_parallel(self, params):
+        """
+        Profiles all Parsers, farming every (parser, X) cell out to a pool of worker processes.
+        
+        _profile_all_parallel(params) -> data
+        
+        @type params: dictionary
+        @param params: parameters for the analysis.
+        
+        @rtype: list of dictionaries
+        @return: profiling results.
+        """
+        def measure_cells(cells):
+            if params["map_cache"] and params["seed"] is not None:
+                #Maps are generated once here, rather than concurrently by the workers.
+                for X in sorted(set(X for (parser, X) in cells)):
+                    self._get_map_path(params, X, params["adjacency"])
+                    if params["compression"] is not None:
+                        self._get_map_path(params, X, params["adjacency"], params["compression"])
+            cells = [dict(params.items() + [("parser", parser), ("X", X)]) for (parser, X) in cells]
+            return execute(_profile_cell, cells, params["workers"], params["pin_workers"])
+        
+        series = run_groups(measure_cells, PARSERS, params)
+        
+        dataset = []
+        for parser in PARSERS:
+            X, results = series[parser]
+            data = {"Parser": PARSERS_NAME[parser], "Max Input": max(X or [params["max_input"]]), "Clock": params["clock"], "X": X, "Time": [stats["Median"] for stats in results], "Stats": results}
+            self._split_extras(data)
+            self._fit(data)
+            dataset.append(data)
+        return dataset
+    
+    def profile_sharded(self, params = {}):
+        """
+        Profiles the ShardedParser at an increasing number of workers on the cached maps of the sweep,
+        against every serial Parser parsing the same files (parse_file, warm page cache).
+        
+        profile_sharded(params = {}) -> data
+        
+        @type params: dictionary
+        @param params: parameters for the analysis; shard_workers lists the worker counts
+        (None means the powers of two up to the available cores).
+        
+        @rtype: dictionary
+        @return: X, Workers, Serial (parser name -> times), Baseline (best serial parser at every X),
+        Sharded, Speedup and Efficiency (worker count -> values at every X).
+        """
+        params = dict(PARAMS.items() + params.items())
+        workers = params["shard_workers"] or worker_counts()
+        X = plan(params)
+        data = {"Max Input": max(X), "Clock": params["clock"], "X": X, "Workers": workers, "Baseline": [],
+                "Serial": dict((PARSERS_NAME[parser], []) for parser in PARSERS),
+                "Sharded": dict((count, []) for count in workers), "Speedup": dict((count, []) for count in workers), "Efficiency": dict((count, []) for count in workers)}
+        self._timer = get_timer(params["clock"])
+        for x in X:
+            path = self._get_map_path(params, x, params["adjacency"])
+            warm_cache(path)
+            for parser in PARSERS:
+                print "\t{} ({}) . . .".format(str(PARSERS_NAME[parser]), str(x))
+                data["Serial"][PARSERS_NAME[parser]].append(self._time_parse(PARSERS_INSTANCE[parser]().parse_file, path, params))
+            baseline, name = min((data["Serial"][PARSERS_NAME[parser]][-1], PARSERS_NAME[parser]) for parser in PARSERS)
+            data["Baseline"].append(name)
+            for count in workers:
+                print "\tSharded {} workers ({}) . . .".format(str(count), str(x))
+                time = self._time_parse(ShardedParser(count, params["pin_workers"]).parse_file, path, params)
+                speedup = baseline / time if time else float("inf")
+                data["Sharded"][count].append(time)
+                data["Speedup"][count].append(speedup)
+                data["Efficiency"][count].append(speedup / count)
+        return data
+    
+    def _time_parse(self, parse, path, params):
+        now = self._timer.now
+        def measure(r):
+            start = now()
+            parse(path)
+            stop = now()
+            return self._timer.elapsed(start, stop)
+        return summarize(collect(measure, params))["Median"]
+    
+    def sharded_data(self, data, directory = PARAMS["output_dir"]):
+        """
+        Stores to the specified directory a MathPlotLib plot of the speedup of the ShardedParser against
+        the worker count (one curve per input), and a table-as-string of the serial and sharded times.
+        
+        sharded_data(data, directory) -> None
+        
+        @type data: dictionary
+        @param data: the data computed by profile_sharded.
+        @type directory: string
+        @param directory: directory to store the computed plot and table.
+        """
+        file_name = "Sharded " + " ".join(str(count) for count in data["Workers"]) + " " + str(data["Max Input"])
+        file_path = os.path.join(directory, str(file_name))
+        plot_label = "Sharded parsing speedup vs best serial parser"
+        formatted_dataset = [[data["Workers"], [data["Speedup"][count][i] for count in data["Workers"]]] for i in range(len(data["X"]))]
+        formatted_dataset.append([data["Workers"], data["Workers"]])
+        legend = ["Input " + str(x) for x in data["X"]] + ["Ideal"]
+        plot = make_plot(formatted_dataset, plot_label, "Workers", "Speedup", legend)
+        save_plot(plot, file_path)
+        plot.close()
+        
+        serial = [PARSERS_NAME[parser] for parser in PARSERS]
+        lines = [plot_label, "", "\t".join(["Input"] + serial + ["Best"] + ["Sharded " + str(count) for count in data["Workers"]])]
+        for i, x in enumerate(data["X"]):
+            times = [data["Serial"][name][i] for name in serial] + [data["Sharded"][count][i] for count in data["Workers"]]
+            lines.append("\t".join([str(x)] + ["{:.6e}".format(time) for time in times[:len(serial)]] + [data["Baseline"][i]] + ["{:.6e}".format(time) for time in times[len(serial):]]))
+        lines += ["", "\t".join(["Input", "Workers", "Speedup", "Efficiency"])]
+        for i, x in enumerate(data["X"]):
+            for count in data["Workers"]:
+                lines.append("{}\t{}\t{:.3f}\t{:.3f}".format(str(x), str(count), data["Speedup"][count][i], data["Efficiency"][count][i]))
+        save_table("\n".join(lines) + "\n", file_path + ".txt")
+    
+    def _split_extras(self, data):
+        #Memory and input measures travel with the cell stats; they are listed apart, as the times are.
+        for extra in EXTRAS:
+            if data["Stats"] and all(extra in stats for stats in data["Stats"]):
+                data[extra] = [stats.pop(extra) for stats in data["Stats"]]
+    
+    def _file_suffix(self, dataset):
+        #Input mode, compression and page cache state of the dataset, so that their files do not overwrite each other.
+        if dataset[0].get("Input"):
+            measure = dataset[0]["Input"][0]
+            return " {} {}".format(str(measure["Mode"]), str(measure["Cache"]))
+        if dataset[0].get("Compressed"):
+            measure = dataset[0]["Compressed"][0]
+            return " {} {}".format(str(measure["Compression"]), str(measure["Cache"]))
+        return ""
+    
+    def _fit(self, data):
+        data["Fit"] = fit(data["X"], data["Time"])
+        data["Expected"] = EXPECTED_COMPLEXITY
+        data["Worse"] = is_worse(data["Fit"], EXPECTED_COMPLEXITY)
+    
+    def plot_data(self, dataset, directory = PARAMS["output_dir"], errors = True):
         """
         Stores to the specified directory a MathPlotLib plot based on the specified dataset.
         
-        plot_data(dataset, directory) -> None
+        plot_data(dataset, directory, errors = True) -> None
         
         @type dataset: list of dictionaries
         @param dataset: the dataset to be plotted.
         @type directory: string
         @param directory: directory to store the computed MatPlotLib plot.
+        @type errors: boolean
+        @param errors: if True, confidence intervals and interquartile bands are plotted too.
         """        
         max_input = dataset[0]["Max Input"]
-        file_name = " ".join([data["Parser"] for data in dataset]) + " " + str(max_input)
+        file_name = " ".join([data["Parser"] for data in dataset]) + " " + str(max_input) + self._file_suffix(dataset)
         file_path = os.path.join(directory, str(file_name))
         plot_label = ", ".join([data["Parser"] for data in dataset])
         xlabel = "Input"
         ylabel = "Time (s)"  
         legend = (data["Parser"] for data in dataset) 
         formatted_dataset = []
-        for data in dataset:
-            formatted_dataset.append([data["X"], data["Time"]])
-        plot = make_plot(formatted_dataset, plot_label, xlabel, ylabel, legend)
+        if errors and all("Stats" in data for data in dataset):
+            for data in dataset:
+                formatted_dataset.append([data["X"], data["Stats"]])
+            plot = make_error_plot(formatted_dataset, plot_label, xlabel, ylabel, legend)
+        else:
+            for data in dataset:
+                formatted_dataset.append([data["X"], data["Time"]])
+            plot = make_plot(formatted_dataset, plot_label, xlabel, ylabel, legend)
         save_plot(plot, file_path)
         plot.close()
         
-    def table_data(self, dataset, directory = PARAMS["output_dir"]):
+        if all("Memory" in data for data in dataset):
+            metric = "Peak Traced" if all(memory["Peak Traced"] is not None for data in dataset for memory in data["Memory"]) else "Peak RSS"
+            formatted_dataset = [[data["X"], [memory[metric] or 0 for memory in data["Memory"]]] for data in dataset]
+            legend = (data["Parser"] for data in dataset)
+            plot = make_plot(formatted_dataset, plot_label, xlabel, metric + " (bytes)", legend)
+            save_plot(plot, file_path + " Memory")
+            plot.close()
+        
+    def table_data(self, dataset, directory = PARAMS["output_dir"], errors = True):
         """
         Stores to the specified directory a table-as-string based on the specified dataset.
         
-        table_data(dataset, directory) -> None
+        table_data(dataset, directory, errors = True) -> None
         
         @type dataset: list of dictionaries
         @param dataset: the dataset to be represented in table.
         @type directory: string
         @param directory: directory to store the computed table.
+        @type errors: boolean
+        @param errors: if True, confidence intervals, dispersion and outliers are tabled too.
         """        
         max_input = dataset[0]["Max Input"]
-        file_name = " ".join([data["Parser"] for data in dataset]) + " " + str(max_input) + ".txt"
+        file_name = " ".join([data["Parser"] for data in dataset]) + " " + str(max_input) + self._file_suffix(dataset) + ".txt"
         file_path = os.path.join(directory, str(file_name))
         plot_label = ", ".join([data["Parser"] for data in dataset])
         xlabel = "Dataset"
         ylabel = "Time (s)"
         legend = (data["Parser"] for data in dataset) 
         formatted_dataset = []
-        for data in dataset:
-            formatted_dataset.append([data["X"], data["Time"]])
-        table = make_table(formatted_dataset, plot_label, xlabel, ylabel, legend)
+        if errors and all("Stats" in data for data in dataset):
+            for data in dataset:
+                formatted_dataset.append([data["X"], data["Stats"]])
+            table = make_error_table(formatted_dataset, plot_label, xlabel, ylabel, legend)
+        else:
+            for data in dataset:
+                formatted_dataset.append([data["X"], data["Time"]])
+            table = make_table(formatted_dataset, plot_label, xlabel, ylabel, legend)
+        if all("Memory" in data for data in dataset):
+            table += "\nMemory\n" + "\t".join(["Parser", xlabel] + MEMORY_METRICS) + "\n"
+            for data in dataset:
+                for x, memory in zip(data["X"], data["Memory"]):
+                    table += "\t".join([data["Parser"], str(x)] + ["-" if memory[metric] is None else str(memory[metric]) for metric in MEMORY_METRICS]) + "\n"
+        if all("Input" in data for data in dataset):
+            table += "\nInput\n" + "\t".join(["Parser", xlabel, "Mode", "Cache", "Bytes", "IO (s)", "Parse (s)", "MB/s", "IO MB/s", "Parse MB/s"]) + "\n"
+            for data in dataset:
+                for x, stats, measure in zip(data["X"], data["Stats"], data["Input"]):
+                    table += "{}\t{}\t{}\t{}\t{}\t{:.6e}\t{:.6e}\t{:.2f}\t{:.2f}\t{:.2f}\n".format(data["Parser"], str(x), measure["Mode"], measure["Cache"], str(measure["Bytes"]),
+                                                                                         measure["IO"], measure["Parse"], measure["MB/s"], measure["IO MB/s"], measure["Parse MB/s"])
+        if all("Compressed" in data for data in dataset):
+            table += "\nCompressed Input\n" + "\t".join(["Parser", xlabel, "Compression", "Cache", "Bytes", "Compressed Bytes", "Ratio", "IO (s)", "Decompress (s)", "Parse (s)", "MB/s", "Decompress MB/s"]) + "\n"
+            for data in dataset:
+                for x, measure in zip(data["X"], data["Compressed"]):
+                    table += "{}\t{}\t{}\t{}\t{}\t{}\t{:.2f}\t{:.6e}\t{:.6e}\t{:.6e}\t{:.2f}\t{:.2f}\n".format(data["Parser"], str(x), measure["Compression"], measure["Cache"], str(measure["Bytes"]), str(measure["Compressed Bytes"]),
+                                                                                                  measure["Ratio"], measure["IO"], measure["Decompress"], measure["Parse"], measure["MB/s"], measure["Decompress MB/s"])
         save_table(table, file_path)    
 
+    def fit_data(self, dataset, directory = PARAMS["output_dir"]):
+        """
+        Stores to the specified directory a table-as-string of the complexity models fitted to the
+        specified dataset, flagging every parser that scales worse than linearly.
+        
+        fit_data(dataset, directory) -> None
+        
+        @type dataset: list of dictionaries
+        @param dataset: the dataset to be fitted.
+        @type directory: string
+        @param directory: directory to store the computed table.
+        """
+        max_input = dataset[0]["Max Input"]
+        file_name = " ".join([data["Parser"] for data in dataset]) + " " + str(max_input) + self._file_suffix(dataset) + " Fit.txt"
+        file_path = os.path.join(directory, str(file_name))
+        plot_label = ", ".join([data["Parser"] for data in dataset])
+        rows = [(data["Parser"], data["Fit"], data["Expected"]) for data in dataset]
+        for data in dataset:
+            if data["Worse"]:
+                print "\tWarning: {} scales as {} (expected {})".format(data["Parser"], data["Fit"]["Model"], str(data["Expected"]))
+        save_table(make_fit_table(rows, plot_label), file_path)
+
+def _parse_compressed(parser_instance, path, compression, streaming):
+    stream = open_compressed(path, compression)
+    try:
+        if streaming:
+            return parser_instance.parse_file(stream)
+        return parser_instance.parse_string(stream.read())
+    finally:
+        stream.close()
+
+def _median(values):
+    values = sorted(values)
+    middle = len(values) / 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2.0
+
+def _throughput(size, seconds):
+    return size / seconds / 1e6 if seconds > 0 else float("inf")
+
+def _profile_cell(params):
+    """
+    Worker entry point of ParserProfiler parallel profiling.
+    
+    _profile_cell(params) -> stats
+    
+    @type params: dictionary
+    @param params: parameters for the analysis, including the cell parser and X.
+    
+    @rtype: dictionary
+    @return: summary of the parsing times.
+    """
+    return ParserProfiler()._profile_cell(params, params["X"])
+
 def __test(profiler, params):
     """
     Parser Profiler Test.
@@ -167,15 +665,29 @@ def __test(profiler, params):
     print "###"       
     print "### Parsers: {}".format(' '.join(PARSERS_NAME[parser] for parser in PARSERS))
     print "### Max Input: {}".format(str(params["max_input"]))
+    print "### Sweep: {}".format(str(params["sweep"]))
     print "### Adjacency: {}".format(str(params["adjacency"]))
     print "### Average Bound: {}".format(str(params["average_bound"]))
+    print "### Adaptive: {}".format(str(params["adaptive"]))
+    print "### Clock: {}".format(str(params["clock"]))
+    print "### Seed: {}".format(str(params["seed"]))
+    print "### Memory: {}".format(str(params["memory"]))
+    print "### Input Mode: {} ({} page cache)".format(str(params["input_mode"]), str(params["page_cache"]))
+    print "### Compressions: {}".format(" ".join(available_compressions()))
     print "### Output Directory: {}\n".format(str(params["output_dir"]))
     print "Profiling . . ."
     data = profiler.profile_all(params)
     print "Making Plot . . ."
     profiler.plot_data(data)
-    print "Making Table . . .\n"
+    print "Making Table . . ."
     profiler.table_data(data)
+    print "Fitting . . .\n"
+    profiler.fit_data(data)
+    print "Profiling Sharded Parsing . . ."
+    profiler.sharded_data(profiler.profile_sharded(params))
+    for compression in available_compressions():
+        print "Profiling {} Input . . .".format(compression)
+        profiler.table_data(profiler.profile_all(dict(params.items() + [("compression", compression)])))
     
     print "\n### END OF TEST ###\n"
 
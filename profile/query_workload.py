@@ -0,0 +1,138 @@
+#Query Workload Imports
+from collections import deque
+import heapq
+
+#Stratification metrics: targets are ranked from their source by hop count or by weighted distance
+HOPS = "hops"
+DISTANCE = "distance"
+STRATIFICATIONS = [HOPS, DISTANCE]
+
+DEFAULT_QUERIES = 100
+DEFAULT_STRATA = 4
+MAX_SOURCE_DRAWS = 100 #consecutive sources reaching too few targets, before giving up
+
+def make_queries(graph, ids, count, strata, stratify, rand):
+    """
+    Draws a batch of (source, target) queries, stratified by the graph distance between them.
+    Every drawn source is explored once, its reachable nodes are ranked by distance and split into
+    strata equally populated ranges, and one target is drawn from each range, so that the batch holds
+    the same number of near and far queries, whatever the distance distribution of the graph.
+
+    make_queries(graph, ids, count, strata, stratify, rand) -> queries
+
+    @type graph: graph
+    @param graph: graph, whose get_incident_arcs returns (head id, arc info) pairs,
+    the arc info being the weight or a sequence starting with it.
+    @type ids: list
+    @param ids: node ids of graph, candidate sources.
+    @type count: int
+    @param count: number of queries.
+    @type strata: int
+    @param strata: number of distance strata (at least 1).
+    @type stratify: string
+    @param stratify: one of STRATIFICATIONS.
+    @type rand: random.Random
+    @param rand: random stream.
+
+    @rtype: list of tuples
+    @return: (source, target, stratum) triples, stratum 0 holding the nearest targets.
+    """
+    if stratify not in STRATIFICATIONS:
+        raise ValueError("Unsupported stratification {}.".format(str(stratify)))
+    explore = _hops if stratify == HOPS else _distances
+    queries = []
+    misses = 0
+    while len(queries) < count:
+        source = ids[int(rand.random() * len(ids))]
+        ranked = explore(graph, source)
+        if len(ranked) < strata:
+            #Dead ends and small components cannot fill every stratum.
+            misses += 1
+            if misses == MAX_SOURCE_DRAWS:
+                raise ValueError("No source reaches {} targets after {} draws.".format(str(strata), str(misses)))
+            continue
+        misses = 0
+        for stratum in range(min(strata, count - len(queries))):
+            low, high = stratum * len(ranked) / strata, (stratum + 1) * len(ranked) / strata
+            queries.append((source, ranked[low + int(rand.random() * (high - low))], stratum))
+    return queries
+
+def _hops(graph, source):
+    #Nodes reachable from source (source excluded), by breadth-first order, i.e. by hop count.
+    seen = set([source])
+    frontier = deque([source])
+    ranked = []
+    while frontier:
+        for head, info in graph.get_incident_arcs(frontier.popleft()):
+            if head not in seen:
+                seen.add(head)
+                ranked.append(head)
+                frontier.append(head)
+    return ranked
+
+def _distances(graph, source):
+    #Nodes reachable from source (source excluded), by increasing weighted distance.
+    distances = {source: 0}
+    settled = set()
+    heap = [(0, source)]
+    ranked = []
+    while heap:
+        distance, node = heapq.heappop(heap)
+        if node in settled:
+            continue
+        settled.add(node)
+        if node != source:
+            ranked.append(node)
+        for head, info in graph.get_incident_arcs(node):
+            candidate = distance + (info[0] if isinstance(info, (list, tuple)) else info)
+            if candidate < distances.get(head, candidate + 1):
+                distances[head] = candidate
+                heapq.heappush(heap, (candidate, head))
+    return ranked
+
+def __test(seed):
+    """
+    Query Workload Test: draws stratified queries on a weighted path graph, and checks that every
+    target is reachable, strata are ordered by distance, and batches are reproducible.
+
+    __test(seed) -> None
+
+    @type seed: int
+    @param seed: random seed.
+    """
+    from control.profile.csr_graph import CSRGraph
+    import random
+    print "### iPATH TEST QUERY WORKLOAD"
+    print "### Seed: {}\n".format(str(seed))
+    #Path 0 - 1 - ... - 19, whose arc weights grow along the path, and the isolated node 20.
+    graph = CSRGraph()
+    for i in range(19):
+        graph.add_arc(i, i + 1, i + 1)
+        graph.add_arc(i + 1, i, i + 1)
+    graph.add_node(20)
+    ids = range(21)
+    position = lambda i: i * (i + 1) / 2 #weighted distance from node 0
+
+    for stratify in STRATIFICATIONS:
+        queries = make_queries(graph, ids, 10, 4, stratify, random.Random(seed))
+        print "{}: {}".format(stratify, str(queries))
+        assert len(queries) == 10 and queries == make_queries(graph, ids, 10, 4, stratify, random.Random(seed))
+        ranks = {}
+        for source, target, stratum in queries:
+            assert source != target and 20 not in (source, target) and 0 <= stratum < 4
+            ranks.setdefault(source, []).append((stratum, abs(target - source) if stratify == HOPS else abs(position(target) - position(source))))
+        for source, ranked in ranks.items():
+            assert [distance for stratum, distance in sorted(ranked)] == sorted(distance for stratum, distance in ranked)
+    assert _distances(graph, 10) == sorted(range(10) + range(11, 20), key = lambda i: abs(position(i) - position(10)))
+    assert _hops(graph, 10) == [9, 11, 8, 12, 7, 13, 6, 14, 5, 15, 4, 16, 3, 17, 2, 18, 1, 19, 0]
+
+    try:
+        make_queries(graph, [20], 1, 1, HOPS, random.Random(seed))
+        assert False, "isolated sources cannot be queried"
+    except ValueError:
+        pass
+    print "\n### END OF TEST ###\n"
+
+if __name__ == "__main__":
+    seed = 0
+    __test(seed)
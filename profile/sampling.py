@@ -0,0 +1,87 @@
+#Sampling Imports
+from control.profile.stats import median, median_ci
+from control.profile.timer import get_timer, WALL
+
+#Adaptive sampling parameters
+DEFAULT_TARGET_CI = 0.05
+DEFAULT_MIN_SAMPLES = 5
+DEFAULT_MAX_SAMPLES = 1000
+DEFAULT_CELL_BUDGET = 10.0
+
+def collect(measure, params):
+    """
+    Collects the samples of a profiling cell.
+    If params["adaptive"] is set, measure is repeated until the relative width of the median
+    confidence interval falls below params["target_ci"] or params["cell_budget"] seconds are spent
+    (within params["min_samples"] and params["max_samples"] repetitions); otherwise it is repeated
+    exactly params["average_bound"] times.
+
+    collect(measure, params) -> samples
+
+    @type measure: function
+    @param measure: measure(r) performs repetition r and returns its sample.
+    @type params: dictionary
+    @param params: sampling parameters.
+
+    @rtype: list of numbers
+    @return: samples, in repetition order.
+    """
+    if not params.get("adaptive", False):
+        return [measure(r) for r in range(params["average_bound"])]
+    return sample_adaptive(measure,
+                           params.get("target_ci", DEFAULT_TARGET_CI),
+                           params.get("min_samples", DEFAULT_MIN_SAMPLES),
+                           params.get("max_samples", DEFAULT_MAX_SAMPLES),
+                           params.get("cell_budget", DEFAULT_CELL_BUDGET))
+
+def sample_adaptive(measure, target_ci = DEFAULT_TARGET_CI, min_samples = DEFAULT_MIN_SAMPLES, max_samples = DEFAULT_MAX_SAMPLES, cell_budget = DEFAULT_CELL_BUDGET):
+    """
+    Repeats measure until the median confidence interval is narrower than target_ci times the
+    median, or cell_budget seconds have been spent, or max_samples have been collected.
+
+    sample_adaptive(measure, target_ci, min_samples, max_samples, cell_budget) -> samples
+
+    @type measure: function
+    @param measure: measure(r) performs repetition r and returns its sample.
+    @type target_ci: float
+    @param target_ci: target relative width of the median confidence interval.
+    @type min_samples: int
+    @param min_samples: minimum number of repetitions.
+    @type max_samples: int
+    @param max_samples: maximum number of repetitions.
+    @type cell_budget: float
+    @param cell_budget: wall-clock seconds to be spent on the cell at most.
+
+    @rtype: list of numbers
+    @return: samples, in repetition order.
+    """
+    timer = get_timer(WALL)
+    start = timer.now()
+    samples = []
+    while len(samples) < max_samples:
+        samples.append(measure(len(samples)))
+        if len(samples) < min_samples:
+            continue
+        if timer.elapsed(start, timer.now()) >= cell_budget:
+            break
+        if relative_ci_width(samples) <= target_ci:
+            break
+    return samples
+
+def relative_ci_width(samples):
+    """
+    Returns the width of the median confidence interval relative to the median.
+
+    relative_ci_width(samples) -> width
+
+    @type samples: list of numbers
+    @param samples: non-empty samples.
+
+    @rtype: float
+    @return: relative width (0 if every sample is 0).
+    """
+    low, high = median_ci(samples)
+    center = median(samples)
+    if center == 0:
+        return 0.0 if high == low else float("inf")
+    return (high - low) / abs(center)
@@ -0,0 +1,250 @@
+#Sharded Parser Imports
+from model.graph import GraphIncidenceList
+from control.profile.executor import execute
+from control.profile.iterparse_parser import add_way
+from cStringIO import StringIO
+from array import array
+import xml.etree.cElementTree as cET
+import os, re
+
+#Top-level OSM elements: shards start at one of their start tags
+ELEMENT_START = re.compile(r"<(?:node|way|relation)[\s>/]")
+ELEMENT_START_LENGTH = len("<relation ")
+DOCUMENT_END = "</osm>"
+#Bytes read at a time when looking for a boundary
+SCAN_CHUNK = 1 << 12
+
+class ShardedParser:
+    """
+    Parallel OSM parser.
+    The map is split into byte ranges starting at top-level element boundaries, every range is parsed
+    by a worker process into compact arrays (node ids and coordinates, way references), and the parts
+    are merged into one graph by this process: nodes first, then the arcs of every way (see add_way),
+    so that ways may reference nodes of other shards.
+    """
+
+    def __init__(self, workers = None, pin = False):
+        self.workers = workers
+        self.pin = pin
+
+    def parse_file(self, source):
+        """
+        Parses an OSM file into a graph.
+
+        parse_file(source) -> graph
+
+        @type source: string
+        @param source: OSM file path.
+
+        @rtype: GraphIncidenceList
+        @return: the parsed graph.
+        """
+        with open(source, "rb") as stream:
+            ranges = split(stream, os.fstat(stream.fileno()).st_size, self._shards())
+        cells = [{"path": source, "start": start, "stop": stop} for start, stop in ranges]
+        return merge(execute(_parse_shard, cells, self.workers, self.pin))
+
+    def parse_string(self, string):
+        """
+        Parses an OSM string into a graph.
+
+        parse_string(string) -> graph
+
+        @type string: string
+        @param string: OSM map.
+
+        @rtype: GraphIncidenceList
+        @return: the parsed graph.
+        """
+        ranges = split(StringIO(string), len(string), self._shards())
+        cells = [{"data": string[start:stop]} for start, stop in ranges]
+        return merge(execute(_parse_shard, cells, self.workers, self.pin))
+
+    def _shards(self):
+        return self.workers or 1
+
+def split(stream, size, shards):
+    """
+    Splits an OSM document into byte ranges of about size / shards bytes, each made of whole top-level elements.
+    Only the document tail and a window after every cut are read, not the whole document.
+
+    split(stream, size, shards) -> ranges
+
+    @type stream: file-like object
+    @param stream: seekable OSM document.
+    @type size: int
+    @param size: document size in bytes.
+    @type shards: int
+    @param shards: number of ranges wanted (fewer are returned when elements are too large).
+
+    @rtype: list of tuples
+    @return: (start, stop) byte ranges, in document order.
+    """
+    last = _document_end(stream, size)
+    first = _boundary(stream, 0, last)
+    boundaries = [first]
+    for shard in range(1, shards):
+        boundary = _boundary(stream, first + (last - first) * shard / shards, last)
+        if boundary > boundaries[-1]:
+            boundaries.append(boundary)
+    boundaries.append(last)
+    return [(start, stop) for start, stop in zip(boundaries, boundaries[1:]) if stop > start]
+
+def _document_end(stream, size):
+    #Offset of the closing root tag, read from the document tail (size if none).
+    start = max(0, size - SCAN_CHUNK)
+    stream.seek(start)
+    found = stream.read(size - start).rfind(DOCUMENT_END)
+    return start + found if found >= 0 else size
+
+def _boundary(stream, offset, limit):
+    #First element start at or after offset (limit if none), read by chunks until found.
+    stream.seek(offset)
+    carry = ""
+    position = offset
+    while position < limit:
+        chunk = stream.read(min(SCAN_CHUNK, limit - position))
+        if not chunk:
+            break
+        window = carry + chunk
+        match = ELEMENT_START.search(window)
+        if match is not None:
+            return min(position - len(carry) + match.start(), limit)
+        #A start tag may straddle two chunks.
+        carry = window[-ELEMENT_START_LENGTH:]
+        position += len(chunk)
+    return limit
+
+def merge(parts):
+    """
+    Merges the parts parsed from the shards of a map into one graph.
+
+    merge(parts) -> graph
+
+    @type parts: list of tuples
+    @param parts: (ids, lats, lons, refs, lengths) arrays, as returned by the shard workers.
+
+    @rtype: GraphIncidenceList
+    @return: the parsed graph.
+    """
+    graph = GraphIncidenceList()
+    coords = {}
+    for ids, lats, lons, refs, lengths in parts:
+        for id, lat, lon in zip(ids, lats, lons):
+            coord = (lat, lon)
+            coords[id] = coord
+            graph.add_node(id, coord)
+    for ids, lats, lons, refs, lengths in parts:
+        position = 0
+        for length in lengths:
+            add_way(graph, coords, refs[position:position + length])
+            position += length
+    return graph
+
+def _parse_shard(cell):
+    """
+    Worker entry point of ShardedParser: parses one byte range of a map.
+
+    _parse_shard(cell) -> part
+
+    @type cell: dictionary
+    @param cell: path, start and stop of the range, or its data.
+
+    @rtype: tuple
+    @return: (ids, lats, lons, refs, lengths) arrays: node ids and coordinates, and the node references
+    of every way, flattened, with the number of references of every way.
+    """
+    if "data" in cell:
+        data = cell["data"]
+    else:
+        with open(cell["path"], "rb") as stream:
+            stream.seek(cell["start"])
+            data = stream.read(cell["stop"] - cell["start"])
+    ids, lats, lons = array("l"), array("d"), array("d")
+    refs, lengths = array("l"), array("l")
+    source = StringIO("<osm>" + data + DOCUMENT_END)
+    root = None
+    for event, element in cET.iterparse(source, events = ("start", "end")):
+        if event == "start":
+            if root is None:
+                root = element
+            continue
+        if element.tag == "node":
+            ids.append(int(element.get("id")))
+            lats.append(float(element.get("lat")))
+            lons.append(float(element.get("lon")))
+        elif element.tag == "way":
+            way = [int(nd.get("ref")) for nd in element.iterfind("nd")]
+            refs.extend(way)
+            lengths.append(len(way))
+        else:
+            continue
+        element.clear()
+        root.clear()
+    return ids, lats, lons, refs, lengths
+
+def __test(num_nodes, adjacency, shards):
+    """
+    Sharded Parser Test: checks that splitting and merging a seeded random map gives the graph
+    of the IterparseParser, for every shard count, and that split reads a bounded window only.
+
+    __test(num_nodes, adjacency, shards) -> None
+
+    @type num_nodes: int
+    @param num_nodes: number of nodes and ways of the map.
+    @type adjacency: int
+    @param adjacency: number of adjacent nodes / way.
+    @type shards: list of int
+    @param shards: shard counts to be checked.
+    """
+    from control.profile.iterparse_parser import IterparseParser
+    from control.profile.generator.osm_generator import OsmGenerator
+    import tempfile
+
+    class CountingStream:
+        #Seekable stream counting the bytes read.
+        def __init__(self, string):
+            self._stream = StringIO(string)
+            self.read_bytes = 0
+        def seek(self, offset):
+            self._stream.seek(offset)
+        def read(self, size):
+            data = self._stream.read(size)
+            self.read_bytes += len(data)
+            return data
+
+    def arcs(graph, ids):
+        return dict((id, sorted(graph.get_incident_arcs(id))) for id in ids)
+
+    print "### iPATH TEST SHARDED PARSER"
+    print "### Nodes: {}, Adjacency: {}, Shards: {}\n".format(str(num_nodes), str(adjacency), str(shards))
+    generator = OsmGenerator()
+    generator.num_nodes, generator.num_ways, generator.adjacency, generator.seed = num_nodes, num_nodes, adjacency, 0
+    string = generator.generate()
+    ids = [int(element.get("id")) for event, element in cET.iterparse(StringIO(string)) if element.tag == "node"]
+    expected = arcs(IterparseParser().parse_string(string), ids)
+
+    fd, path = tempfile.mkstemp(suffix = ".osm")
+    try:
+        with os.fdopen(fd, "wb") as sink:
+            sink.write(string)
+        for count in shards:
+            stream = CountingStream(string)
+            ranges = split(stream, len(string), count)
+            print "Shards: {}, Ranges: {}, Bytes Read: {} of {}".format(str(count), str(len(ranges)), str(stream.read_bytes), str(len(string)))
+            assert all(stop == start for (_, stop), (start, _) in zip(ranges, ranges[1:]))
+            assert string[ranges[-1][1]:].strip() == DOCUMENT_END and len(ranges) <= count
+            assert stream.read_bytes <= (count + 1) * 2 * SCAN_CHUNK
+            parser = ShardedParser(count)
+            assert arcs(parser.parse_string(string), ids) == expected
+            assert arcs(parser.parse_file(path), ids) == expected
+    finally:
+        os.remove(path)
+    assert split(StringIO("<osm></osm>"), 11, 4) == []
+    print "\n### END OF TEST ###\n"
+
+if __name__ == "__main__":
+    num_nodes = 2000
+    adjacency = 5
+    shards = [1, 2, 3, 8]
+    __test(num_nodes, adjacency, shards)
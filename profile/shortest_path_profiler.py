@@ -4,10 +4,22 @@ from output.__init__ import OUTPUT_DIR
 from exception.exceptions import UnsupportedAlgorithmError
 from control.shortestpath.dijkstra_sc import *
 from control.shortestpath.dijkstra_mc import *
+from control.profile.executor import execute, worker_counts
 from control.plot.plotter_controller import make_plot, save_plot, make_table, save_table
-from utils.math_utils import average
-import os
-from time import clock
+from control.profile.stats import summarize
+from control.profile.sampling import collect, DEFAULT_TARGET_CI, DEFAULT_MIN_SAMPLES, DEFAULT_MAX_SAMPLES, DEFAULT_CELL_BUDGET
+from control.profile.stats_plotter import make_error_plot, make_error_table
+from control.profile.timer import get_timer, WALL
+from control.profile.workload_trace import TraceRecorder, trace_path
+from control.profile.graph_cache import GraphCache, DEFAULT_MAX_SIZE as DEFAULT_GRAPH_CACHE_SIZE
+from control.profile.csr_graph import SharedCSRGraph, share, csr_parser, osm_node_ids
+from control.profile.memory import deep_size
+from control.profile.histogram import LatencyHistogram, make_latency_table
+from control.profile.operands import stream, DEFAULT_SEED
+from control.profile.query_workload import make_queries, HOPS, DISTANCE, DEFAULT_QUERIES, DEFAULT_STRATA
+from model.priority_queue import DHeap
+from model.graph import GraphIncidenceList, GraphIncidenceSet
+import os, inspect
 
 #Parser Import
 from control.parse.c_element_tree import cElementTreeParser as parser
@@ -49,6 +61,20 @@ ALGORITHMS_NAME = {DIJKSTRA_SC_0: "SC0",
                     DIJKSTRA_MC_2: "MC2",
                     DIJKSTRA_MC_3: "MC3"}
 
+#Single-core baselines and multi-core algorithms of scaling analysis (see profileScaling)
+SC_ALGORITHMS = [DIJKSTRA_SC_0, DIJKSTRA_SC_1, DIJKSTRA_SC_2, DIJKSTRA_SC_3]
+MC_ALGORITHMS = [DIJKSTRA_MC_0, DIJKSTRA_MC_1, DIJKSTRA_MC_2, DIJKSTRA_MC_3]
+#Query adapters: algorithm -> function(graph, source, target) answering one query between two OSM node ids.
+#The algorithms take (graph, value, const) inputs (node count and distance, see profile), not node ids:
+#an algorithm is only queried through an adapter configured here (or in the query_functions parameter).
+QUERY_FUNCTIONS = {}
+#Keyword argument through which the query adapter of every multi-core algorithm takes its worker count
+#(None: skipped, until the parameter name of the algorithm is configured)
+WORKERS_KWARGS = {DIJKSTRA_MC_0: None,
+                  DIJKSTRA_MC_1: None,
+                  DIJKSTRA_MC_2: None,
+                  DIJKSTRA_MC_3: None}
+
 PROFILE_TYPE_VAR_NUM_NODES = 0
 PROFILE_TYPE_VAR_DISTANCE = 1
 PROFILE_TYPES = [PROFILE_TYPE_VAR_NUM_NODES, 
@@ -56,18 +82,59 @@ PROFILE_TYPES = [PROFILE_TYPE_VAR_NUM_NODES,
 PROFILE_TYPES_NAME = {PROFILE_TYPE_VAR_NUM_NODES: "Var Num Nodes", 
                        PROFILE_TYPE_VAR_DISTANCE: "Var Distance"}
 
+#Classes whose calls are recorded by recordTrace (besides the class of the parsed graph)
+TRACED_PRIORITY_QUEUES = [DHeap]
+TRACED_GRAPHS = [GraphIncidenceList, GraphIncidenceSet]
+TRACE_DIR = "traces"
+GRAPH_CACHE_DIR = "graphs"
+
+#Graph representations: the object graph built by the parser, or its compact CSR copy (see csr_graph)
+GRAPH_OBJECT = "object"
+GRAPH_CSR = "csr"
+GRAPH_REPRESENTATIONS = [GRAPH_OBJECT, GRAPH_CSR]
+
+#Directory of the graphs shared with parallel workers (memory-backed where available)
+SHARED_GRAPH_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+SHARED_GRAPH_EXTENSION = ".csr"
+
 PARAMS = {"source": TEST,
           "algorithm": DIJKSTRA_SC_0, 
           "profile_type": PROFILE_TYPE_VAR_NUM_NODES,
           "values": [100, 200, 500],
           "const":  100,
           "average_bound": 5, 
+          "adaptive": False,
+          "target_ci": DEFAULT_TARGET_CI,
+          "min_samples": DEFAULT_MIN_SAMPLES,
+          "max_samples": DEFAULT_MAX_SAMPLES,
+          "cell_budget": DEFAULT_CELL_BUDGET,
+          "clock": WALL,
+          "parallel": False,
+          "workers": None,
+          "pin_workers": True,
+          "trace": False,
+          "graph_cache": True,
+          "graph_cache_size": DEFAULT_GRAPH_CACHE_SIZE,
+          "graph_representation": GRAPH_OBJECT,
+          "graph_memory": False,
+          "shared_graph": False,
+          "shared_graph_dir": SHARED_GRAPH_DIR,
+          "queries": DEFAULT_QUERIES,
+          "query_strata": DEFAULT_STRATA,
+          "query_stratify": HOPS,
+          "seed": DEFAULT_SEED,
+          "query_functions": QUERY_FUNCTIONS,
+          "scaling_workers": None,
+          "workers_kwargs": WORKERS_KWARGS,
           "output_dir": OUTPUT_DIR}
 
+#Graphs loaded by the cells of the current process, by (source, representation) or shared path, for one run
+_GRAPHS = {}
+
 class ShortestPathProfiler(baseprofiler):
     
     def __init__(self):
-        pass
+        self._timer = get_timer(PARAMS["clock"])
         
     def profile(self, params = {}):
         """
@@ -88,53 +155,371 @@ class ShortestPathProfiler(baseprofiler):
         profileType = params["profile_type"]
         values = params["values"]
         const = params["const"]
-        averageBound = params["average_bound"]
         
-        graph = parser().parse_file(source)
-            
         try:
             algorithmFunction = ALGORITHMS_FUNCTION[algorithm]
         except KeyError:
             raise UnsupportedAlgorithmError()
         
-        data = {"Algorithm": ALGORITHMS_NAME[algorithm], "Profile Type": profileType, "Max Input": sorted(values)[-1], "Const": const, "X": [], "Time": []}
+        graph, load, cached = self._loadGraph(params)
         
-        if profileType == PROFILE_TYPE_VAR_NUM_NODES:  
-                  
-            for value in values: 
-                           
-                rawData = []            
-                for r in range(averageBound):
-                    print "\tInput: ({}, {}) : Iteration {} . . .".format(str(value), str(const), str(r))
-                    start = clock()
-                    algorithmFunction(graph, value, const)
-                    stop = clock()
-                    elapsedTime = (stop - start)
-                    rawData.append(elapsedTime)         
-                       
-                averageElapsedTime = average(rawData)            
-                data["X"].append(value)
-                data["Time"].append(averageElapsedTime)
-                
-        elif profileType == PROFILE_TYPE_VAR_DISTANCE:
-            
-            for value in values:            
-                rawData = []   
-                         
-                for r in range(averageBound):
-                    print "\tInput: ({}, {}) : Iteration {} . . .".format(str(value), str(const), str(r))
-                    start = clock()
-                    algorithmFunction(graph, const, value)
-                    stop = clock()
-                    elapsedTime = (stop - start)
-                    rawData.append(elapsedTime)  
-                              
-                averageElapsedTime = average(rawData)            
-                data["X"].append(value)
-                data["Time"].append(averageElapsedTime) 
+        data = {"Algorithm": ALGORITHMS_NAME[algorithm], "Profile Type": profileType, "Max Input": sorted(values)[-1], "Const": const, "Clock": params["clock"], "Representation": params["graph_representation"], "Load": load, "Load Cached": cached, "X": [], "Time": [], "Stats": []}
+        if params["graph_memory"]:
+            data.update(self._graphMemory(graph, params["source"]))
+        self._timer = get_timer(params["clock"])
+        
+        for value in values:
+            stats = self._profileCell(graph, algorithmFunction, profileType, value, const, params)
+            data["X"].append(value)
+            data["Time"].append(stats["Median"])
+            data["Stats"].append(stats)
                            
         return [data]        
+    
+    def _loadGraph(self, params):
+        """
+        Loads the graph of the source in the requested representation,
+        from the parsed-graph cache if enabled (see GraphCache).
+        
+        _loadGraph(params) -> (graph, load, cached)
+        
+        @type params: dictionary
+        @param params: parameters for the analysis.
+        
+        @rtype: tuple
+        @return: (graph, wall seconds spent loading it, True if it was loaded from the cache).
+        """
+        representation = params["graph_representation"]
+        if representation not in GRAPH_REPRESENTATIONS:
+            raise ValueError("Unsupported graph representation {}.".format(str(representation)))
+        graphParser = csr_parser(parser) if representation == GRAPH_CSR else parser
+        timer = get_timer(WALL)
+        start = timer.now()
+        if params["graph_cache"]:
+            cache = GraphCache(os.path.join(params["output_dir"], GRAPH_CACHE_DIR), params["graph_cache_size"])
+            graph, cached = cache.get(params["source"], graphParser)
+        else:
+            graph, cached = graphParser().parse_file(params["source"]), False
+        stop = timer.now()
+        return graph, timer.elapsed(start, stop), cached
+    
+    def _graphMemory(self, graph, source):
+        """
+        Measures the memory footprint of a loaded graph.
+        
+        _graphMemory(graph, source) -> memory
+        
+        @type graph: graph
+        @param graph: loaded graph.
+        @type source: string
+        @param source: OSM source path of graph.
+        
+        @rtype: dictionary
+        @return: Memory (bytes) and Memory Per Arc (bytes).
+        """
+        if hasattr(graph, "num_arcs"):
+            arcs = graph.num_arcs()
+        else:
+            arcs = sum(len(graph.get_incident_arcs(id)) for id in osm_node_ids(source))
+        memory = deep_size(graph)
+        return {"Memory": memory, "Memory Per Arc": float(memory) / max(arcs, 1)}
+    
+    def _shareGraph(self, graph, params):
+        """
+        Publishes a CSR graph into a file to be mapped read-only by the workers (see SharedCSRGraph).
+        
+        _shareGraph(graph, params) -> path
+        
+        @type graph: CSRGraph
+        @param graph: loaded graph.
+        @type params: dictionary
+        @param params: parameters for the analysis.
+        
+        @rtype: string
+        @return: shared file path, to be removed by the caller.
+        """
+        directory = params["shared_graph_dir"] or os.path.join(params["output_dir"], GRAPH_CACHE_DIR)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        path = os.path.join(directory, "pyprof-{}-{}{}".format(str(os.getpid()), os.path.basename(params["source"]), SHARED_GRAPH_EXTENSION))
+        share(graph, path)
+        return path
+    
+    def _profileCell(self, graph, algorithmFunction, profileType, value, const, sampling):
+        """
+        Profiles a single Algorithm on the specified graph, for a single input value.
+        
+        _profileCell(graph, algorithmFunction, profileType, value, const, sampling) -> stats
+        
+        @type graph: graph
+        @param graph: parsed graph.
+        @type algorithmFunction: function
+        @param algorithmFunction: shortest path algorithm.
+        @type profileType: int
+        @param profileType: one of PROFILE_TYPES.
+        @type value: int
+        @param value: variable input.
+        @type const: int
+        @param const: constant input.
+        @type sampling: dictionary
+        @param sampling: sampling parameters (average_bound, or adaptive sampling bounds).
+        
+        @rtype: dictionary
+        @return: summary of the elapsed times.
+        """
+        args = self._algorithmArgs(profileType, value, const)
+        now = self._timer.now
+        def measure(r):
+            print "\tInput: ({}, {}) : Iteration {} . . .".format(str(value), str(const), str(r))
+            start = now()
+            algorithmFunction(graph, *args)
+            stop = now()
+            return self._timer.elapsed(start, stop)
+        
+        rawData = collect(measure, sampling)
+        return summarize(rawData)
             
+    def _algorithmArgs(self, profileType, value, const):
+        if profileType == PROFILE_TYPE_VAR_NUM_NODES:
+            return (value, const)
+        elif profileType == PROFILE_TYPE_VAR_DISTANCE:
+            return (const, value)
+        raise ValueError("Unsupported profile type {}.".format(str(profileType)))
+    
+    def recordTrace(self, params = {}):
+        """
+        Runs a single Algorithm once per input value, recording its priority-queue and graph calls
+        into a binary workload trace (see workload_trace), to be replayed by StructProfiler.replay_trace.
+        
+        recordTrace(params = {}) -> path
+        
+        @type params: dictionary
+        @param params: parameters for the analysis.
+        
+        @rtype: string
+        @return: trace path.
+        """
+        params = dict(PARAMS.items() + params.items())
+        algorithm = params["algorithm"]
+        profileType = params["profile_type"]
+        values = params["values"]
+        const = params["const"]
+        
+        try:
+            algorithmFunction = ALGORITHMS_FUNCTION[algorithm]
+        except KeyError:
+            raise UnsupportedAlgorithmError()
+        graph = self._loadGraph(params)[0]
+        
+        directory = os.path.join(params["output_dir"], TRACE_DIR)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        traceName = "{}  {}  {}-{}".format(ALGORITHMS_NAME[algorithm], str(PROFILE_TYPES_NAME[profileType]), str(sorted(values)[-1]), str(const))
+        recorder = TraceRecorder(trace_path(directory, traceName))
+        recorder.start(TRACED_PRIORITY_QUEUES, TRACED_GRAPHS + [graph.__class__])
+        try:
+            for value in values:
+                algorithmFunction(graph, *self._algorithmArgs(profileType, value, const))
+        finally:
+            recorder.stop()
+        print "\tRecorded {} calls to {}".format(str(recorder.calls), recorder.path)
+        return recorder.path
+    
+    def profileQueries(self, params = {}):
+        """
+        Profiles all Algorithm on a seeded batch of random queries, stratified by the graph distance
+        between source and target (see make_queries). Every Algorithm answers the same batch through
+        its query adapter (see QUERY_FUNCTIONS), source and target being OSM node ids of the graph.
+        Algorithms without an adapter are not timed; having none to time is an error.
+        
+        profileQueries(params = {}) -> data
+        
+        @type params: dictionary
+        @param params: parameters for the analysis; query_functions maps Algorithms to their query adapters.
+        
+        @rtype: list of dictionaries
+        @return: per queried Algorithm, the batch Seconds, QPS (queries per second), overall Latency
+        and Strata Latency (summaries as returned by LatencyHistogram.summary).
+        """
+        params = dict(PARAMS.items() + params.items())
+        for algorithm in ALGORITHMS:
+            if algorithm not in ALGORITHMS_FUNCTION:
+                raise UnsupportedAlgorithmError()
+        queryFunctions = params["query_functions"]
+        algorithms = _queried(ALGORITHMS, queryFunctions)
+        graph = self._loadGraph(params)[0]
+        strata = params["query_strata"]
+        queries = make_queries(graph, osm_node_ids(params["source"]), params["queries"], strata, params["query_stratify"], stream(params["seed"], -1))
+        self._timer = get_timer(params["clock"])
+        now = self._timer.now
+        
+        dataset = []
+        for algorithm in algorithms:
+            print "Querying {} . . .".format(str(ALGORITHMS_NAME[algorithm]))
+            queryFunction = queryFunctions[algorithm]
+            histograms = [LatencyHistogram() for stratum in range(strata)]
+            batchStart = now()
+            for source, target, stratum in queries:
+                start = now()
+                queryFunction(graph, source, target)
+                stop = now()
+                histograms[stratum].record(self._timer.elapsed(start, stop))
+            batchStop = now()
+            seconds = self._timer.elapsed(batchStart, batchStop)
+            latency = LatencyHistogram()
+            for histogram in histograms:
+                latency.merge(histogram)
+            dataset.append({"Algorithm": ALGORITHMS_NAME[algorithm], "Queries": len(queries), "Strata": strata, "Stratify": params["query_stratify"], "Seed": params["seed"], "Clock": params["clock"],
+                            "Seconds": seconds, "QPS": len(queries) / seconds if seconds else float("inf"),
+                            "Latency": latency.summary(), "Strata Latency": [histogram.summary() for histogram in histograms]})
+        return dataset
+    
+    def queryData(self, dataset, directory = os.path.join(os.getcwd(), PARAMS["output_dir"])):
+        """
+        Stores to the specified directory a table-as-string of the throughput and latency percentiles
+        computed by profileQueries (overall, and per distance stratum).
+        
+        queryData(dataset, directory) -> None
+        
+        @type dataset: list of dictionaries
+        @param dataset: the dataset computed by profileQueries.
+        @type directory: string
+        @param directory: directory to store the computed table.
+        """
+        tableFileName = "{}  Queries {}-{}.txt".format(" ".join([data["Algorithm"] for data in dataset]), str(dataset[0]["Queries"]), str(dataset[0]["Stratify"]))
+        tableFilePath = os.path.join(directory, str(tableFileName))
+        rows = []
+        for data in dataset:
+            rows.append((data["Algorithm"], "All", data["Latency"]))
+            rows.extend((data["Algorithm"], stratum, latency) for stratum, latency in enumerate(data["Strata Latency"]))
+        table = make_latency_table(rows, "Queries by {} stratum (s/query)".format(str(dataset[0]["Stratify"])))
+        table += "\nThroughput\n" + "\t".join(["Algorithm", "Queries", "Seconds", "QPS"]) + "\n"
+        table += "".join("{}\t{}\t{:.6e}\t{:.2f}\n".format(data["Algorithm"], str(data["Queries"]), data["Seconds"], data["QPS"]) for data in dataset)
+        save_table(table, tableFilePath)
+    
+    def profileScaling(self, params = {}):
+        """
+        Profiles every multi-core Algorithm at an increasing number of workers, on the query batch
+        of profileQueries, against the best single-core Algorithm on the same batch.
+        Queries go through the query adapters (see QUERY_FUNCTIONS), and the worker count through the
+        adapter keyword argument workers_kwargs maps the Algorithm to: Algorithms without an adapter,
+        or mapped to None, are skipped; a keyword argument the adapter does not accept is an error,
+        as is having no single-core or no multi-core Algorithm to run.
+        
+        profileScaling(params = {}) -> data
+        
+        @type params: dictionary
+        @param params: parameters for the analysis; scaling_workers lists the worker counts
+        (None means the powers of two up to the available cores), workers_kwargs maps every
+        multi-core Algorithm to its worker count keyword argument (see WORKERS_KWARGS).
+        
+        @rtype: dictionary
+        @return: Baseline (best single-core Algorithm), Baseline Time, Skipped Algorithms,
+        and per multi-core Algorithm the Workers, Time, Stats, Speedup and Efficiency.
+        """
+        params = dict(PARAMS.items() + params.items())
+        workers = params["scaling_workers"] or worker_counts()
+        queryFunctions = params["query_functions"]
+        baselineAlgorithms = _queried(SC_ALGORITHMS, queryFunctions)
+        kwargs = dict((algorithm, params["workers_kwargs"].get(algorithm) if algorithm in queryFunctions else None) for algorithm in MC_ALGORITHMS)
+        for algorithm, kwarg in kwargs.items():
+            if kwarg is not None and not _acceptsKwarg(queryFunctions[algorithm], kwarg):
+                raise UnsupportedAlgorithmError("{} takes no {} argument: fix workers_kwargs.".format(ALGORITHMS_NAME[algorithm], str(kwarg)))
+        if all(kwarg is None for kwarg in kwargs.values()):
+            raise UnsupportedAlgorithmError("No multi-core algorithm has a query function and a worker count argument.")
+        graph = self._loadGraph(params)[0]
+        queries = make_queries(graph, osm_node_ids(params["source"]), params["queries"], params["query_strata"], params["query_stratify"], stream(params["seed"], -1))
+        self._timer = get_timer(params["clock"])
+        
+        baselines = []
+        for algorithm in baselineAlgorithms:
+            print "Profiling {} . . .".format(str(ALGORITHMS_NAME[algorithm]))
+            stats = self._profileBatch(graph, queryFunctions[algorithm], queries, {}, params)
+            baselines.append((stats["Median"], algorithm))
+        baselineTime, baseline = min(baselines)
+        
+        data = {"Baseline": ALGORITHMS_NAME[baseline], "Baseline Time": baselineTime, "Queries": len(queries), "Clock": params["clock"], "Skipped": [], "Scaling": []}
+        for algorithm in MC_ALGORITHMS:
+            kwarg = kwargs[algorithm]
+            if kwarg is None:
+                print "Skipping {}: no query function or worker count argument.".format(str(ALGORITHMS_NAME[algorithm]))
+                data["Skipped"].append(ALGORITHMS_NAME[algorithm])
+                continue
+            scaling = {"Algorithm": ALGORITHMS_NAME[algorithm], "Workers": [], "Time": [], "Stats": [], "Speedup": [], "Efficiency": []}
+            for count in workers:
+                print "Profiling {} ({} workers) . . .".format(str(ALGORITHMS_NAME[algorithm]), str(count))
+                stats = self._profileBatch(graph, queryFunctions[algorithm], queries, {kwarg: count}, params)
+                speedup = baselineTime / stats["Median"] if stats["Median"] else float("inf")
+                scaling["Workers"].append(count)
+                scaling["Time"].append(stats["Median"])
+                scaling["Stats"].append(stats)
+                scaling["Speedup"].append(speedup)
+                scaling["Efficiency"].append(speedup / count)
+            data["Scaling"].append(scaling)
+        return data
+    
+    def _profileBatch(self, graph, queryFunction, queries, kwargs, sampling):
+        """
+        Profiles a single Algorithm answering a whole query batch.
+        
+        _profileBatch(graph, queryFunction, queries, kwargs, sampling) -> stats
+        
+        @type graph: graph
+        @param graph: parsed graph.
+        @type queryFunction: function
+        @param queryFunction: query adapter of the Algorithm (see QUERY_FUNCTIONS).
+        @type queries: list of tuples
+        @param queries: (source, target, stratum) triples, as returned by make_queries.
+        @type kwargs: dictionary
+        @param kwargs: extra keyword arguments of queryFunction.
+        @type sampling: dictionary
+        @param sampling: sampling parameters (average_bound, or adaptive sampling bounds).
+        
+        @rtype: dictionary
+        @return: summary of the elapsed times of the batch.
+        """
+        now = self._timer.now
+        def measure(r):
+            start = now()
+            for source, target, stratum in queries:
+                queryFunction(graph, source, target, **kwargs)
+            stop = now()
+            return self._timer.elapsed(start, stop, len(queries))
+        
+        return summarize(collect(measure, sampling))
+    
+    def scalingData(self, data, directory = os.path.join(os.getcwd(), PARAMS["output_dir"])):
+        """
+        Stores to the specified directory a MathPlotLib plot of the speedup curves, and a table-as-string
+        of the times, speedups and parallel efficiencies computed by profileScaling (the table alone,
+        listing the skipped Algorithms, when there is no curve).
+        
+        scalingData(data, directory) -> None
+        
+        @type data: dictionary
+        @param data: the data computed by profileScaling.
+        @type directory: string
+        @param directory: directory to store the computed plot and table.
+        """
+        fileName = "{}  Scaling vs {}".format(" ".join([scaling["Algorithm"] for scaling in data["Scaling"]] + data["Skipped"]), data["Baseline"])
+        filePath = os.path.join(directory, str(fileName))
+        label = "Speedup vs {} ({} queries)".format(data["Baseline"], str(data["Queries"]))
+        if data["Scaling"]:
+            workers = sorted(set(count for scaling in data["Scaling"] for count in scaling["Workers"]))
+            formattedDataset = [[scaling["Workers"], scaling["Speedup"]] for scaling in data["Scaling"]] + [[workers, workers]]
+            legend = [scaling["Algorithm"] for scaling in data["Scaling"]] + ["Ideal"]
+            plot = make_plot(formattedDataset, label, "Workers", "Speedup", legend)
+            save_plot(plot, filePath)
+            plot.close()
+        
+        lines = [label, "", "Baseline\t{}\t{:.6e}".format(data["Baseline"], data["Baseline Time"]), "", "\t".join(["Algorithm", "Workers", "Time (s)", "Speedup", "Efficiency"])]
+        for scaling in data["Scaling"]:
+            for row in zip(scaling["Workers"], scaling["Time"], scaling["Speedup"], scaling["Efficiency"]):
+                lines.append("{}\t{}\t{:.6e}\t{:.3f}\t{:.3f}".format(scaling["Algorithm"], *row))
+        if data["Skipped"]:
+            lines += ["", "Skipped (no query function or worker count argument): " + " ".join(data["Skipped"])]
+        save_table("\n".join(lines) + "\n", filePath + ".txt")
+    
     def profileAll(self, params = {}):
         """
         Profiles all Algorithm, basing analysis upon the specified profiling parameters.
@@ -148,6 +533,8 @@ class ShortestPathProfiler(baseprofiler):
         @return: profiling results.
         """                      
         params = dict(PARAMS.items() + params.items())
+        if params["parallel"]:
+            return self._profileAllParallel(params)
         dataset = []
         for algorithm in ALGORITHMS:
             print "Profiling {} . . .".format(str(ALGORITHMS_NAME[algorithm]))
@@ -155,16 +542,73 @@ class ShortestPathProfiler(baseprofiler):
             dataset.append(self.profile(params)[0])        
         return dataset
     
-    def plotData(self, dataset, directory = os.path.join(os.getcwd(), PARAMS["output_dir"])):
+    def _profileAllParallel(self, params):
+        """
+        Profiles all Algorithm, farming every (algorithm, value) cell out to a pool of worker processes.
+        Each worker loads the graph once (from the parsed-graph cache, if enabled) and reuses it for all of its cells.
+        If shared_graph is set, the graph is instead published once as a CSR file that every worker maps
+        read-only (see SharedCSRGraph), so that workers do not hold a copy each.
+        
+        _profileAllParallel(params) -> data
+        
+        @type params: dictionary
+        @param params: parameters for the analysis.
+        
+        @rtype: list of dictionaries
+        @return: profiling results.
+        """
+        for algorithm in ALGORITHMS:
+            if algorithm not in ALGORITHMS_FUNCTION:
+                raise UnsupportedAlgorithmError()
+        
+        if params["shared_graph"]:
+            params = dict(params.items() + [("graph_representation", GRAPH_CSR)])
+        
+        #Parsed once here, so that workers only unpickle the cached graph (or map the shared one).
+        memory = {}
+        sharedPath = None
+        if params["graph_cache"] or params["graph_memory"] or params["shared_graph"]:
+            graph = self._loadGraph(params)[0]
+            if params["graph_memory"]:
+                memory = self._graphMemory(graph, params["source"])
+            if params["shared_graph"]:
+                sharedPath = self._shareGraph(graph, params)
+            del graph
+        cells = [dict(params.items() + [("algorithm", algorithm), ("value", value), ("shared_graph_path", sharedPath)]) for algorithm in ALGORITHMS for value in params["values"]]
+        try:
+            results = execute(_profileCell, cells, params["workers"], params["pin_workers"])
+        finally:
+            #Single-worker runs load (or map) the graph in this process: it is dropped, so that the next
+            #run goes through the graph cache again, and sees any change of the source.
+            for key in _GRAPHS.keys():
+                graph = _GRAPHS.pop(key)
+                if isinstance(graph, SharedCSRGraph):
+                    graph.close()
+            if sharedPath is not None:
+                os.remove(sharedPath)
+        
+        dataset = [{"Algorithm": ALGORITHMS_NAME[algorithm], "Profile Type": params["profile_type"], "Max Input": sorted(params["values"])[-1], "Const": params["const"], "Clock": params["clock"], "Representation": params["graph_representation"], "Shared": params["shared_graph"], "X": [], "Time": [], "Stats": []} for algorithm in ALGORITHMS]
+        for data in dataset:
+            data.update(memory)
+        for cell, stats in zip(cells, results):
+            data = dataset[ALGORITHMS.index(cell["algorithm"])]
+            data["X"].append(cell["value"])
+            data["Time"].append(stats["Median"])
+            data["Stats"].append(stats)
+        return dataset
+    
+    def plotData(self, dataset, directory = os.path.join(os.getcwd(), PARAMS["output_dir"]), errors = True):
         """
         Stores to the specified directory a MathPlotLib plot based on the specified dataset.
         
-        plot_data(dataset, directory) -> None
+        plot_data(dataset, directory, errors = True) -> None
         
         @type dataset: list of dictionaries
         @param dataset: the dataset to be plotted.
         @type directory: string
         @param directory: directory to store the computed MatPlotLib plot.
+        @type errors: boolean
+        @param errors: if True, confidence intervals and interquartile bands are plotted too.
         """                
         plotFileName = "{}  {}  {}-{}".format(" ".join([data["Algorithm"] for data in dataset]), str(PROFILE_TYPES_NAME[dataset[0]["Profile Type"]]), str(dataset[0]["Max Input"]), str(dataset[0]["Const"]))
         plotFilePath = os.path.join(directory, str(plotFileName))
@@ -173,22 +617,29 @@ class ShortestPathProfiler(baseprofiler):
         yLabel = "Time (s)"
         legend = (data["Algorithm"] for data in dataset)
         formattedDataset = []        
-        for data in dataset:
-            formattedDataset.append([data["X"], data["Time"]])
-        plot = make_plot(formattedDataset, plotLabel, xLabel, yLabel, legend)
+        if errors and all("Stats" in data for data in dataset):
+            for data in dataset:
+                formattedDataset.append([data["X"], data["Stats"]])
+            plot = make_error_plot(formattedDataset, plotLabel, xLabel, yLabel, legend)
+        else:
+            for data in dataset:
+                formattedDataset.append([data["X"], data["Time"]])
+            plot = make_plot(formattedDataset, plotLabel, xLabel, yLabel, legend)
         save_plot(plot, plotFilePath)
         plot.close()
         
-    def tableData(self, dataset, directory = os.path.join(os.getcwd(), PARAMS["output_dir"])):
+    def tableData(self, dataset, directory = os.path.join(os.getcwd(), PARAMS["output_dir"]), errors = True):
         """
         Stores to the specified directory a table-as-string based on the specified dataset.
         
-        table_data(dataset, directory) -> None
+        table_data(dataset, directory, errors = True) -> None
         
         @type dataset: list of dictionaries
         @param dataset: the dataset to be represented in table.
         @type directory: string
         @param directory: directory to store the computed table.
+        @type errors: boolean
+        @param errors: if True, confidence intervals, dispersion and outliers are tabled too.
         """        
         tableFileName = "{}  {}  {}-{}.txt".format(" ".join([data["Algorithm"] for data in dataset]), str(PROFILE_TYPES_NAME[dataset[0]["Profile Type"]]), str(dataset[0]["Max Input"]), str(dataset[0]["Const"]))
         tableFilePath = os.path.join(directory, str(tableFileName))
@@ -197,11 +648,61 @@ class ShortestPathProfiler(baseprofiler):
         yLabel = "Time (s)"
         legend = (data["Algorithm"] for data in dataset)
         formattedDataset = []
-        for data in dataset:
-            formattedDataset.append([data["X"], data["Time"]])
-        table = make_table(formattedDataset, plotLabel, xLabel, yLabel, legend)
+        if errors and all("Stats" in data for data in dataset):
+            for data in dataset:
+                formattedDataset.append([data["X"], data["Stats"]])
+            table = make_error_table(formattedDataset, plotLabel, xLabel, yLabel, legend)
+        else:
+            for data in dataset:
+                formattedDataset.append([data["X"], data["Time"]])
+            table = make_table(formattedDataset, plotLabel, xLabel, yLabel, legend)
+        if all("Load" in data for data in dataset):
+            table += "\nGraph Load\n" + "\t".join(["Algorithm", "Load (s)", "Cached"]) + "\n"
+            table += "".join("{}\t{:.6e}\t{}\n".format(data["Algorithm"], data["Load"], str(data["Load Cached"])) for data in dataset)
+        if all("Memory" in data for data in dataset):
+            table += "\nGraph Memory\n" + "\t".join(["Algorithm", "Representation", "Bytes", "Bytes Per Arc"]) + "\n"
+            table += "".join("{}\t{}\t{}\t{:.2f}\n".format(data["Algorithm"], data["Representation"], str(data["Memory"]), data["Memory Per Arc"]) for data in dataset)
         save_table(table, tableFilePath)    
 
+def _queried(algorithms, queryFunctions):
+    #The algorithms having a query adapter, in order; the others are reported, and having none is an error.
+    queried = [algorithm for algorithm in algorithms if algorithm in queryFunctions]
+    for algorithm in algorithms:
+        if algorithm not in queryFunctions:
+            print "Skipping {}: no query function.".format(str(ALGORITHMS_NAME[algorithm]))
+    if not queried:
+        raise UnsupportedAlgorithmError("No algorithm among {} has a query function in query_functions.".format(" ".join(ALGORITHMS_NAME[algorithm] for algorithm in algorithms)))
+    return queried
+
+def _acceptsKwarg(function, kwarg):
+    #Whether function takes kwarg by name (not when its signature cannot be inspected).
+    try:
+        spec = inspect.getargspec(function)
+    except TypeError:
+        return False
+    return kwarg in spec.args
+
+def _profileCell(params):
+    """
+    Worker entry point of ShortestPathProfiler parallel profiling.
+    
+    _profileCell(params) -> stats
+    
+    @type params: dictionary
+    @param params: parameters for the analysis, including the cell algorithm and value.
+    
+    @rtype: dictionary
+    @return: summary of the elapsed times.
+    """
+    sharedPath = params.get("shared_graph_path")
+    key = sharedPath or (params["source"], params["graph_representation"])
+    profiler = ShortestPathProfiler()
+    if key not in _GRAPHS:
+        _GRAPHS[key] = SharedCSRGraph(sharedPath) if sharedPath else profiler._loadGraph(params)[0]
+    algorithmFunction = ALGORITHMS_FUNCTION[params["algorithm"]]
+    profiler._timer = get_timer(params["clock"])
+    return profiler._profileCell(_GRAPHS[key], algorithmFunction, params["profile_type"], params["value"], params["const"], params)
+
 def __test(profiler, params):
     """
     SP-Solvers Algorithms Profiler Test.
@@ -223,6 +724,14 @@ def __test(profiler, params):
     print "### Variables: {}".format(str(params["values"]))
     print "### Constant: {}".format(str(params["const"]))
     print "### Average Bound: {}".format(str(params["average_bound"]))  
+    print "### Adaptive: {}".format(str(params["adaptive"]))
+    print "### Clock: {}".format(str(params["clock"]))
+    print "### Trace: {}".format(str(params["trace"]))
+    print "### Graph Cache: {}".format(str(params["graph_cache"]))
+    print "### Graph Representation: {}".format(str(params["graph_representation"]))
+    print "### Graph Memory: {}".format(str(params["graph_memory"]))
+    print "### Shared Graph: {}".format(str(params["shared_graph"]))
+    print "### Queries: {} ({} strata by {}, seed {})".format(str(params["queries"]), str(params["query_strata"]), str(params["query_stratify"]), str(params["seed"]))
     print "### Output Directory: {}\n".format(str(params["output_dir"]))
     print "Profiling . . ."
     data = profiler.profileAll(params)
@@ -230,6 +739,19 @@ def __test(profiler, params):
     profiler.plotData(data)
     print "Making Table . . .\n"
     profiler.tableData(data)
+    if params["query_functions"]:
+        print "Profiling Queries . . ."
+        profiler.queryData(profiler.profileQueries(params))
+        if any(params["workers_kwargs"].values()):
+            print "Profiling Multi-Core Scaling . . ."
+            profiler.scalingData(profiler.profileScaling(params))
+        else:
+            print "Skipping Multi-Core Scaling: no worker count arguments (see WORKERS_KWARGS)."
+    else:
+        print "Skipping Queries: no query functions (see QUERY_FUNCTIONS)."
+    if params["trace"]:
+        print "Recording Trace . . .\n"
+        profiler.recordTrace(dict(params.items() + [("algorithm", ALGORITHMS[0])]))
     
     print "\n### END OF TEST ###\n"
 
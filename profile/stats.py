@@ -0,0 +1,197 @@
+#Statistics Imports
+import math, random
+
+#Statistics parameters
+PERCENTILES = [5, 25, 75, 95]
+CONFIDENCE = 0.95
+BOOTSTRAP_RESAMPLES = 1000
+BOOTSTRAP_SEED = 0
+OUTLIER_FENCE = 1.5
+
+def mean(values):
+    """
+    Returns the arithmetic mean of values.
+
+    mean(values) -> mean
+
+    @type values: list of numbers
+    @param values: non-empty samples.
+
+    @rtype: float
+    @return: arithmetic mean.
+    """
+    return float(sum(values)) / len(values)
+
+def median(values):
+    """
+    Returns the median of values.
+
+    median(values) -> median
+
+    @type values: list of numbers
+    @param values: non-empty samples.
+
+    @rtype: float
+    @return: median.
+    """
+    return percentile(values, 50)
+
+def percentile(values, p):
+    """
+    Returns the p-th percentile of values, linearly interpolated between closest ranks.
+
+    percentile(values, p) -> percentile
+
+    @type values: list of numbers
+    @param values: non-empty samples.
+    @type p: number
+    @param p: percentile, in [0, 100].
+
+    @rtype: float
+    @return: p-th percentile.
+    """
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100.0
+    low = int(math.floor(rank))
+    high = int(math.ceil(rank))
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+def stdev(values):
+    """
+    Returns the sample standard deviation of values (0 for a single sample).
+
+    stdev(values) -> stdev
+
+    @type values: list of numbers
+    @param values: non-empty samples.
+
+    @rtype: float
+    @return: sample standard deviation.
+    """
+    if len(values) < 2:
+        return 0.0
+    m = mean(values)
+    return math.sqrt(sum((v - m) ** 2 for v in values) / (len(values) - 1))
+
+def bootstrap_ci(values, estimator = median, confidence = CONFIDENCE, resamples = BOOTSTRAP_RESAMPLES, seed = BOOTSTRAP_SEED):
+    """
+    Returns the percentile bootstrap confidence interval of estimator over values.
+
+    bootstrap_ci(values, estimator = median, confidence = CONFIDENCE, resamples = BOOTSTRAP_RESAMPLES, seed = BOOTSTRAP_SEED) -> (low, high)
+
+    @type values: list of numbers
+    @param values: non-empty samples.
+    @type estimator: function
+    @param estimator: statistic to be bootstrapped.
+    @type confidence: float
+    @param confidence: confidence level, in (0, 1).
+    @type resamples: int
+    @param resamples: number of bootstrap resamples.
+    @type seed: int
+    @param seed: resampling seed, so that intervals are reproducible.
+
+    @rtype: tuple
+    @return: (low, high) confidence bounds.
+    """
+    if len(values) < 2:
+        return (values[0], values[0])
+    rand = random.Random(seed)
+    n = len(values)
+    estimates = [estimator([values[int(rand.random() * n)] for i in range(n)]) for r in range(resamples)]
+    tail = (1.0 - confidence) * 50
+    return (percentile(estimates, tail), percentile(estimates, 100 - tail))
+
+def median_ci(values, z = 1.96):
+    """
+    Returns the distribution-free confidence interval of the median, bounded by the order
+    statistics of ranks n/2 -/+ z * sqrt(n) / 2. Cheap enough to be recomputed after every sample.
+
+    median_ci(values, z = 1.96) -> (low, high)
+
+    @type values: list of numbers
+    @param values: non-empty samples.
+    @type z: float
+    @param z: standard normal quantile of the confidence level.
+
+    @rtype: tuple
+    @return: (low, high) confidence bounds.
+    """
+    ordered = sorted(values)
+    n = len(ordered)
+    spread = z * math.sqrt(n) / 2.0
+    low = max(0, int(math.floor(n / 2.0 - spread)))
+    high = min(n - 1, int(math.ceil(n / 2.0 + spread)) - 1)
+    return (ordered[low], ordered[max(low, high)])
+
+def outliers(values, fence = OUTLIER_FENCE):
+    """
+    Flags the values lying beyond Tukey's fences (fence times the interquartile range
+    below the first or above the third quartile).
+
+    outliers(values, fence = OUTLIER_FENCE) -> flags
+
+    @type values: list of numbers
+    @param values: non-empty samples.
+    @type fence: float
+    @param fence: interquartile range multiplier.
+
+    @rtype: list of booleans
+    @return: True for every outlier, in values order.
+    """
+    q1 = percentile(values, 25)
+    q3 = percentile(values, 75)
+    low = q1 - fence * (q3 - q1)
+    high = q3 + fence * (q3 - q1)
+    return [v < low or v > high for v in values]
+
+def summarize(values):
+    """
+    Returns the robust summary of a sample vector.
+
+    summarize(values) -> summary
+
+    @type values: list of numbers
+    @param values: non-empty samples.
+
+    @rtype: dictionary
+    @return: Samples, Count, Mean, Median, Min, Max, Percentiles (by PERCENTILES), Stdev, CI (bootstrap
+    confidence interval of the median) and Outliers (flags, in Samples order).
+    """
+    values = list(values)
+    return {"Samples": values,
+            "Count": len(values),
+            "Mean": mean(values),
+            "Median": median(values),
+            "Min": min(values),
+            "Max": max(values),
+            "Percentiles": dict((p, percentile(values, p)) for p in PERCENTILES),
+            "Stdev": stdev(values),
+            "CI": bootstrap_ci(values),
+            "Outliers": outliers(values)}
+
+def __test():
+    """
+    Statistics Test: checks summarize against hand-computed values.
+
+    __test() -> None
+    """
+    print "### iPATH TEST STATISTICS\n"
+    values = [4, 1, 3, 2, 9, 5, 7, 6, 8, 100]
+    summary = summarize(values)
+    print "Summary: {}".format(str(dict((key, summary[key]) for key in ["Count", "Mean", "Median", "Min", "Max", "Stdev", "CI"])))
+    assert summary["Samples"] == values and summary["Count"] == 10
+    assert summary["Mean"] == 14.5 and summary["Median"] == 5.5
+    assert summary["Min"] == 1 and summary["Max"] == 100
+    expected = {5: 1.45, 25: 3.25, 75: 7.75, 95: 59.05}
+    assert all(abs(summary["Percentiles"][p] - expected[p]) < 1e-9 for p in PERCENTILES)
+    assert abs(summary["Stdev"] - math.sqrt(sum((v - 14.5) ** 2 for v in values) / 9)) < 1e-12
+    low, high = summary["CI"]
+    assert 1 <= low <= summary["Median"] <= high <= 100 and summarize(values)["CI"] == (low, high)
+    assert summary["Outliers"] == [False] * 9 + [True]
+    single = summarize([3.0])
+    assert single["Median"] == single["Mean"] == 3.0 and single["Stdev"] == 0.0 and single["CI"] == (3.0, 3.0)
+    assert median_ci(range(100)) == (40, 59)
+    print "\n### END OF TEST ###\n"
+
+if __name__ == "__main__":
+    __test()
@@ -0,0 +1,74 @@
+#Plotting Imports
+import matplotlib.pyplot as plt
+
+#Error rendering parameters
+BAND = (25, 75)
+VALUE_FORMAT = "{:.6e}"
+
+def make_error_plot(dataset, label, xlabel, ylabel, legend):
+    """
+    Makes a MathPlotLib plot of medians with confidence-interval error bars and interquartile bands.
+
+    make_error_plot(dataset, label, xlabel, ylabel, legend) -> plot
+
+    @type dataset: list
+    @param dataset: list of [X, summaries] pairs, summaries as computed by stats.summarize.
+    @type label: string
+    @param label: plot title.
+    @type xlabel: string
+    @param xlabel: X axis label.
+    @type ylabel: string
+    @param ylabel: Y axis label.
+    @type legend: iterable of strings
+    @param legend: series names, in dataset order.
+
+    @rtype: module
+    @return: the MatPlotLib pyplot holding the plot.
+    """
+    plt.figure()
+    for (X, summaries), name in zip(dataset, legend):
+        medians = [summary["Median"] for summary in summaries]
+        lows = [summary["Median"] - summary["CI"][0] for summary in summaries]
+        highs = [summary["CI"][1] - summary["Median"] for summary in summaries]
+        line = plt.errorbar(X, medians, yerr = [lows, highs], marker = "o", capsize = 3, label = name)
+        band_low = [summary["Percentiles"][BAND[0]] for summary in summaries]
+        band_high = [summary["Percentiles"][BAND[1]] for summary in summaries]
+        plt.fill_between(X, band_low, band_high, color = line[0].get_color(), alpha = 0.2)
+    plt.title(label)
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    plt.legend(loc = "upper left")
+    plt.grid(True)
+    return plt
+
+def make_error_table(dataset, label, xlabel, ylabel, legend):
+    """
+    Makes a table-as-string of medians, confidence intervals, standard deviations and outlier counts.
+
+    make_error_table(dataset, label, xlabel, ylabel, legend) -> table
+
+    @type dataset: list
+    @param dataset: list of [X, summaries] pairs, summaries as computed by stats.summarize.
+    @type label: string
+    @param label: table title.
+    @type xlabel: string
+    @param xlabel: X column label.
+    @type ylabel: string
+    @param ylabel: measure label.
+    @type legend: iterable of strings
+    @param legend: series names, in dataset order.
+
+    @rtype: string
+    @return: the table.
+    """
+    lines = [label, ""]
+    for (X, summaries), name in zip(dataset, legend):
+        lines.append("{} - {}".format(str(name), str(ylabel)))
+        lines.append("\t".join([str(xlabel), "Median", "CI Low", "CI High", "Stdev", "Min", "Max", "Samples", "Outliers"]))
+        for x, summary in zip(X, summaries):
+            values = [summary["Median"], summary["CI"][0], summary["CI"][1], summary["Stdev"], summary["Min"], summary["Max"]]
+            row = [str(x)] + [VALUE_FORMAT.format(value) for value in values]
+            row += [str(len(summary["Samples"])), str(sum(summary["Outliers"]))]
+            lines.append("\t".join(row))
+        lines.append("")
+    return "\n".join(lines)
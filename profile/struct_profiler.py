@@ -1,22 +1,28 @@
 from control.profile.base.baseprofiler import baseprofiler
 from output.__init__ import OUTPUT_DIR
 from exception.exceptions import UnsupportedDataStructureError
-from model.base.baselinkedlist import baselinkedlist
-from model.base.basequeue import basequeue
-from model.base.basestack import basestack
-from model.base.basetree import basetree
-from model.base.basepriorityqueue import basepriorityqueue
-from model.base.basegraph import basegraph
 from model.linkedlist import SimpleLinkedList, DoubleLinkedList
 from model.queue import QueueLinkedList, QueueDeque
 from model.stack import StackLinkedList, StackArrayList, StackDeque
 from model.tree import RelationTree, DictTree, TreeArrayList
 from model.graph import GraphIncidenceList, GraphIncidenceSet
 from model.priority_queue import DHeap
-from utils.math_utils import average
+from control.profile.csr_graph import CSRGraph
+from control.profile.memory import deep_size
+from control.profile.stats import summarize
+from control.profile.sampling import collect, DEFAULT_TARGET_CI, DEFAULT_MIN_SAMPLES, DEFAULT_MAX_SAMPLES, DEFAULT_CELL_BUDGET
+from control.profile.stats_plotter import make_error_plot, make_error_table
+from control.profile.complexity import fit, is_worse, make_fit_table, LINEAR as O_N, LINEARITHMIC as O_N_LOG_N
+from control.profile.executor import execute
+from control.profile.histogram import LatencyHistogram, make_latency_table, DEFAULT_LATENCY_BATCH, BATCH_CALIBRATION
+from control.profile.fixture import Fixture
+from control.profile.workload_trace import read, calls, bind_priority_queue, bind_graph, PRIORITY_QUEUE as TRACE_PRIORITY_QUEUE, GRAPH as TRACE_GRAPH
+from control.profile.operands import stream, choices, growing_choices, residual_overhead, make_overhead_table, DEFAULT_SEED
+from control.profile.sweep import plan, run, run_groups, LINEAR, GEOMETRIC, ADAPTIVE, DEFAULT_POINTS, DEFAULT_MIN_INPUT, DEFAULT_REFINE_ROUNDS, DEFAULT_REFINE_POINTS
 from control.plot.plotter_controller import make_plot, save_plot, make_table, save_table
-import os, random
-from time import clock as time
+from control.profile.timer import get_timer, WALL
+from functools import partial
+import os, heapq
 
 LINKED_LIST = 0
 QUEUE = 1
@@ -33,56 +39,266 @@ STRUCTURES_NAME = {LINKED_LIST: "LinkedList",
                                   PRIORITY_QUEUE: "PriorityQueue",
                                   GRAPH: "Graph"}
 
+#DHeap arities profiled as implementations, and swept by StructProfiler.profile_arity
+HEAP_ARITIES = [2, 4]
+ARITIES = [2, 3, 4, 6, 8, 16, 32, 64]
+ARITY_OPERATIONS = ["insert", "delete_min", "decrease_key", "mixed"]
+
+#Mixed priority-queue workload: share of each call
+MIXED_WORKLOAD = {"insert": 0.5, "delete_min": 0.2, "decrease_key": 0.3}
+
+#Populate steps: populate(instance, X, rand) fills a new instance before timing
+def _fill(call):
+    def populate(instance, iteration, rand):
+        add = getattr(instance, call)
+        for r in range(iteration):
+            add(r)
+    return populate
+
+def _fill_keyed(call, key = None):
+    def populate(instance, iteration, rand):
+        add = getattr(instance, call)
+        for r in range(iteration):
+            add(r, r if key is None else key)
+    return populate
+
+def _fill_tree(instance, iteration, rand):
+    parents = growing_choices(rand, [0] + range(iteration), 1, iteration)
+    for r in range(iteration):
+        instance.insert(parents[r], r)
+
+def _fill_path_tree(instance, iteration, rand):
+    parents = growing_choices(rand, range(iteration), 1, iteration - 1)
+    for r in range(1, iteration):
+        instance.insert(parents[r - 1], r)
+
+def _fill_graph(instance, iteration, rand):
+    nodes = range(iteration)
+    for r in nodes:
+        instance.add_node(r, r)
+    for randomNodeAId, randomNodeBId in zip(choices(rand, nodes, iteration), choices(rand, nodes, iteration)):
+        instance.add_arc(randomNodeAId, randomNodeBId)
+    #Static representations compact their rows once loaded, as after parsing.
+    if hasattr(instance, "freeze"):
+        instance.freeze()
+
+#Call of operations whose operands hold a pre-bound method per call, for interleaved workloads (see _bind)
+DISPATCH = "dispatch"
+
+#Operand generators: operands(instance, X, rand) returns the argument columns of the X timed calls
+def _no_operands(instance, iteration, rand):
+    return []
+
+def _sequence(instance, iteration, rand):
+    return [range(iteration)]
+
+def _keyed_sequence(instance, iteration, rand):
+    return [range(iteration), range(iteration)]
+
+def _first_record(instance, iteration, rand):
+    return [[instance.get_first_record()] * iteration]
+
+def _tree_insert_operands(instance, iteration, rand):
+    return [growing_choices(rand, [0] + range(iteration), 1, iteration), range(iteration)]
+
+def _tree_make_son_operands(instance, iteration, rand):
+    return [range(iteration), choices(rand, [0] + range(iteration), iteration)]
+
+def _node_operands(instance, iteration, rand):
+    return [choices(rand, range(iteration), iteration)]
+
+def _arc_operands(instance, iteration, rand):
+    nodes = range(iteration)
+    return [choices(rand, nodes, iteration), choices(rand, nodes, iteration)]
+
+def _arc_status_operands(instance, iteration, rand):
+    return _arc_operands(instance, iteration, rand) + [[None] * iteration]
+
+def _decrease_key_operands(instance, iteration, rand):
+    return [choices(rand, range(iteration), iteration), [5] * iteration]
+
+def _mixed_operands(instance, iteration, rand):
+    """
+    Generates a Dijkstra-like interleaving of insert, delete_min and decrease_key calls on an empty
+    priority queue (in MIXED_WORKLOAD proportions), simulating the queue so that every delete_min
+    finds an item and every decrease_key hits a queued item with a lower key. Keys are distinct.
+    The columns are the methods of instance to be called, pre-bound, and their argument tuples
+    (see DISPATCH).
+    """
+    insert, delete_min, decrease_key = instance.insert, instance.delete_min, instance.decrease_key
+    calls, rows = [], []
+    live = [] #queued infos
+    position = {} #info -> index in live
+    current = {} #info -> key
+    heap = [] #(key, info), lazily deleted
+    insert_bound = MIXED_WORKLOAD["insert"]
+    delete_bound = insert_bound + MIXED_WORKLOAD["delete_min"]
+    for j in range(iteration):
+        u = rand.random()
+        if not live or u < insert_bound:
+            info, key = j, rand.random()
+            position[info] = len(live)
+            live.append(info)
+            current[info] = key
+            heapq.heappush(heap, (key, info))
+            calls.append(insert)
+            rows.append((info, key))
+        elif u < delete_bound:
+            while True:
+                key, info = heapq.heappop(heap)
+                if current.get(info) == key:
+                    break
+            last = live.pop()
+            if last != info:
+                live[position[info]] = last
+                position[last] = position[info]
+            del position[info], current[info]
+            calls.append(delete_min)
+            rows.append(())
+        else:
+            info = live[int(rand.random() * len(live))]
+            key = current[info] * rand.random()
+            current[info] = key
+            heapq.heappush(heap, (key, info))
+            calls.append(decrease_key)
+            rows.append((info, key))
+    return [calls, rows]
+
+def operation(call, populate = None, operands = _no_operands, shared = False):
+    """
+    Declares a profiled operation.
+    
+    operation(call, populate = None, operands = _no_operands, shared = False) -> spec
+    
+    @type call: string or function
+    @param call: name of the timed method, call(instance) returning the timed function, or DISPATCH
+    when the operands are the timed bound methods themselves with their argument tuples.
+    @type populate: function
+    @param populate: populate(instance, X, rand) fills a new instance before timing (None for an empty instance).
+    @type operands: function
+    @param operands: operands(instance, X, rand) returns the argument columns of the X timed calls.
+    @type shared: boolean
+    @param shared: if True, the call does not modify the instance, which is built once for all repetitions.
+    
+    @rtype: dictionary
+    @return: operation spec (Call, Populate, Operands, Shared).
+    """
+    return {"Call": call, "Populate": populate, "Operands": operands, "Shared": shared}
+
 STRUCTURES_INSTANCE = {LINKED_LIST: {"Implementations": {"SimpleLinkedList": SimpleLinkedList, 
                                                            "DoubleLinkedList": DoubleLinkedList},
-                                       "Operations": {"add_as_first": baselinkedlist.add_as_first,
-                                                      "add_as_last": baselinkedlist.add_as_last,
-                                                      "pop_first": baselinkedlist.pop_first,
-                                                      "pop_last": baselinkedlist.pop_last,
-                                                      "delete_record": baselinkedlist.delete_record}}, 
+                                       "Operations": {"add_as_first": operation("add_as_first", operands = _sequence),
+                                                      "add_as_last": operation("add_as_last", operands = _sequence),
+                                                      "pop_first": operation("pop_first", _fill("add_as_first")),
+                                                      "pop_last": operation("pop_last", _fill("add_as_first")),
+                                                      "delete_record": operation("delete_record", _fill("add_as_first"), _first_record)}}, 
                         QUEUE: {"Implementations": {"QueueLinkedList": QueueLinkedList, 
                                                       "QueueDeque": QueueDeque}, 
-                                  "Operations": {"enqueue": basequeue.enqueue,
-                                                 "get_first": basequeue.get_first,
-                                                 "dequeue": basequeue.dequeue}},
+                                  "Operations": {"enqueue": operation("enqueue", operands = _sequence),
+                                                 "get_first": operation("get_first", _fill("enqueue")),
+                                                 "dequeue": operation("dequeue", _fill("enqueue"))}},
                         STACK: {"Implementations": {"StackLinkedList": StackLinkedList, 
                                                       "StackArrayList": StackArrayList, 
                                                       "StackDeque": StackDeque}, 
-                                  "Operations": {"push": basestack.push,
-                                                 "top": basestack.top,
-                                                 "pop": basestack.pop}},
-                        TREE: {"Implementations": {"RelationTree": RelationTree,
-                                                   "DictTree": DictTree,
-                                                   "TreeArrayList": TreeArrayList},
-                                 "Operations": {"insert": basetree.insert,
-                                                "make_son": basetree.make_son,
-                                                "get_path_to": basetree.get_path_to}},
-                        PRIORITY_QUEUE: {"Implementations": {"2Heap": DHeap,
-                                                              "4Heap": DHeap},
-                                                              #"8Heap": DHeap},,
-                                                              #"16Heap": DHeap,
-                                                              #"32Heap": DHeap,
-                                                              #"64Heap": DHeap},
-                                          "Operations": {"insert": basepriorityqueue.insert,
-                                                         "delete_min": basepriorityqueue.delete_min,
-                                                         "decrease_key": basepriorityqueue.decrease_key}},
+                                  "Operations": {"push": operation("push", operands = _sequence),
+                                                 "top": operation("top", _fill("push")),
+                                                 "pop": operation("pop", _fill("push"))}},
+                        TREE: {"Implementations": {"RelationTree": partial(RelationTree, 0),
+                                                   "DictTree": partial(DictTree, 0),
+                                                   "TreeArrayList": partial(TreeArrayList, 0)},
+                                 "Operations": {"insert": operation("insert", operands = _tree_insert_operands),
+                                                "make_son": operation("make_son", _fill_tree, _tree_make_son_operands),
+                                                "get_path_to": operation("get_path_to", _fill_path_tree, _node_operands, shared = True)}},
+                        PRIORITY_QUEUE: {"Implementations": dict(("{}Heap".format(arity), partial(DHeap, arity)) for arity in HEAP_ARITIES),
+                                          "Operations": {"insert": operation("insert", operands = _keyed_sequence),
+                                                         "delete_min": operation("delete_min", _fill_keyed("insert")),
+                                                         "decrease_key": operation("decrease_key", _fill_keyed("insert", 1000), _decrease_key_operands),
+                                                         "mixed": operation(DISPATCH, operands = _mixed_operands)}},
                         GRAPH: {"Implementations": {"IncidenceList": GraphIncidenceList,
-                                                    "IncidenceSet": GraphIncidenceSet},
-                                    "Operations": {"add_node": basegraph.add_node,
-                                                   "add_arc": basegraph.add_arc,
-                                                   "get_incident_arcs": basegraph.get_incident_arcs,
-                                                   "set_arc_status": basegraph.set_arc_status}}}
+                                                    "IncidenceSet": GraphIncidenceSet,
+                                                    "CSR": CSRGraph},
+                                    "Operations": {"add_node": operation("add_node", operands = _sequence),
+                                                   "add_arc": operation("add_arc", _fill_keyed("add_node"), _arc_operands),
+                                                   "get_incident_arcs": operation("get_incident_arcs", _fill_graph, _node_operands),
+                                                   "set_arc_status": operation("set_arc_status", _fill_graph, _arc_status_operands)}}}
+
+#Expected asymptotic class of the total time of X operations on a structure of size X
+EXPECTED_COMPLEXITY = {LINKED_LIST: {"add_as_first": O_N, "add_as_last": O_N, "pop_first": O_N, "pop_last": O_N, "delete_record": O_N},
+                       QUEUE: {"enqueue": O_N, "get_first": O_N, "dequeue": O_N},
+                       STACK: {"push": O_N, "top": O_N, "pop": O_N},
+                       TREE: {"insert": O_N, "make_son": O_N, "get_path_to": O_N_LOG_N},
+                       PRIORITY_QUEUE: {"insert": O_N_LOG_N, "delete_min": O_N_LOG_N, "decrease_key": O_N_LOG_N, "mixed": O_N_LOG_N},
+                       GRAPH: {"add_node": O_N, "add_arc": O_N, "get_incident_arcs": O_N, "set_arc_status": O_N}}
+
+def register_implementation(structure, name, constructor):
+    """
+    Registers a new implementation of a Data-Structure, to be profiled against every operation.
+    
+    register_implementation(structure, name, constructor) -> None
+    
+    @type structure: int
+    @param structure: one of STRUCTURES.
+    @type name: string
+    @param name: implementation name.
+    @type constructor: function
+    @param constructor: constructor() returns a new empty instance.
+    """
+    STRUCTURES_INSTANCE[structure]["Implementations"][name] = constructor
+
+def register_operation(structure, name, spec, expected = None):
+    """
+    Registers a new operation of a Data-Structure, to be profiled on every implementation.
+    
+    register_operation(structure, name, spec, expected = None) -> None
+    
+    @type structure: int
+    @param structure: one of STRUCTURES.
+    @type name: string
+    @param name: operation name.
+    @type spec: dictionary
+    @param spec: operation spec, as returned by operation.
+    @type expected: string
+    @param expected: expected asymptotic class of X operations (see complexity), if any.
+    """
+    STRUCTURES_INSTANCE[structure]["Operations"][name] = spec
+    if expected is not None:
+        EXPECTED_COMPLEXITY.setdefault(structure, {})[name] = expected
+
+SAMPLING_PARAMS = ["average_bound", "adaptive", "target_ci", "min_samples", "max_samples", "cell_budget", "latency", "latency_batch", "seed", "fixture"]
 
 PARAMS = {"structure": LINKED_LIST,
           "operation": "add_as_first",
           "max_input": 20000,
+          "sweep": LINEAR,
+          "points": DEFAULT_POINTS,
+          "min_input": DEFAULT_MIN_INPUT,
+          "inputs": [],
+          "refine_rounds": DEFAULT_REFINE_ROUNDS,
+          "refine_points": DEFAULT_REFINE_POINTS,
           "average_bound": 10,
+          "adaptive": False,
+          "target_ci": DEFAULT_TARGET_CI,
+          "min_samples": DEFAULT_MIN_SAMPLES,
+          "max_samples": DEFAULT_MAX_SAMPLES,
+          "cell_budget": DEFAULT_CELL_BUDGET,
+          "latency": False,
+          "latency_batch": DEFAULT_LATENCY_BATCH,
+          "seed": DEFAULT_SEED,
+          "fixture": True,
+          "arities": ARITIES,
+          "trace": None,
+          "clock": WALL,
+          "parallel": False,
+          "workers": None,
+          "pin_workers": True,
           "output_dir": OUTPUT_DIR}
 
 class StructProfiler(baseprofiler):    
     
     def __init__(self):
-        pass
+        self._timer = get_timer(PARAMS["clock"])
+        self._histogram = None
+        self._latency_batch = DEFAULT_LATENCY_BATCH
     
     def profile(self, params = {}):
         """
@@ -100,24 +316,12 @@ class StructProfiler(baseprofiler):
         params = dict(PARAMS.items() + params.items())        
         structure = params["structure"]
         operation = params["operation"]
-        max_input = params["max_input"]
-        average_bound = params["average_bound"]
+        self._timer = get_timer(params["clock"])
         
         if structure not in STRUCTURES_INSTANCE or operation not in STRUCTURES_INSTANCE[structure]["Operations"]:
             raise UnsupportedDataStructureError()   
            
-        if structure is LINKED_LIST:
-            dataset = self._profile_linked_list(operation, max_input, average_bound)
-        elif structure is QUEUE:
-            dataset = self._profile_queue(operation, max_input, average_bound)
-        elif structure is STACK:
-            dataset = self._profile_stack(operation, max_input, average_bound)
-        elif structure is TREE:
-            dataset = self._profile_tree(operation, max_input, average_bound)
-        elif structure is PRIORITY_QUEUE:
-            dataset = self._profile_priority_queue(operation, max_input, average_bound)
-        elif structure is GRAPH:
-            dataset = self._profile_graph(operation, max_input, average_bound)            
+        dataset = self._profile_structure(structure, operation, params)
         return dataset
     
     def profile_all(self, params):
@@ -134,6 +338,8 @@ class StructProfiler(baseprofiler):
         """
         
         params = dict(PARAMS.items() + params.items())        
+        if params["parallel"]:
+            return self._profile_all_parallel(params)
         dataset = []
         structure = params["structure"]
         for operation in STRUCTURES_INSTANCE[structure]["Operations"].iterkeys():
@@ -143,404 +349,330 @@ class StructProfiler(baseprofiler):
             dataset.append(data)
         return dataset            
     
-    def _profile_linked_list(self, operation, max_input, average_bound):
+    def _profile_all_parallel(self, params):
+        """
+        Profiles all Data-Structure's Operations, farming every (implementation, operation, X) cell
+        out to a pool of worker processes.
+        
+        _profile_all_parallel(params) -> data
+        
+        @type params: dictionary
+        @param params: parameters for the analysis.
+        
+        @rtype: list of dictionaries
+        @return: profiling results.
+        """
+        structure = params["structure"]
+        sampling = dict((key, params[key]) for key in SAMPLING_PARAMS)
+        if structure not in STRUCTURES_INSTANCE:
+            raise UnsupportedDataStructureError()
+        
+        operations = list(STRUCTURES_INSTANCE[structure]["Operations"].iterkeys())
+        implementations = list(STRUCTURES_INSTANCE[structure]["Implementations"].iterkeys())
+        groups = [(operation, implementation) for operation in operations for implementation in implementations]
+        
+        def measure_cells(cells):
+            cells = [(params["clock"], structure, implementation, operation, x, sampling) for ((operation, implementation), x) in cells]
+            return execute(_get_time_cell, cells, params["workers"], params["pin_workers"])
+        
+        series = run_groups(measure_cells, groups, params)
+        
         dataset = []
-        for implementation in STRUCTURES_INSTANCE[LINKED_LIST]["Implementations"].iterkeys():
-            data = {"Structure": LINKED_LIST, "Implementation": implementation, "Operation": str(operation), "Max Input": max_input, "X": [], "time": []}
-            interval = max_input / 10
-            for x in range(0, max_input + 1, interval):
-                averageTime = self._get_time_linked_list(implementation, operation, x, average_bound)
-                data["X"].append(x)
-                data["time"].append(averageTime)                
-            dataset.append(data)
+        for operation in operations:
+            struct_data = []
+            for implementation in implementations:
+                X, results = series[(operation, implementation)]
+                struct_data.append(self._make_data(structure, implementation, operation, X, results, params))
+            dataset.append(struct_data)
         return dataset
     
-    def _profile_queue(self, operation, max_input, average_bound):
+    def _profile_structure(self, structure, operation, params):
+        sampling = dict((key, params[key]) for key in SAMPLING_PARAMS)
         dataset = []
-        for implementation in STRUCTURES_INSTANCE[QUEUE]["Implementations"]:
-            data = {"Structure": QUEUE, "Implementation": implementation, "Operation": str(operation), "Max Input": max_input, "X": [], "time": []}
-            interval = max_input / 10
-            for x in range(0, max_input + 1, interval):
-                averageTime = self._get_time_queue(implementation, operation, x, average_bound)
-                data["X"].append(x)
-                data["time"].append(averageTime)                
-            dataset.append(data)
+        for implementation in STRUCTURES_INSTANCE[structure]["Implementations"].iterkeys():
+            X, results = run(lambda x: self._get_time(structure, implementation, operation, x, sampling), params)
+            dataset.append(self._make_data(structure, implementation, operation, X, results, params))
         return dataset
     
-    def _profile_stack(self, operation, max_input, average_bound):
+    def profile_arity(self, params = {}):
+        """
+        Profiles DHeap priority-queue operations sweeping the heap arity d jointly with X, and finds
+        the arity minimizing the cost of each operation at every X.
+        
+        profile_arity(params = {}) -> data
+        
+        @type params: dictionary
+        @param params: parameters for the analysis (arities lists the swept arities).
+        
+        @rtype: list of dictionaries
+        @return: one dictionary per operation in ARITY_OPERATIONS, holding Arities, X, Surface
+        (Surface[x][d]: median time at the x-th X and d-th arity), Stats (in Surface layout) and Best (best arity per X).
+        """
+        
+        params = dict(PARAMS.items() + params.items())
+        self._timer = get_timer(params["clock"])
+        #The surface needs the same X for every arity: adaptive refinement is per group.
+        if params["sweep"] == ADAPTIVE:
+            params["sweep"] = GEOMETRIC
+        sampling = dict((key, params[key]) for key in SAMPLING_PARAMS)
+        arities = sorted(params["arities"])
+        groups = [(operation, arity) for operation in ARITY_OPERATIONS for arity in arities]
+        
+        def measure_cells(cells):
+            cells = [(params["clock"], arity, operation, x, sampling) for ((operation, arity), x) in cells]
+            if params["parallel"]:
+                return execute(_get_arity_time_cell, cells, params["workers"], params["pin_workers"])
+            return [self._get_arity_time(*cell[1:]) for cell in cells]
+        
+        series = run_groups(measure_cells, groups, params)
+        
         dataset = []
-        for implementation in STRUCTURES_INSTANCE[STACK]["Implementations"]:
-            data = {"Structure": STACK, "Implementation": implementation, "Operation": str(operation), "Max Input": max_input, "X": [], "time": []}
-            interval = max_input / 10
-            for x in range(0, max_input + 1, interval):
-                averageTime = self._get_time_stack(implementation, operation, x, average_bound)
-                data["X"].append(x)
-                data["time"].append(averageTime)                
-            dataset.append(data)            
+        for operation in ARITY_OPERATIONS:
+            X = series[(operation, arities[0])][0]
+            stats = [[series[(operation, arity)][1][x] for arity in arities] for x in range(len(X))]
+            surface = [[cell["Median"] for cell in row] for row in stats]
+            best = [arities[row.index(min(row))] for row in surface]
+            dataset.append({"Structure": PRIORITY_QUEUE,
+                            "Operation": operation,
+                            "Max Input": max(X or [params["max_input"]]),
+                            "Clock": params["clock"],
+                            "Arities": arities,
+                            "X": X,
+                            "Surface": surface,
+                            "Stats": stats,
+                            "Best": best})
         return dataset
     
-    def _profile_tree(self, operation, max_input, average_bound):
+    def _get_arity_time(self, arity, operation, iteration, sampling):
+        spec = STRUCTURES_INSTANCE[PRIORITY_QUEUE]["Operations"][operation]
+        return self._time_operation(partial(DHeap, arity), spec, iteration, sampling)
+    
+    def replay_trace(self, path, params = {}):
+        """
+        Replays a workload trace (see ShortestPathProfiler.recordTrace) against every PriorityQueue
+        and Graph implementation: priority-queue calls on new instances, graph accesses on the
+        accessed subgraph, rebuilt once per implementation.
+        
+        replay_trace(path, params = {}) -> data
+        
+        @type path: string
+        @param path: trace path.
+        @type params: dictionary
+        @param params: parameters for the analysis.
+        
+        @rtype: list of dictionaries
+        @return: profiling results, one per implementation.
+        """
+        
+        params = dict(PARAMS.items() + params.items())
+        self._timer = get_timer(params["clock"])
+        sampling = dict((key, params[key]) for key in SAMPLING_PARAMS)
+        records = read(path)
+        
         dataset = []
-        for implementation in STRUCTURES_INSTANCE[TREE]["Implementations"]:
-            data = {"Structure": TREE, "Implementation": implementation, "Operation": str(operation), "Max Input": max_input, "X": [], "time": []}
-            interval = max_input / 10
-            for x in range(0, max_input + 1, interval):
-                averageTime = self._get_time_tree(implementation, operation, x, average_bound)
-                data["X"].append(x)
-                data["time"].append(averageTime)                
-            dataset.append(data)            
+        for structure, kind, bind in ((PRIORITY_QUEUE, TRACE_PRIORITY_QUEUE, bind_priority_queue), (GRAPH, TRACE_GRAPH, bind_graph)):
+            count = calls(records, kind)
+            if count == 0:
+                continue
+            for implementation, constructor in STRUCTURES_INSTANCE[structure]["Implementations"].iteritems():
+                print "\tReplaying {} calls on {} . . .".format(str(count), str(implementation))
+                shared = bind(records, constructor) if structure == GRAPH else None
+                def measure(i):
+                    replay = shared or bind(records, constructor)
+                    now = self._timer.now
+                    start = now()
+                    for call, args in replay:
+                        call(*args)
+                    end = now()
+                    return self._timer.elapsed(start, end, len(replay))
+                stats = summarize(collect(measure, sampling))
+                dataset.append({"Trace": path,
+                                "Structure": structure,
+                                "Implementation": implementation,
+                                "Calls": count,
+                                "Clock": params["clock"],
+                                "Time": stats["Median"],
+                                "Stats": stats})
         return dataset
     
-    def _profile_priority_queue(self, operation, max_input, average_bound):
+    def profile_memory(self, params = {}):
+        """
+        Measures the memory footprint of every Graph implementation, holding X nodes and X random arcs,
+        for every X of the sweep (adaptive sweeps are not refined).
+        
+        profile_memory(params = {}) -> data
+        
+        @type params: dictionary
+        @param params: parameters for the analysis.
+        
+        @rtype: list of dictionaries
+        @return: one dictionary per implementation, holding X, Bytes and Bytes Per Arc.
+        """
+        
+        params = dict(PARAMS.items() + params.items())
+        seed = params["seed"]
         dataset = []
-        for implementation in STRUCTURES_INSTANCE[PRIORITY_QUEUE]["Implementations"]:
-            data = {"Structure": PRIORITY_QUEUE, "Implementation": implementation, "Operation": str(operation), "Max Input": max_input, "X": [], "time": []}
-            interval = max_input / 10
-            for x in range(0, max_input + 1, interval):
-                averageTime = self._get_time_priority_queue(implementation, operation, x, average_bound)
-                data["X"].append(x)
-                data["time"].append(averageTime)                
+        for implementation, constructor in STRUCTURES_INSTANCE[GRAPH]["Implementations"].iteritems():
+            data = {"Structure": GRAPH, "Implementation": implementation, "Max Input": params["max_input"], "X": plan(params), "Bytes": [], "Bytes Per Arc": []}
+            for x in data["X"]:
+                instance = constructor()
+                _fill_graph(instance, x, stream(seed, -1))
+                size = deep_size(instance)
+                data["Bytes"].append(size)
+                data["Bytes Per Arc"].append(float(size) / x)
             dataset.append(data)
         return dataset
     
-    def _profile_graph(self, operation, max_input, average_bound):
-        dataset = []
-        for implementation in STRUCTURES_INSTANCE[GRAPH]["Implementations"]:
-            data = {"Structure": GRAPH, "Implementation": implementation, "Operation": str(operation), "Max Input": max_input, "X": [], "time": []}
-            interval = max_input / 10
-            for x in range(0, max_input + 1, interval):
-                averageTime = self._get_time_graph(implementation, operation, x, average_bound)
-                data["X"].append(x)
-                data["time"].append(averageTime)                
-            dataset.append(data)            
-        return dataset
+    def _make_data(self, structure, implementation, operation, X, results, params):
+        times = [stats["Median"] for stats in results]
+        expected = EXPECTED_COMPLEXITY.get(structure, {}).get(operation)
+        measured = fit(X, times)
+        data = {"Structure": structure, 
+                "Implementation": implementation, 
+                "Operation": str(operation), 
+                "Max Input": max(X or [params["max_input"]]), 
+                "Clock": params["clock"], 
+                "X": X, 
+                "time": times, 
+                "Stats": results,
+                "Fit": measured,
+                "Expected": expected,
+                "Worse": is_worse(measured, expected)}
+        if results and all("Latency" in stats for stats in results):
+            data["Latency"] = [stats["Latency"] for stats in results]
+        if results and all("Loop Overhead" in stats for stats in results):
+            data["Loop Overhead"] = [stats["Loop Overhead"] for stats in results]
+        return data
+    
+    def _get_time(self, structure, implementation, operation, iteration, sampling):
+        if structure not in STRUCTURES_INSTANCE or operation not in STRUCTURES_INSTANCE[structure]["Operations"]:
+            raise UnsupportedDataStructureError()
+        constructor = STRUCTURES_INSTANCE[structure]["Implementations"][implementation]
+        spec = STRUCTURES_INSTANCE[structure]["Operations"][operation]
+        return self._time_operation(constructor, spec, iteration, sampling)
+    
+    def _time_operation(self, constructor, spec, iteration, sampling):
+        """
+        Profiles an operation spec (see operation) on instances of size iteration.
+        
+        _time_operation(constructor, spec, iteration, sampling) -> stats
+        
+        @type constructor: function
+        @param constructor: constructor() returns a new empty instance.
+        @type spec: dictionary
+        @param spec: operation spec.
+        @type iteration: int
+        @param iteration: input size X.
+        @type sampling: dictionary
+        @param sampling: per-cell parameters (see SAMPLING_PARAMS).
+        
+        @rtype: dictionary
+        @return: summary of the elapsed times, with Loop Overhead and, if captured, Latency.
+        """
+        call = spec["Call"]
+        populate = spec["Populate"]
+        seed = sampling.get("seed", DEFAULT_SEED)
+        self._histogram = LatencyHistogram() if sampling.get("latency") else None
+        self._latency_batch = max(1, sampling.get("latency_batch", DEFAULT_LATENCY_BATCH))
+        
+        def build():
+            instance = constructor()
+            if populate is not None:
+                populate(instance, iteration, stream(seed, -1))
+            return instance
+        if spec["Shared"]:
+            shared = build()
+            get = lambda: shared
+        elif populate is not None:
+            get = Fixture(build, sampling.get("fixture", True)).get
+        else:
+            get = build
+        
+        width = [0]
+        def measure(i):
+            instance = get()
+            operands = spec["Operands"](instance, iteration, stream(seed, i))
+            width[0] = len(operands)
+            if call == DISPATCH:
+                bound = DISPATCH
+            else:
+                bound = getattr(instance, call) if isinstance(call, basestring) else call(instance)
+            return self._time_ops(_bind(bound, operands), iteration)
+        stats = summarize(collect(measure, sampling))
+        
+        if self._histogram is not None:
+            stats["Latency"] = self._histogram.summary()
+            stats["Latency"]["Batch"] = self._latency_batch
+            self._histogram = None
+        stats["Loop Overhead"] = {"Subtracted": self._timer.loop_overhead,
+                                  "Residual": width[0] * residual_overhead(self._timer, range(iteration))}
+        return stats
+    
+    def _time_ops(self, ops, iteration):
+        """
+        Times ops(0, iteration), i.e. iteration operations.
+        If a latency histogram is being captured, operations are run in batches of latency_batch,
+        one timestamp being taken after each batch, and the mean operation latency of every batch is
+        recorded for each of its operations: only batches of 1 (the default) record every single
+        operation, so that a spike is not spread over its batch. The per-batch cost of the ops() call and of the batch loop, estimated on
+        BATCH_CALIBRATION empty batches, is subtracted from every batch; the extra timestamps and
+        batch calls, with respect to a single ops() call, are recorded as the histogram overhead.
+        
+        _time_ops(ops, iteration) -> time
+        
+        @type ops: function
+        @param ops: ops(first, last) runs the operations first, ..., last - 1.
+        @type iteration: int
+        @param iteration: number of operations.
+        
+        @rtype: float
+        @return: elapsed time, net of the timing overheads.
+        """
+        timer = self._timer
+        now = timer.now
+        if self._histogram is None:
+            start = now()
+            ops(0, iteration)
+            end = now()
+            return timer.elapsed(start, end, iteration)
+        
+        empty = [0] * (BATCH_CALIBRATION + 1)
+        empty[0] = now()
+        for k in range(1, len(empty)):
+            ops(0, 0)
+            empty[k] = now()
+        batch_overhead = max(0.0, (empty[-1] - empty[0]) * timer.scale / BATCH_CALIBRATION - timer.call_overhead)
+        
+        batch = self._latency_batch
+        bounds = range(0, iteration, batch) + [iteration]
+        stamps = [0] * len(bounds)
+        stamps[0] = now()
+        for k in range(1, len(bounds)):
+            ops(bounds[k - 1], bounds[k])
+            stamps[k] = now()
+        
+        elapsed = 0.0
+        for k in range(1, len(bounds)):
+            count = bounds[k] - bounds[k - 1]
+            t = max(0.0, timer.elapsed(stamps[k - 1], stamps[k], count) - batch_overhead)
+            self._histogram.record(t / count, count)
+            elapsed += t
+        if len(bounds) > 2:
+            self._histogram.overhead += (len(bounds) - 2) * (timer.call_overhead + batch_overhead)
+        return elapsed
     
-    def _get_time_linked_list(self, implementation, operation, iteration, average_bound):
-        rawTimes = []        
-        if operation == "add_as_first":
-            for i in range(average_bound):
-                instance = STRUCTURES_INSTANCE[LINKED_LIST]["Implementations"][implementation]()
-                start = time()
-                for j in range(iteration):
-                    instance.add_as_first(j)
-                end = time()
-                rT = (end - start)
-                rawTimes.append(rT)
-        elif operation == "add_as_last":
-            for i in range(average_bound):
-                instance = STRUCTURES_INSTANCE[LINKED_LIST]["Implementations"][implementation]()
-                start = time()
-                for j in range(iteration):
-                    instance.add_as_last(j)
-                end = time()
-                rT = (end - start)
-                rawTimes.append(rT)
-        elif operation == "pop_first":
-            for i in range(average_bound):
-                instance = STRUCTURES_INSTANCE[LINKED_LIST]["Implementations"][implementation]()
-                for r in range(iteration):
-                    instance.add_as_first(r)
-                start = time()
-                for j in range(iteration):
-                    instance.pop_first()
-                end = time()
-                rT = (end - start)
-                rawTimes.append(rT)
-        elif operation == "pop_last":
-            for i in range(average_bound):
-                instance = STRUCTURES_INSTANCE[LINKED_LIST]["Implementations"][implementation]()
-                for r in range(iteration):
-                    instance.add_as_first(r)
-                start = time()
-                for j in range(iteration):
-                    instance.pop_last()
-                end = time()
-                rT = (end - start)
-                rawTimes.append(rT)
-        elif operation == "delete_record":
-            for i in range(average_bound):
-                instance = STRUCTURES_INSTANCE[LINKED_LIST]["Implementations"][implementation]()
-                for r in range(iteration):
-                    instance.add_as_first(r)
-                record = instance.get_first_record()
-                start = time()
-                for j in range(iteration):
-                    instance.delete_record(record)
-                end = time()
-                rT = (end - start)
-                rawTimes.append(rT)
-                    
-        averageTime = average(rawTimes)
-        return averageTime
-    
-    def _get_time_queue(self, implementation, operation, iteration, average_bound):
-        rawTimes = []
-        if operation == "enqueue":
-            for i in range(average_bound):
-                instance = STRUCTURES_INSTANCE[QUEUE]["Implementations"][implementation]()
-                start = time()
-                for j in range(iteration):
-                    instance.enqueue(j)
-                end = time()
-                rT = (end - start)
-                rawTimes.append(rT)
-        elif operation == "get_first":
-            for i in range(average_bound):
-                instance = STRUCTURES_INSTANCE[QUEUE]["Implementations"][implementation]()
-                for r in range(iteration):
-                    instance.enqueue(r)
-                start = time()
-                for j in range(iteration):
-                    instance.get_first()
-                end = time()
-                rT = (end - start)
-                rawTimes.append(rT)
-        elif operation == "dequeue":
-            for i in range(average_bound):
-                instance = STRUCTURES_INSTANCE[QUEUE]["Implementations"][implementation]()
-                for r in range(iteration):
-                    instance.enqueue(r)
-                start = time()
-                for j in range(iteration):
-                    instance.dequeue()
-                end = time()
-                rT = (end - start)
-                rawTimes.append(rT)
-                    
-        averageTime = average(rawTimes)
-        return averageTime
-    
-    def _get_time_stack(self, implementation, operation, iteration, average_bound):
-        rawTimes = []        
-        if operation == "push":
-            for i in range(average_bound):
-                instance = STRUCTURES_INSTANCE[STACK]["Implementations"][implementation]()
-                start = time()
-                for j in range(iteration):
-                    instance.push(j)
-                end = time()
-                rT = (end - start)
-                rawTimes.append(rT)
-        elif operation == "top":
-            for i in range(average_bound):
-                instance = STRUCTURES_INSTANCE[STACK]["Implementations"][implementation]()
-                for r in range(iteration):
-                    instance.push(r)
-                start = time()
-                for j in range(iteration):
-                    instance.top()
-                end = time()
-                rT = (end - start)
-                rawTimes.append(rT)
-        elif operation == "pop":
-            for i in range(average_bound):
-                instance = STRUCTURES_INSTANCE[STACK]["Implementations"][implementation]()
-                for r in range(iteration):
-                    instance.push(r)
-                start = time()
-                for j in range(iteration):
-                    instance.pop()
-                end = time()
-                rT = (end - start)
-                rawTimes.append(rT)
-                    
-        averageTime = average(rawTimes)
-        return averageTime
-    
-    def _get_time_tree(self, implementation, operation, iteration, average_bound):
-        rawTimes = []        
-        if operation == "insert":
-            for i in range(average_bound):
-                instance = STRUCTURES_INSTANCE[TREE]["Implementations"][implementation](0)
-                nodes = [0]
-                start = time()
-                for j in range(iteration):
-                    instance.insert(random.choice(nodes), j)
-                    nodes.append(j)
-                end = time()
-                rT = (end - start)
-                rawTimes.append(rT)
-        elif operation == "make_son":
-            for i in range(average_bound):
-                instance = STRUCTURES_INSTANCE[TREE]["Implementations"][implementation](0)
-                nodes = [0]
-                for r in range(iteration):
-                    instance.insert(random.choice(nodes), r)
-                    nodes.append(r)
-                start = time()
-                for j in range(iteration):
-                    instance.make_son(j, random.choice(nodes))
-                end = time()
-                rT = (end - start)
-                rawTimes.append(rT)
-        elif operation == "get_path_to":
-            instance = STRUCTURES_INSTANCE[TREE]["Implementations"][implementation](0)
-            nodes = [0]
-            for r in range(1, iteration):
-                instance.insert(random.choice(nodes), r)
-                nodes.append(r)
-            for i in range(average_bound):                
-                start = time()
-                for j in range(iteration):
-                    instance.get_path_to(random.choice(nodes))
-                end = time()
-                rT = (end - start)
-                rawTimes.append(rT)                    
-        averageTime = average(rawTimes)
-        return averageTime
-    
-    def _get_time_priority_queue(self, implementation, operation, iteration, average_bound):
-        rawTimes = []            
-        if operation == "insert":
-            for i in range(average_bound):
-                if implementation == "2Heap":
-                    instance = STRUCTURES_INSTANCE[PRIORITY_QUEUE]["Implementations"][implementation](2)
-                elif implementation == "4Heap":
-                    instance = STRUCTURES_INSTANCE[PRIORITY_QUEUE]["Implementations"][implementation](4)
-                elif implementation == "8Heap":
-                    instance = STRUCTURES_INSTANCE[PRIORITY_QUEUE]["Implementations"][implementation](8)
-                elif implementation == "16Heap":
-                    instance = STRUCTURES_INSTANCE[PRIORITY_QUEUE]["Implementations"][implementation](16)
-                elif implementation == "32Heap":
-                    instance = STRUCTURES_INSTANCE[PRIORITY_QUEUE]["Implementations"][implementation](32)
-                elif implementation == "64Heap":
-                    instance = STRUCTURES_INSTANCE[PRIORITY_QUEUE]["Implementations"][implementation](64)
-                start = time()
-                for j in range(iteration):
-                    instance.insert(j, j)
-                end = time()
-                rT = (end - start)
-                rawTimes.append(rT)
-        elif operation == "delete_min":
-            for i in range(average_bound):
-                if implementation == "2Heap":
-                    instance = STRUCTURES_INSTANCE[PRIORITY_QUEUE]["Implementations"][implementation](2)
-                elif implementation == "4Heap":
-                    instance = STRUCTURES_INSTANCE[PRIORITY_QUEUE]["Implementations"][implementation](4)
-                elif implementation == "8Heap":
-                    instance = STRUCTURES_INSTANCE[PRIORITY_QUEUE]["Implementations"][implementation](8)
-                elif implementation == "16Heap":
-                    instance = STRUCTURES_INSTANCE[PRIORITY_QUEUE]["Implementations"][implementation](16)
-                elif implementation == "32Heap":
-                    instance = STRUCTURES_INSTANCE[PRIORITY_QUEUE]["Implementations"][implementation](32)
-                elif implementation == "64Heap":
-                    instance = STRUCTURES_INSTANCE[PRIORITY_QUEUE]["Implementations"][implementation](64)
-                for r in range(iteration):
-                    instance.insert(r, r)
-                start = time()
-                for j in range(iteration):
-                    instance.delete_min()
-                end = time()
-                rT = (end - start)
-                rawTimes.append(rT)
-        elif operation == "decrease_key":
-            for i in range(average_bound):
-                if implementation == "2Heap":
-                    instance = STRUCTURES_INSTANCE[PRIORITY_QUEUE]["Implementations"][implementation](2)
-                elif implementation == "4Heap":
-                    instance = STRUCTURES_INSTANCE[PRIORITY_QUEUE]["Implementations"][implementation](4)
-                elif implementation == "8Heap":
-                    instance = STRUCTURES_INSTANCE[PRIORITY_QUEUE]["Implementations"][implementation](8)
-                elif implementation == "16Heap":
-                    instance = STRUCTURES_INSTANCE[PRIORITY_QUEUE]["Implementations"][implementation](16)
-                elif implementation == "32Heap":
-                    instance = STRUCTURES_INSTANCE[PRIORITY_QUEUE]["Implementations"][implementation](32)
-                elif implementation == "64Heap":
-                    instance = STRUCTURES_INSTANCE[PRIORITY_QUEUE]["Implementations"][implementation](64)
-                infos = []
-                for r in range(iteration):
-                    random_key = 1000
-                    instance.insert(r, random_key)
-                    infos.append(r)
-                start = time()
-                for j in range(iteration):
-                    randomInfo = random.choice(infos)
-                    new_key = 5
-                    instance.decrease_key(randomInfo, new_key)
-                end = time()
-                rT = (end - start)
-                rawTimes.append(rT)
-                    
-        averageTime = average(rawTimes)
-        return averageTime
-    
-    def _get_time_graph(self, implementation, operation, iteration, average_bound):
-        rawTimes = []        
-        if operation == "add_node":
-            for i in range(average_bound):
-                instance = STRUCTURES_INSTANCE[GRAPH]["Implementations"][implementation]()
-                start = time()
-                for j in range(iteration):
-                    instance.add_node(j)
-                end = time()
-                rT = (end - start)
-                rawTimes.append(rT)
-        elif operation == "add_arc":
-            for i in range(average_bound):
-                instance = STRUCTURES_INSTANCE[GRAPH]["Implementations"][implementation]()
-                nodes = []
-                for r in range(iteration):
-                    instance.add_node(r, r)
-                    nodes.append(r)
-                start = time()
-                for j in range(iteration):
-                    randomNodeAId = random.choice(nodes)
-                    randomNodeBId = random.choice(nodes)
-                    instance.add_arc(randomNodeAId, randomNodeBId)
-                end = time()
-                rT = (end - start)
-                rawTimes.append(rT)
-        elif operation == "get_incident_arcs":
-            for i in range(average_bound):
-                instance = STRUCTURES_INSTANCE[GRAPH]["Implementations"][implementation]()
-                nodes = []
-                for r in range(iteration):
-                    instance.add_node(r, r)
-                    nodes.append(r)
-                for r in range(iteration):
-                    randomNodeAId = random.choice(nodes)
-                    randomNodeBId = random.choice(nodes)
-                    instance.add_arc(randomNodeAId, randomNodeBId)
-                start = time()
-                for j in range(iteration):
-                    randomNodeId = random.choice(nodes)
-                    instance.get_incident_arcs(randomNodeId)
-                end = time()
-                rT = (end - start)
-                rawTimes.append(rT)
-        elif operation == "set_arc_status":
-            for i in range(average_bound):
-                instance = STRUCTURES_INSTANCE[GRAPH]["Implementations"][implementation]()
-                nodes = []
-                for r in range(iteration):
-                    instance.add_node(r, r)
-                    nodes.append(r)
-                for r in range(iteration):
-                    randomNodeAId = random.choice(nodes)
-                    randomNodeBId = random.choice(nodes)
-                    instance.add_arc(randomNodeAId, randomNodeBId)
-                start = time()
-                for j in range(iteration):
-                    randomNodeAId = random.choice(nodes)
-                    randomNodeBId = random.choice(nodes)
-                    instance.set_arc_status(randomNodeAId, randomNodeBId, None)
-                end = time()
-                rT = (end - start)
-                rawTimes.append(rT)
-                    
-        averageTime = average(rawTimes)
-        return averageTime
-    
-    def plot_data(self, dataset, directory = PARAMS["output_dir"]):
+    def plot_data(self, dataset, directory = PARAMS["output_dir"], errors = True):
         """
         Stores to the specified directory a MathPlotLib plot based on the specified dataset.
         
-        plot_data(dataset, directory) -> None
+        plot_data(dataset, directory, errors = True) -> None
         
         @type dataset: list of dictionaries
         @param dataset: the dataset to be plotted.
         @type directory: string
         @param directory: directory to store the computed MatPlotLib plot.
+        @type errors: boolean
+        @param errors: if True, confidence intervals and interquartile bands are plotted too.
         """
         
         for struct_data in dataset:       
@@ -555,22 +687,29 @@ class StructProfiler(baseprofiler):
             yLabel = "Time (s)"
             legend = STRUCTURES_INSTANCE[structure]["Implementations"].keys()
             formattedDataset = []
-            for data in struct_data:
-                formattedDataset.append([data["X"], data["time"]])
-            plot = make_plot(formattedDataset, plotLabel, xLabel, yLabel, legend)
+            if errors and all("Stats" in data for data in struct_data):
+                for data in struct_data:
+                    formattedDataset.append([data["X"], data["Stats"]])
+                plot = make_error_plot(formattedDataset, plotLabel, xLabel, yLabel, legend)
+            else:
+                for data in struct_data:
+                    formattedDataset.append([data["X"], data["time"]])
+                plot = make_plot(formattedDataset, plotLabel, xLabel, yLabel, legend)
             save_plot(plot, plotFilePath)
             plot.close()    
         
-    def table_data(self, dataset, directory = PARAMS["output_dir"]):
+    def table_data(self, dataset, directory = PARAMS["output_dir"], errors = True):
         """
         Stores to the specified directory a table-as-string based on the specified dataset.
         
-        table_data(dataset, directory) -> None
+        table_data(dataset, directory, errors = True) -> None
         
         @type dataset: list of dictionaries
         @param dataset: the dataset to be represented in table.
         @type directory: string
         @param directory: directory to store the computed table.
+        @type errors: boolean
+        @param errors: if True, confidence intervals, dispersion and outliers are tabled too.
         """
         
         for struct_data in dataset:
@@ -585,11 +724,230 @@ class StructProfiler(baseprofiler):
             yLabel = "Time (s)"
             legend = STRUCTURES_INSTANCE[structure]["Implementations"].keys()
             formattedDataset = []
-            for data in struct_data:
-                formattedDataset.append([data["X"], data["time"]])
-            table = make_table(formattedDataset, plotLabel, xLabel, yLabel, legend)
+            if errors and all("Stats" in data for data in struct_data):
+                for data in struct_data:
+                    formattedDataset.append([data["X"], data["Stats"]])
+                table = make_error_table(formattedDataset, plotLabel, xLabel, yLabel, legend)
+            else:
+                for data in struct_data:
+                    formattedDataset.append([data["X"], data["time"]])
+                table = make_table(formattedDataset, plotLabel, xLabel, yLabel, legend)
+            if all("Loop Overhead" in data for data in struct_data):
+                rows = [(data["Implementation"], x, overhead["Subtracted"], overhead["Residual"]) for data in struct_data for x, overhead in zip(data["X"], data["Loop Overhead"])]
+                table += "\n" + make_overhead_table(rows, "Loop Overhead (s/iteration)")
             save_table(table, plotFilePath) 
 
+    def fit_data(self, dataset, directory = PARAMS["output_dir"]):
+        """
+        Stores to the specified directory a table-as-string of the complexity models fitted to the
+        specified dataset, flagging every curve that scales worse than its expected class.
+        
+        fit_data(dataset, directory) -> None
+        
+        @type dataset: list of dictionaries
+        @param dataset: the dataset to be fitted.
+        @type directory: string
+        @param directory: directory to store the computed table.
+        """
+        
+        for struct_data in dataset:
+            structure = struct_data[0]["Structure"]
+            implementations = " ".join(STRUCTURES_INSTANCE[structure]["Implementations"].keys())
+            operation = str(struct_data[0]["Operation"])
+            interval = str(struct_data[0]["Max Input"])
+            tableFileName = STRUCTURES_NAME[structure] + " " + implementations + " " + operation + " " +  interval + " Fit.txt"
+            tableFilePath = os.path.join(directory, str(tableFileName))
+            tableLabel = STRUCTURES_NAME[structure] + ": " + operation
+            rows = [(data["Implementation"], data["Fit"], data["Expected"]) for data in struct_data]
+            for data in struct_data:
+                if data["Worse"]:
+                    print "\tWarning: {} {} scales as {} (expected {})".format(str(data["Implementation"]), operation, data["Fit"]["Model"], str(data["Expected"]))
+            save_table(make_fit_table(rows, tableLabel), tableFilePath)
+
+    def latency_data(self, dataset, directory = PARAMS["output_dir"]):
+        """
+        Stores to the specified directory a table-as-string of the per-operation latency percentiles
+        of the specified dataset (profiled with latency capture), labelled as batch means when
+        operations were timed in batches.
+        
+        latency_data(dataset, directory) -> None
+        
+        @type dataset: list of dictionaries
+        @param dataset: the dataset to be represented in table.
+        @type directory: string
+        @param directory: directory to store the computed table.
+        """
+        
+        for struct_data in dataset:
+            if not all("Latency" in data for data in struct_data):
+                continue
+            structure = struct_data[0]["Structure"]
+            implementations = " ".join(STRUCTURES_INSTANCE[structure]["Implementations"].keys())
+            operation = str(struct_data[0]["Operation"])
+            interval = str(struct_data[0]["Max Input"])
+            tableFileName = STRUCTURES_NAME[structure] + " " + implementations + " " + operation + " " +  interval + " Latency.txt"
+            tableFilePath = os.path.join(directory, str(tableFileName))
+            rows = [(data["Implementation"], x, latency) for data in struct_data for x, latency in zip(data["X"], data["Latency"])]
+            batch = max(latency.get("Batch", 1) for name, x, latency in rows)
+            if batch > 1:
+                tableLabel = STRUCTURES_NAME[structure] + ": " + operation + " (s/operation, means of batches of {} operations)".format(str(batch))
+            else:
+                tableLabel = STRUCTURES_NAME[structure] + ": " + operation + " (s/operation)"
+            save_table(make_latency_table(rows, tableLabel), tableFilePath)
+
+    def arity_data(self, dataset, directory = PARAMS["output_dir"]):
+        """
+        Stores to the specified directory a MathPlotLib plot and a table-as-string of the (d, X) cost
+        surface of every operation profiled by profile_arity, with the best arity at every X.
+        
+        arity_data(dataset, directory) -> None
+        
+        @type dataset: list of dictionaries
+        @param dataset: the dataset computed by profile_arity.
+        @type directory: string
+        @param directory: directory to store the computed plot and table.
+        """
+        
+        for data in dataset:
+            operation = str(data["Operation"])
+            arities = data["Arities"]
+            fileName = STRUCTURES_NAME[PRIORITY_QUEUE] + " DHeap Arity " + operation + " " + str(data["Max Input"])
+            filePath = os.path.join(directory, str(fileName))
+            label = STRUCTURES_NAME[PRIORITY_QUEUE] + ": " + operation + " by arity"
+            legend = ["{}Heap".format(arity) for arity in arities]
+            formattedDataset = [[data["X"], [row[k] for row in data["Surface"]]] for k in range(len(arities))]
+            plot = make_plot(formattedDataset, label, "Input", "Time (s)", legend)
+            save_plot(plot, filePath)
+            plot.close()
+            
+            lines = [label, "", "\t".join(["Input"] + ["d=" + str(arity) for arity in arities] + ["Best"])]
+            for x, row, best in zip(data["X"], data["Surface"], data["Best"]):
+                lines.append("\t".join([str(x)] + ["{:.6e}".format(value) for value in row] + [str(best)]))
+            save_table("\n".join(lines) + "\n", filePath + ".txt")
+
+    def memory_data(self, dataset, directory = PARAMS["output_dir"]):
+        """
+        Stores to the specified directory a table-as-string of the memory footprints computed by profile_memory.
+        
+        memory_data(dataset, directory) -> None
+        
+        @type dataset: list of dictionaries
+        @param dataset: the dataset computed by profile_memory.
+        @type directory: string
+        @param directory: directory to store the computed table.
+        """
+        
+        if not dataset:
+            return
+        implementations = " ".join(data["Implementation"] for data in dataset)
+        tableFilePath = os.path.join(directory, str(STRUCTURES_NAME[GRAPH] + " " + implementations + " Memory " + str(dataset[0]["Max Input"]) + ".txt"))
+        lines = [STRUCTURES_NAME[GRAPH] + ": memory", "", "\t".join(["Implementation", "Input", "Bytes", "Bytes Per Arc"])]
+        for data in dataset:
+            for x, size, perArc in zip(data["X"], data["Bytes"], data["Bytes Per Arc"]):
+                lines.append("\t".join([str(data["Implementation"]), str(x), str(size), "{:.2f}".format(perArc)]))
+        save_table("\n".join(lines) + "\n", tableFilePath)
+    
+    def trace_data(self, dataset, directory = PARAMS["output_dir"]):
+        """
+        Stores to the specified directory a table-as-string of the trace replay times computed by replay_trace.
+        
+        trace_data(dataset, directory) -> None
+        
+        @type dataset: list of dictionaries
+        @param dataset: the dataset computed by replay_trace.
+        @type directory: string
+        @param directory: directory to store the computed table.
+        """
+        
+        if not dataset:
+            return
+        traceName = os.path.splitext(os.path.basename(dataset[0]["Trace"]))[0]
+        tableFilePath = os.path.join(directory, str("Trace " + traceName + ".txt"))
+        lines = ["Trace: " + traceName, "", "\t".join(["Structure", "Implementation", "Calls", "Median", "CI Low", "CI High", "Per Call"])]
+        for data in dataset:
+            stats = data["Stats"]
+            values = [stats["Median"], stats["CI"][0], stats["CI"][1], stats["Median"] / data["Calls"]]
+            lines.append("\t".join([STRUCTURES_NAME[data["Structure"]], str(data["Implementation"]), str(data["Calls"])] + ["{:.6e}".format(value) for value in values]))
+        save_table("\n".join(lines) + "\n", tableFilePath)
+
+def _bind(call, operands):
+    """
+    Returns the timed loop of a pre-bound call over its operand columns.
+    
+    _bind(call, operands) -> ops
+    
+    @type call: function
+    @param call: bound method to be timed, or DISPATCH.
+    @type operands: list of lists
+    @param operands: argument columns, one value per call (with DISPATCH, the bound methods
+    and their argument tuples).
+    
+    @rtype: function
+    @return: ops(first, last) runs the calls first, ..., last - 1.
+    """
+    if call == DISPATCH:
+        calls, rows = operands
+        def ops(first, last):
+            for j in range(first, last):
+                calls[j](*rows[j])
+    elif len(operands) == 0:
+        def ops(first, last):
+            for j in range(first, last):
+                call()
+    elif len(operands) == 1:
+        a, = operands
+        def ops(first, last):
+            for j in range(first, last):
+                call(a[j])
+    elif len(operands) == 2:
+        a, b = operands
+        def ops(first, last):
+            for j in range(first, last):
+                call(a[j], b[j])
+    elif len(operands) == 3:
+        a, b, c = operands
+        def ops(first, last):
+            for j in range(first, last):
+                call(a[j], b[j], c[j])
+    else:
+        rows = zip(*operands)
+        def ops(first, last):
+            for j in range(first, last):
+                call(*rows[j])
+    return ops
+
+def _get_time_cell(cell):
+    """
+    Worker entry point of StructProfiler parallel profiling.
+    
+    _get_time_cell(cell) -> stats
+    
+    @type cell: tuple
+    @param cell: (clock, structure, implementation, operation, X, sampling parameters).
+    
+    @rtype: dictionary
+    @return: summary of the elapsed times.
+    """
+    profiler = StructProfiler()
+    profiler._timer = get_timer(cell[0])
+    return profiler._get_time(*cell[1:])
+
+def _get_arity_time_cell(cell):
+    """
+    Worker entry point of StructProfiler parallel arity profiling.
+    
+    _get_arity_time_cell(cell) -> stats
+    
+    @type cell: tuple
+    @param cell: (clock, arity, operation, X, sampling parameters).
+    
+    @rtype: dictionary
+    @return: summary of the elapsed times.
+    """
+    profiler = StructProfiler()
+    profiler._timer = get_timer(cell[0])
+    return profiler._get_arity_time(*cell[1:])
+
 def __test(profiler, params):
     """
     Data Structures Profiler Test.
@@ -608,7 +966,12 @@ def __test(profiler, params):
     print "###"
     print "### Data Structures: {}".format(' '.join(STRUCTURES_NAME[structure] for structure in STRUCTURES))
     print "### Max Input: {}".format(str(params["max_input"]))
+    print "### Sweep: {}".format(str(params["sweep"]))
     print "### Average Bound: {}".format(str(params["average_bound"]))  
+    print "### Adaptive: {}".format(str(params["adaptive"]))
+    print "### Latency: {}".format(str(params["latency"]))
+    print "### Seed: {}".format(str(params["seed"]))
+    print "### Clock: {}".format(str(params["clock"]))
     print "### Output Directory: {}\n".format(str(params["output_dir"]))
     for structure in [PRIORITY_QUEUE]:
         params["structure"] = structure
@@ -616,8 +979,23 @@ def __test(profiler, params):
         data = profiler.profile_all(params)
         print "Making Plot . . ."
         profiler.plot_data(data)
-        print "Making Table . . .\n"
+        print "Making Table . . ."
         profiler.table_data(data)
+        print "Fitting . . .\n"
+        profiler.fit_data(data)
+        if params["latency"]:
+            print "Making Latency Table . . .\n"
+            profiler.latency_data(data)
+    if params["trace"]:
+        print "Replaying Trace {} . . .".format(str(params["trace"]))
+        profiler.trace_data(profiler.replay_trace(params["trace"], params))
+    print "Measuring Graph memory . . ."
+    profiler.memory_data(profiler.profile_memory(params))
+    print "Profiling DHeap arities {} . . .".format(" ".join(str(arity) for arity in params["arities"]))
+    data = profiler.profile_arity(params)
+    for surface in data:
+        print "\t{}: best arity by input {}".format(surface["Operation"], " ".join("{}:{}".format(x, best) for x, best in zip(surface["X"], surface["Best"])))
+    profiler.arity_data(data)
     
     print "\n### END OF TEST ###\n"              
     
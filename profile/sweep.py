@@ -0,0 +1,179 @@
+#Sweep Imports
+import math
+
+LINEAR = "linear"
+GEOMETRIC = "geometric"
+CUSTOM = "custom"
+ADAPTIVE = "adaptive"
+SWEEPS = [LINEAR, GEOMETRIC, CUSTOM, ADAPTIVE]
+
+#Sweep parameters
+DEFAULT_POINTS = 10
+DEFAULT_MIN_INPUT = 10
+DEFAULT_REFINE_ROUNDS = 3
+DEFAULT_REFINE_POINTS = 3
+
+def plan(params):
+    """
+    Returns the input sizes of a sweep.
+    LINEAR spans (0, max_input] in points equal steps, GEOMETRIC spans [min_input, max_input] in
+    points geometric steps, CUSTOM takes the sizes listed in inputs, and ADAPTIVE starts from
+    the GEOMETRIC sizes (see refine).
+
+    plan(params) -> inputs
+
+    @type params: dictionary
+    @param params: sweep, max_input, and optionally min_input, points, inputs.
+
+    @rtype: list of int
+    @return: sorted distinct input sizes.
+    """
+    sweep = params.get("sweep", LINEAR)
+    points = max(1, params.get("points", DEFAULT_POINTS))
+
+    if sweep == LINEAR:
+        max_input = params["max_input"]
+        inputs = [int(round(max_input * (i + 1) / float(points))) for i in range(points)]
+    elif sweep in (GEOMETRIC, ADAPTIVE):
+        max_input = params["max_input"]
+        min_input = max(1, min(params.get("min_input", DEFAULT_MIN_INPUT), max_input))
+        if points == 1 or min_input == max_input:
+            inputs = [max_input]
+        else:
+            ratio = (float(max_input) / min_input) ** (1.0 / (points - 1))
+            inputs = [int(round(min_input * ratio ** i)) for i in range(points)]
+    elif sweep == CUSTOM:
+        inputs = [int(x) for x in params["inputs"]]
+    else:
+        raise ValueError("Unsupported sweep {}.".format(str(sweep)))
+
+    return sorted(set(x for x in inputs if x > 0))
+
+def refine(X, Y, count = DEFAULT_REFINE_POINTS):
+    """
+    Proposes new input sizes where the measured curve bends most.
+    The bend at each inner point is the change of slope of the curve in log-log space; both
+    intervals around the count most bent points are bisected (geometrically).
+
+    refine(X, Y, count = DEFAULT_REFINE_POINTS) -> inputs
+
+    @type X: list of int
+    @param X: sorted measured input sizes.
+    @type Y: list of numbers
+    @param Y: measured values, in X order.
+    @type count: int
+    @param count: number of bends to be refined.
+
+    @rtype: list of int
+    @return: sorted new input sizes, not in X.
+    """
+    if len(X) < 3:
+        return []
+    floor = min([y for y in Y if y > 0] or [1.0])
+    logX = [math.log(x) for x in X]
+    logY = [math.log(max(y, floor)) for y in Y]
+    slopes = [(logY[i + 1] - logY[i]) / (logX[i + 1] - logX[i]) for i in range(len(X) - 1)]
+    bends = sorted(((abs(slopes[i] - slopes[i - 1]), i) for i in range(1, len(X) - 1)), reverse = True)
+
+    known = set(X)
+    inputs = set()
+    for bend, i in bends[:count]:
+        for a, b in ((X[i - 1], X[i]), (X[i], X[i + 1])):
+            x = int(round(math.sqrt(a * b)))
+            if x not in known and a < x < b:
+                inputs.add(x)
+    return sorted(inputs)
+
+def run(measure, params, key = "Median"):
+    """
+    Runs a sweep of measure over the planned input sizes, refining it if the sweep is ADAPTIVE.
+
+    run(measure, params, key = "Median") -> (X, results)
+
+    @type measure: function
+    @param measure: measure(x) returns the result for input size x.
+    @type params: dictionary
+    @param params: sweep parameters (see plan), and refine_rounds, refine_points for ADAPTIVE.
+    @type key: string
+    @param key: result entry to be refined on, if results are dictionaries.
+
+    @rtype: tuple
+    @return: (sorted input sizes, results in the same order).
+    """
+    series = run_groups(lambda cells: [measure(x) for (group, x) in cells], [None], params, key)
+    return series[None]
+
+def run_groups(measure_cells, groups, params, key = "Median"):
+    """
+    Runs the same sweep for several groups (e.g. implementations), measuring each round of
+    (group, x) cells with a single call, so that cells can be farmed out together.
+
+    run_groups(measure_cells, groups, params, key = "Median") -> series
+
+    @type measure_cells: function
+    @param measure_cells: measure_cells(cells) returns the results of a list of (group, x) cells.
+    @type groups: list
+    @param groups: groups to be swept.
+    @type params: dictionary
+    @param params: sweep parameters (see run).
+    @type key: string
+    @param key: result entry to be refined on, if results are dictionaries.
+
+    @rtype: dictionary
+    @return: group -> (sorted input sizes, results in the same order).
+    """
+    inputs = plan(params)
+    series = dict((group, {}) for group in groups)
+    cells = [(group, x) for group in groups for x in inputs]
+
+    rounds = params.get("refine_rounds", DEFAULT_REFINE_ROUNDS) if params.get("sweep", LINEAR) == ADAPTIVE else 0
+    for r in range(rounds + 1):
+        if not cells:
+            break
+        for (group, x), result in zip(cells, measure_cells(cells)):
+            series[group][x] = result
+        if r == rounds:
+            break
+        cells = []
+        for group in groups:
+            X = sorted(series[group])
+            Y = [_value(series[group][x], key) for x in X]
+            cells += [(group, x) for x in refine(X, Y, params.get("refine_points", DEFAULT_REFINE_POINTS))]
+
+    return dict((group, (sorted(series[group]), [series[group][x] for x in sorted(series[group])])) for group in groups)
+
+def _value(result, key):
+    return result[key] if isinstance(result, dict) else result
+
+def __test():
+    """
+    Sweep Test: checks planned sizes, and that refine bisects around the bend of a curve.
+
+    __test() -> None
+    """
+    print "### iPATH TEST SWEEP\n"
+    assert plan({"max_input": 100, "points": 4}) == [25, 50, 75, 100]
+    assert plan({"sweep": GEOMETRIC, "min_input": 10, "max_input": 1000, "points": 3}) == [10, 100, 1000]
+    assert plan({"sweep": CUSTOM, "inputs": [30, 10, 10, 0]}) == [10, 30]
+
+    #Linear up to 1000, quadratic beyond: the only bend is at 1000.
+    curve = lambda x: float(x) if x <= 1000 else x * x / 1000.0
+    X = plan({"sweep": GEOMETRIC, "min_input": 10, "max_input": 100000, "points": 5})
+    inputs = refine(X, [curve(x) for x in X], 1)
+    print "Sizes: {}, Refined: {}".format(str(X), str(inputs))
+    assert X == [10, 100, 1000, 10000, 100000] and inputs == [316, 3162]
+    assert refine(X, [curve(x) for x in X], 0) == [] and refine(X[:2], [1, 2]) == []
+    assert refine([1, 2, 3], [1, 2, 9]) == []
+
+    measured = []
+    def measure(x):
+        measured.append(x)
+        return curve(x)
+    sizes, results = run(measure, {"sweep": ADAPTIVE, "min_input": 10, "max_input": 100000, "points": 5, "refine_rounds": 2, "refine_points": 1})
+    print "Adaptive Sizes: {}".format(str(sizes))
+    assert sizes == sorted(set(measured)) and len(sizes) == len(measured) and results == [curve(x) for x in sizes]
+    assert 316 in sizes and 3162 in sizes
+    print "\n### END OF TEST ###\n"
+
+if __name__ == "__main__":
+    __test()
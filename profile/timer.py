@@ -0,0 +1,128 @@
+#Timer Imports
+import time, sys
+
+#Optional rusage backend, used where the time module lacks CPU clocks
+try:
+    import resource
+except ImportError:
+    resource = None
+
+WALL = "wall"
+PROCESS = "process"
+THREAD = "thread"
+CLOCKS = [WALL, PROCESS, THREAD]
+
+#Calibration parameters
+CALIBRATION_ROUNDS = 15
+CALIBRATION_CALLS = 1000
+CALIBRATION_LOOP = 10000
+
+def _clock_function(clock):
+    """
+    Returns the best available function for the specified clock, with its scale to seconds.
+
+    _clock_function(clock) -> (function, scale)
+
+    @type clock: string
+    @param clock: one of CLOCKS.
+
+    @rtype: tuple
+    @return: (function returning the current clock value, seconds per clock unit).
+    """
+    names = {WALL: ["perf_counter_ns", "perf_counter"],
+             PROCESS: ["process_time_ns", "process_time"],
+             THREAD: ["thread_time_ns", "thread_time"]}
+    if clock not in names:
+        raise ValueError("Unsupported clock {}.".format(str(clock)))
+
+    for name in names[clock]:
+        if hasattr(time, name):
+            return getattr(time, name), 1e-9 if name.endswith("_ns") else 1.0
+
+    if clock == WALL:
+        return (time.clock if sys.platform == "win32" else time.time), 1.0
+    if clock == PROCESS:
+        return (time.time if sys.platform == "win32" else time.clock), 1.0
+    if resource is not None and hasattr(resource, "RUSAGE_THREAD"):
+        return (lambda: sum(resource.getrusage(resource.RUSAGE_THREAD)[:2])), 1.0
+    raise ValueError("Clock {} is not available on this platform.".format(str(clock)))
+
+class Timer:
+    """
+    High-resolution timer on a wall, process CPU or thread CPU clock.
+    The cost of reading the clock and of an empty loop iteration is calibrated when the timer
+    is created, and subtracted from every measured interval.
+    """
+
+    def __init__(self, clock = WALL):
+        self.clock = clock
+        self.now, self.scale = _clock_function(clock)
+        self.resolution = 0.0
+        self.call_overhead = 0.0
+        self.loop_overhead = 0.0
+        self.calibrate()
+
+    def calibrate(self):
+        """
+        Measures clock resolution, clock-call overhead and empty-loop overhead (per iteration).
+
+        calibrate() -> None
+        """
+        now = self.now
+        deltas = []
+        for r in range(CALIBRATION_ROUNDS):
+            for i in range(CALIBRATION_CALLS):
+                start = now()
+                stop = now()
+                deltas.append(stop - start)
+        #Coarse clocks mostly read zero: the mean, not the median, estimates the call cost.
+        ticks = [delta for delta in deltas if delta > 0]
+        self.resolution = min(ticks) * self.scale if ticks else 0.0
+        self.call_overhead = float(sum(deltas)) / len(deltas) * self.scale
+
+        loops = []
+        for r in range(CALIBRATION_ROUNDS):
+            start = now()
+            for j in range(CALIBRATION_LOOP):
+                pass
+            stop = now()
+            loops.append(max(0.0, (stop - start) * self.scale - self.call_overhead) / CALIBRATION_LOOP)
+        self.loop_overhead = min(loops)
+
+    def elapsed(self, start, stop, iterations = 0):
+        """
+        Returns the seconds elapsed between two readings of now(), net of the calibrated
+        clock-call overhead and of the overhead of the specified number of loop iterations.
+
+        elapsed(start, stop, iterations = 0) -> seconds
+
+        @type start: number
+        @param start: first reading.
+        @type stop: number
+        @param stop: second reading.
+        @type iterations: int
+        @param iterations: number of loop iterations between the readings.
+
+        @rtype: float
+        @return: corrected elapsed seconds, never negative.
+        """
+        return max(0.0, (stop - start) * self.scale - self.call_overhead - iterations * self.loop_overhead)
+
+#Calibrated timers of the current process, by clock
+_TIMERS = {}
+
+def get_timer(clock = WALL):
+    """
+    Returns the calibrated Timer of the current process for the specified clock.
+
+    get_timer(clock = WALL) -> timer
+
+    @type clock: string
+    @param clock: one of CLOCKS.
+
+    @rtype: Timer
+    @return: calibrated timer.
+    """
+    if clock not in _TIMERS:
+        _TIMERS[clock] = Timer(clock)
+    return _TIMERS[clock]
@@ -0,0 +1,257 @@
+#Workload Trace Imports
+import struct, os
+
+#Trace format: MAGIC, then records made of an opcode byte and its payload
+MAGIC = "PYPROFTRACE1"
+
+PRIORITY_QUEUE = "PriorityQueue"
+GRAPH = "Graph"
+KINDS = [PRIORITY_QUEUE, GRAPH]
+
+INSERT = 0
+DELETE_MIN = 1
+DECREASE_KEY = 2
+IS_EMPTY = 3
+INCIDENT_ARCS = 4
+ARC = 5
+
+#Opcode -> (kind, traced method, payload format); payloads start with the instance number,
+#infos and node ids are interned to dense ints
+RECORDS = {INSERT: (PRIORITY_QUEUE, "insert", "<IId"),
+           DELETE_MIN: (PRIORITY_QUEUE, "delete_min", "<I"),
+           DECREASE_KEY: (PRIORITY_QUEUE, "decrease_key", "<IId"),
+           IS_EMPTY: (PRIORITY_QUEUE, "is_empty", "<I"),
+           INCIDENT_ARCS: (GRAPH, "get_incident_arcs", "<II"),
+           ARC: (GRAPH, None, "<IIId")}
+
+TRACE_EXTENSION = ".trace"
+
+class TraceRecorder:
+    """
+    Records the priority-queue and graph calls of a workload into a binary trace.
+    Traced methods are patched on the classes for the duration of recording (see start and stop).
+    The arcs returned by every first get_incident_arcs of a node are recorded too (as ARC records,
+    before the access), so that the accessed subgraph can be rebuilt on replay.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.calls = 0
+        self._sink = None
+        self._nested = False
+        self._patched = []
+        self._instances = {} #(kind, id(instance)) -> instance number
+        self._counts = dict((kind, 0) for kind in KINDS)
+        self._live = [] #recorded instances, kept alive so that ids are not reused
+        self._ids = {} #info or node id -> interned int
+        self._expanded = set() #(graph number, interned node) already expanded
+
+    def start(self, priority_queues, graphs):
+        """
+        Starts recording the calls to the specified classes.
+
+        start(priority_queues, graphs) -> None
+
+        @type priority_queues: list of classes
+        @param priority_queues: priority-queue classes to be traced.
+        @type graphs: list of classes
+        @param graphs: graph classes to be traced.
+        """
+        self._sink = open(self.path, "wb")
+        self._sink.write(MAGIC)
+        classes = {PRIORITY_QUEUE: priority_queues, GRAPH: graphs}
+        patched = set()
+        for opcode, (kind, method, format) in sorted(RECORDS.items()):
+            if method is None:
+                continue
+            for cls in classes[kind]:
+                if hasattr(cls, method) and (cls, method) not in patched:
+                    patched.add((cls, method))
+                    original = getattr(cls, method)
+                    self._patched.append((cls, method, cls.__dict__.get(method)))
+                    setattr(cls, method, self._wrap(opcode, original))
+
+    def stop(self):
+        """
+        Stops recording, restoring the traced classes and closing the trace.
+
+        stop() -> None
+        """
+        for cls, method, original in reversed(self._patched):
+            if original is None:
+                delattr(cls, method)
+            else:
+                setattr(cls, method, original)
+        self._patched = []
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+        self._live = []
+
+    def _wrap(self, opcode, original):
+        kind, method, format = RECORDS[opcode]
+        recorder = self
+        def traced(instance, *args):
+            #Calls made by a traced call (e.g. decrease_key sifting through insert) are not part of the workload.
+            if recorder._sink is None or recorder._nested:
+                return original(instance, *args)
+            recorder._nested = True
+            try:
+                result = original(instance, *args)
+            finally:
+                recorder._nested = False
+            return recorder._record(opcode, kind, format, instance, args, result)
+        traced.__name__ = method
+        return traced
+
+    def _record(self, opcode, kind, format, instance, args, result):
+        number = self._instance(kind, instance)
+        if opcode in (INSERT, DECREASE_KEY):
+            payload = (number, self._intern(args[0]), float(args[1]))
+        elif opcode == INCIDENT_ARCS:
+            node = self._intern(args[0])
+            if (number, node) not in self._expanded:
+                self._expanded.add((number, node))
+                result = list(result)
+                for arc in result:
+                    self._sink.write(struct.pack("<B", ARC) + struct.pack(RECORDS[ARC][2], number, node, self._intern(arc[0]), _weight(arc[1])))
+            payload = (number, node)
+        else:
+            payload = (number,)
+        self._sink.write(struct.pack("<B", opcode) + struct.pack(format, *payload))
+        self.calls += 1
+        return result
+
+    def _instance(self, kind, instance):
+        key = (kind, id(instance))
+        if key not in self._instances:
+            self._instances[key] = self._counts[kind]
+            self._counts[kind] += 1
+            self._live.append(instance)
+        return self._instances[key]
+
+    def _intern(self, value):
+        if value not in self._ids:
+            self._ids[value] = len(self._ids)
+        return self._ids[value]
+
+def _weight(info):
+    weight = info[0] if isinstance(info, (list, tuple)) else info
+    return float(weight) if isinstance(weight, (int, long, float)) else 1.0
+
+def read(path):
+    """
+    Reads a binary trace.
+
+    read(path) -> records
+
+    @type path: string
+    @param path: trace path.
+
+    @rtype: list of tuples
+    @return: (opcode, instance number, args...) records, in call order.
+    """
+    with open(path, "rb") as source:
+        data = source.read()
+    if not data.startswith(MAGIC):
+        raise ValueError("{} is not a workload trace.".format(str(path)))
+    formats = dict((opcode, struct.Struct(format)) for opcode, (kind, method, format) in RECORDS.items())
+    records = []
+    offset = len(MAGIC)
+    while offset < len(data):
+        opcode = ord(data[offset])
+        record = formats[opcode]
+        records.append((opcode,) + record.unpack_from(data, offset + 1))
+        offset += 1 + record.size
+    return records
+
+def calls(records, kind):
+    """
+    Counts the traced calls of the specified kind.
+
+    calls(records, kind) -> count
+
+    @type records: list of tuples
+    @param records: records, as returned by read.
+    @type kind: string
+    @param kind: one of KINDS.
+
+    @rtype: int
+    @return: number of calls.
+    """
+    return sum(1 for record in records if record[0] != ARC and RECORDS[record[0]][0] == kind)
+
+def bind_priority_queue(records, constructor):
+    """
+    Prepares the replay of the priority-queue calls of a trace on new instances.
+
+    bind_priority_queue(records, constructor) -> replay
+
+    @type records: list of tuples
+    @param records: records, as returned by read.
+    @type constructor: function
+    @param constructor: constructor() returns a new empty priority queue.
+
+    @rtype: list of tuples
+    @return: (bound method, args) pairs, in call order.
+    """
+    instances = {}
+    replay = []
+    for record in records:
+        opcode = record[0]
+        kind, method, format = RECORDS[opcode]
+        if kind != PRIORITY_QUEUE:
+            continue
+        number = record[1]
+        if number not in instances:
+            instances[number] = constructor()
+        replay.append((getattr(instances[number], method), record[2:]))
+    return replay
+
+def bind_graph(records, constructor):
+    """
+    Rebuilds the accessed subgraphs of a trace on new instances, and prepares the replay of their accesses.
+
+    bind_graph(records, constructor) -> replay
+
+    @type records: list of tuples
+    @param records: records, as returned by read.
+    @type constructor: function
+    @param constructor: constructor() returns a new empty graph.
+
+    @rtype: list of tuples
+    @return: (bound method, args) pairs, in call order.
+    """
+    instances = {}
+    nodes = {}
+    for record in records:
+        if RECORDS[record[0]][0] != GRAPH:
+            continue
+        number = record[1]
+        if number not in instances:
+            instances[number] = constructor()
+            nodes[number] = set()
+        graph = instances[number]
+        for node in record[2:4] if record[0] == ARC else record[2:3]:
+            if node not in nodes[number]:
+                nodes[number].add(node)
+                graph.add_node(node, node)
+        if record[0] == ARC:
+            graph.add_arc(record[2], record[3], record[4])
+    return [(getattr(instances[record[1]], RECORDS[record[0]][1]), record[2:]) for record in records if record[0] == INCIDENT_ARCS]
+
+def trace_path(directory, name):
+    """
+    Returns the path of a named trace in directory.
+
+    trace_path(directory, name) -> path
+
+    @type directory: string
+    @param directory: trace directory.
+    @type name: string
+    @param name: trace name.
+
+    @rtype: string
+    @return: trace path.
+    """
+    return os.path.join(directory, name + TRACE_EXTENSION)